@@ -2,15 +2,30 @@
 # Raspberry Pi 3 + Waveshare UART Fingerprint Reader
 # Yoklama sistemi (SQLite + Flask + Web UI)
 
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session
+from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session, Response, stream_with_context, make_response
 import sqlite3
+import json
+import gzip
+import hashlib
+import mimetypes
+import re
 from datetime import datetime, date, timedelta
 import os
 import time
 import sys
 import threading
+from collections import deque
 from functools import wraps
 from logger import setup_logger
+from utils.db_backup import start_backup_scheduler
+from utils.db_snapshot import connect_snapshot, start_snapshot_refresher
+from utils.db_schema import ensure_schema, refresh_presence, get_data_version, has_user_search, user_search_columns
+from utils.page_cache import LRUCache
+from utils import report_export
+from utils.report_export import iter_report_rows, get_range_totals
+from utils.report_jobs import ReportJobQueue
+from utils.static_assets import AssetManifest
+from utils import sensor_ipc
 import logging
 
 # Logger oluştur
@@ -30,14 +45,83 @@ def get_current_work_day():
         return (now - timedelta(days=1)).date()
     return now.date()
 
-# Ekrana iletilecek son yoklama olayı (panel_ui tarafından poll edilir)
-last_display_event = {
-    "event": None,
-    "timestamp": None,
-    "user": None,
-    "total_duration_minutes": 0,
-    "msg": None,
-}
+# =====================================================
+#       Olay Yolu (panel_ui ve diğer dinleyiciler için)
+# =====================================================
+
+class EventBus:
+    """
+    Sıra numaralı olay halkası.
+    Yayınlanan her olay artan bir 'seq' alır; tüketiciler kendi son gördükleri seq'i
+    (after) tutar, böylece her tüketici her olayı alır ve okuma olayı silmez.
+    """
+
+    def __init__(self, size=64):
+        self.cond = threading.Condition()
+        self.events = deque(maxlen=size)
+        self.seq = 0
+        self.closed = False
+        self.listeners = 0  # Açık SSE akışı sayısı
+        self.polled_at = 0  # Son polling isteğinin zamanı (akış yerine polling yapanlar için)
+
+    def publish(self, event):
+        with self.cond:
+            self.seq += 1
+            event = dict(event, seq=self.seq)
+            self.events.append(event)
+            self.cond.notify_all()
+        return event
+
+    def wait(self, after, timeout):
+        """
+        after'dan yeni olay gelene kadar en fazla timeout saniye bekler.
+        (olaylar, güncel seq) döndürür. İstemcinin imleci ileride ise
+        (sunucu yeniden başlamış) beklemeden boş liste ve güncel seq döner.
+        """
+        with self.cond:
+            if after > self.seq:
+                return [], self.seq
+            if timeout > 0:
+                self.cond.wait_for(lambda: self.seq > after or self.closed, timeout)
+            return [e for e in self.events if e["seq"] > after], self.seq
+
+    def missed(self, after):
+        """after'dan sonraki olaylardan bazıları halkadan düştüyse True."""
+        with self.cond:
+            return bool(self.events) and after < self.events[0]["seq"] - 1
+
+    def close(self):
+        """Bekleyen tüm dinleyicileri uyandırır (sunucu kapanırken)."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+# Ekrana iletilecek yoklama olayları (panel_ui long-poll / SSE ile dinler)
+event_bus = EventBus()
+
+# Dashboard satır değişiklikleri (açık tarayıcılar SSE ile dinler)
+dashboard_bus = EventBus()
+
+def close_event_buses():
+    event_bus.close()
+    dashboard_bus.close()
+
+def publish_display_event(event, user=None, total_duration_minutes=0, msg=None, timestamp=None):
+    """Panel için olay yayınla (check_in / check_out / error)."""
+    published = event_bus.publish({
+        "event": event,
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "user": user,
+        "total_duration_minutes": total_duration_minutes,
+        "msg": msg,
+    })
+    if user:
+        log.info(f"EVENT #{published['seq']} {event} | {user.get('first_name', '')} {user.get('last_name', '')}")
+    else:
+        log.info(f"EVENT #{published['seq']} {event}")
+    if event in ("check_in", "check_out") and user and user.get("id"):
+        publish_dashboard_delta(user["id"])
+    return published
 
 # Son hata bildiriminin zamanı (kayıtsız parmak için flood engeli)
 last_error_event_time = 0
@@ -52,6 +136,10 @@ except ImportError:
 PORT = "/dev/serial0"
 BAUD = 19200
 
+# local : sensör bu süreçte açılır (varsayılan, tek süreç)
+# daemon: sensörün sahibi sensor_daemon.py; bu süreç Unix socket üzerinden istemcidir
+SENSOR_MODE = os.environ.get("SENSOR_MODE", "local")
+
 # ACK codes from manual
 ACK_SUCCESS    = 0x00  # generic success (çoğu komut için)
 ACK_FAIL       = 0x01
@@ -68,6 +156,36 @@ app.config['SESSION_TYPE'] = 'filesystem'
 # Werkzeug (Flask) HTTP loglarını sustur
 logging.getLogger('werkzeug').setLevel(logging.ERROR)
 
+# =====================================================
+#       Statik Dosyalar (özet adlı, önceden sıkıştırılmış)
+# =====================================================
+# utils/static_assets.py ile derlenen dosyalar /assets/ altından süresiz önbellekle sunulur.
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+assets = AssetManifest()
+
+@app.template_global()
+def asset_url(filename):
+    """url_for('static', ...) yerine: derlenmişse özet adlı adres, değilse normal static adresi."""
+    hashed = assets.resolve(filename)
+    if hashed is None:
+        return url_for("static", filename=filename)
+    return url_for("asset_file", filename=hashed)
+
+@app.route("/assets/<path:filename>")
+def asset_file(filename):
+    from flask import send_from_directory
+    served, encoding = assets.choose_file(filename, request.headers.get("Accept-Encoding"))
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_from_directory(assets.directory, served, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+    # Ad içerikle değiştiği için yeniden doğrulamaya gerek yok
+    response.cache_control.immutable = True
+    response.cache_control.public = True
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
 # =====================================================
 #       Kullanıcı Kimlik Bilgileri (Hardcoded)
 # =====================================================
@@ -464,8 +582,8 @@ class FingerprintSensor:
             return False, ack_msg
 
 
-# Global sensor instance
-sensor = FingerprintSensor() if UART_AVAILABLE else None
+# Global sensor instance (daemon modunda seri port bu süreçte açılmaz)
+sensor = FingerprintSensor() if UART_AVAILABLE and SENSOR_MODE == "local" else None
 
 # Parmak izi donanımını eş zamanlı kullanımlardan korumak için kilit
 sensor_lock = threading.Lock()
@@ -476,7 +594,7 @@ sensor_paused = False  # Kayıt sırasında arka plan okumayı duraklatmak için
 
 def sensor_background_loop():
     """Parmak izi sensörünü sürekli aktif tutar ve eşleşmeleri işler."""
-    global last_error_event_time, last_display_event, sensor_paused
+    global last_error_event_time, sensor_paused
     log.info("SENSOR LOOP Başlatıldı")
     
     # Son başarılı okuma zamanı (gereksiz hata mesajlarını engellemek için)
@@ -514,13 +632,7 @@ def sensor_background_loop():
                     now_ts = time.time()
                     if consecutive_nouser_count >= 2 and (now_ts - last_error_event_time > 3.0):
                         last_error_event_time = now_ts
-                        last_display_event = {
-                            "event": "error",
-                            "timestamp": datetime.now().isoformat(),
-                            "user": None,
-                            "total_duration_minutes": 0,
-                            "msg": err,
-                        }
+                        publish_display_event("error", msg=err)
                         log.warning(f"SENSOR LOOP Kayıtsız parmak algılandı ({consecutive_nouser_count}x)")
                         consecutive_nouser_count = 0  # Bildirdikten sonra sıfırla
                         time.sleep(2.0)  # Tekrar tetiklemeyi önle
@@ -540,13 +652,7 @@ def sensor_background_loop():
                 log.error(f"SENSOR LOOP Yoklama hatası: {logic_err}")
                 # Kullanıcı veritabanında bulunamadıysa ekrana göster
                 if "bulunamadı" in logic_err.lower():
-                    last_display_event = {
-                        "event": "error",
-                        "timestamp": datetime.now().isoformat(),
-                        "user": None,
-                        "total_duration_minutes": 0,
-                        "msg": "Kullanıcı sistemde kayıtlı değil",
-                    }
+                    publish_display_event("error", msg="Kullanıcı sistemde kayıtlı değil")
                 time.sleep(2.0)
                 continue
 
@@ -564,15 +670,218 @@ def sensor_background_loop():
             traceback.print_exc()
             time.sleep(1.0)
 
+# =====================================================
+#       Sensör İşlemleri (yerel veya sensor_daemon.py)
+# =====================================================
+# Her yardımcı (cevap, http_status) döndürür; cevap API JSON'u ile aynıdır.
+# Daemon modunda aynı fonksiyonlar sensor_daemon.py içinde yerel olarak çalışır.
+
+def sensor_available():
+    return UART_AVAILABLE and sensor is not None and sensor.is_ready()
+
+def sensor_request(cmd, **params):
+    """Komutu sensor_daemon.py'ye iletir."""
+    try:
+        data = sensor_ipc.request(cmd, **params)
+    except sensor_ipc.SensorUnavailable as e:
+        log.error(f"IPC {e}")
+        return {"status": "error", "msg": str(e)}, 503
+    return data, data.pop("http_status", 200)
+
+def relay_display_event(event):
+    """Daemon'dan gelen olayı yerel olay yoluna aktar (panel_ui / SSE dinleyicileri)."""
+    publish_display_event(
+        event.get("event"),
+        user=event.get("user"),
+        total_duration_minutes=event.get("total_duration_minutes", 0),
+        msg=event.get("msg"),
+        timestamp=event.get("timestamp"),
+    )
+
+def match_and_record(timeout=15):
+    """Parmak okut; eşleşirse yoklamayı kaydet ve olayı yayınla."""
+    if SENSOR_MODE == "daemon":
+        return sensor_request("match", timeout=timeout)
+
+    if not sensor_available():
+        log.error("SENSOR Sensör müsait değil")
+        return {"status": "error", "msg": "Fingerprint sensor not available"}, 500
+
+    log.debug("SENSOR Calling sensor.match_fingerprint()...")
+    with sensor_lock:
+        fp_id, err = sensor.match_fingerprint(timeout=timeout, comparison_level=6, silent=False)
+
+    if fp_id is None:
+        err_msg = err or "Parmak izi eşleşmesi bulunamadı"
+        if err:  # Sadece gerçek hata varsa logla
+            log.warning(f"SENSOR Eşleşme başarısız: {err}")
+            publish_display_event("error", msg=err)
+        return {"status": "error", "msg": err_msg}, 400
+
+    log.info(f"SENSOR ✓ Eşleşme başarılı: fingerprint_id={fp_id}")
+
+    result, logic_err = process_attendance_event(fp_id)
+
+    if logic_err:
+        log.error(f"SENSOR ✗ Yoklama işleme hatası: {logic_err}")
+        publish_display_event("error", msg=logic_err)
+        return {"status": "error", "msg": logic_err}, 400
+
+    user_info = result['user']
+    user_name = f"{user_info['first_name']} {user_info['last_name']}"
+    event_text = "Giriş" if result['event'] == 'check_in' else "Çıkış"
+
+    log.info(f"SENSOR ✓ Yoklama kaydedildi: {event_text} - {user_name}")
+
+    # panel_ui.py'nin beklediği format
+    response_data = {
+        "status": "ok",
+        "event": result["event"],
+        "timestamp": result["timestamp"],
+        "user": {
+            "id": user_info["id"],
+            "first_name": user_info["first_name"],
+            "last_name": user_info["last_name"]
+        },
+        "fingerprint_id": fp_id
+    }
+
+    # Çıkış ise toplam saati de ekle
+    if result["event"] == "check_out" and "total_duration_minutes" in result:
+        response_data["total_duration_minutes"] = result["total_duration_minutes"]
+
+    return response_data, 200
+
+def enroll_next_fingerprint():
+    """Sıradaki boş ID ile yeni parmak izi kaydı yapar."""
+    global sensor_paused
+    if SENSOR_MODE == "daemon":
+        return sensor_request("enroll")
+
+    if not sensor_available():
+        log.error("SENSOR Sensör müsait değil")
+        return {"status": "error", "msg": "Fingerprint sensor not available"}, 500
+
+    try:
+        # Arka plan loop'u duraklat
+        sensor_paused = True
+        time.sleep(0.5)  # Loop'un kilidi bırakması için bekle
+
+        new_id = get_next_fingerprint_id_from_db()
+        log.info(f"SENSOR Yeni parmak izi kaydı başlatılıyor - ID={new_id}")
+
+        with sensor_lock:
+            ok, msg = sensor.enroll_fingerprint(new_id, timeout_per_step=20)
+
+        if ok:
+            log.info(f"SENSOR ✓ Parmak izi başarıyla kaydedildi - ID={new_id}")
+            return {
+                "status": "ok",
+                "msg": f"Parmak izi başarıyla kaydedildi (ID={new_id})",
+                "fingerprint_id": new_id
+            }, 200
+        log.error(f"SENSOR ✗ Parmak izi kaydı başarısız - ID={new_id}: {msg}")
+        return {"status": "error", "msg": msg or "Parmak izi kaydedilemedi - Tekrar deneyin"}, 400
+    finally:
+        # Her durumda arka plan loop'u devam ettir
+        sensor_paused = False
+
+def delete_sensor_fingerprint(fp_id):
+    """Parmak izini sensör hafızasından siler. Sensör yoksa status='skipped' döner."""
+    if SENSOR_MODE == "daemon":
+        return sensor_request("delete", fingerprint_id=fp_id)
+
+    if not sensor_available():
+        return {"status": "skipped", "msg": "Sensör müsait değil"}, 200
+
+    with sensor_lock:
+        ok, msg = sensor.delete_fingerprint(fp_id)
+    if ok:
+        return {"status": "ok", "msg": msg}, 200
+    return {"status": "error", "msg": msg}, 400
+
 # =====================================================
 #       DB Helpers
 # =====================================================
 
+# ensure_schema() çalıştırılmış veritabanı yolları (her dosya için bir kez)
+_schema_checked = set()
+
 def get_db():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    if DB_PATH not in _schema_checked:
+        ensure_schema(conn)
+        _schema_checked.add(DB_PATH)
+    return conn
+
+def get_report_db():
+    """Raporlama sorguları için salt-okunur snapshot bağlantısı (ana dosyaya yazma yok)."""
+    conn = connect_snapshot(DB_PATH)
+    conn.row_factory = sqlite3.Row
     return conn
 
+# =====================================================
+#       Sayfa Önbelleği (veri sürümüne göre)
+# =====================================================
+
+# (veritabanı, endpoint, parametreler, iş günü, veri sürümü, oturum kullanıcısı, gzip)
+#   -> (gövde, mimetype, etag, başlıklar)
+page_cache = LRUCache()
+CACHED_HEADERS = ("Content-Encoding", "Vary")
+
+def read_data_version(source):
+    """Sayfanın okuduğu kaynağın (ana dosya / snapshot) veri sürümü."""
+    conn = get_report_db() if source == "snapshot" else get_db()
+    try:
+        return get_data_version(conn)
+    finally:
+        conn.close()
+
+def cached_page(source="primary"):
+    """
+    Render edilen sayfayı veri sürümüyle anahtarlayarak önbelleğe alır ve ETag ekler.
+    Veri değişmediyse sorgu/render yapılmaz; tarayıcı If-None-Match ile 304 alır.
+    Bekleyen flash mesajı varsa önbellek atlanır (mesaj sayfaya gömülür).
+    source="snapshot": sayfa snapshot'tan okuyorsa sürüm de oradan okunur,
+    böylece snapshot yenilenmeden önce render edilen sayfa yeni sürümle saklanmaz.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if session.get("_flashes"):
+                return f(*args, **kwargs)
+            version = read_data_version(source)
+            if version is None:
+                return f(*args, **kwargs)
+
+            key = (
+                DB_PATH,
+                request.endpoint,
+                tuple(sorted(request.args.items(multi=True))),
+                get_current_work_day().isoformat(),
+                version,
+                session.get("user"),
+                "gzip" in request.accept_encodings,
+            )
+            entry = page_cache.get(key)
+            if entry is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+                entry = (body, response.mimetype, hashlib.sha1(body).hexdigest(), headers)
+                page_cache.put(key, entry)
+
+            response = app.response_class(entry[0], mimetype=entry[1], headers=entry[3])
+            response.set_etag(entry[2])
+            # Tarayıcı saklasın ama her seferinde doğrulasın (değişmediyse 304)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response.make_conditional(request)
+        return decorated_function
+    return decorator
+
 def init_db_if_needed():
     if not os.path.exists(DB_PATH):
         try:
@@ -580,6 +889,8 @@ def init_db_if_needed():
             log.info("DB init_db.py çalıştırıldı / tablo oluşturuldu.")
         except Exception as e:
             log.error(f"DB init_db import error: {e}")
+    else:
+        get_db().close()  # Şema güncellemeleri (presence, indeksler)
 
 def get_next_fingerprint_id_from_db():
     conn = get_db()
@@ -606,7 +917,6 @@ def process_attendance_event(fp_id: int):
     
     Toplam süre = SUM(duration_minutes WHERE date=today) = 60+120 = 180 dakika (3 saat)
     """
-    global last_display_event
     now = datetime.now()
     today_str = get_current_work_day().isoformat()
 
@@ -643,15 +953,13 @@ def process_attendance_event(fp_id: int):
             conn.close()
             return None, "Lütfen tekrar yoklama için 30 saniye bekleyin."
 
-    # Bugünkü açık kayıt var mı? (check_out NULL olan)
+    # Bugünkü açık kayıt var mı? (presence tablosundan birincil anahtar ile)
     twelve_hours_ago = (now - timedelta(hours=12)).isoformat()
     cur.execute("""
-        SELECT id, check_in
-        FROM attendance
-        WHERE user_id = ? AND date = ? AND check_out IS NULL
-          AND check_in >= ?
-        ORDER BY check_in DESC
-        LIMIT 1
+        SELECT a.id, a.check_in
+        FROM presence p
+        JOIN attendance a ON a.id = p.attendance_id
+        WHERE p.user_id = ? AND a.date = ? AND a.check_in >= ?
     """, (user_id, today_str, twelve_hours_ago))
     open_record = cur.fetchone()
     
@@ -663,25 +971,20 @@ def process_attendance_event(fp_id: int):
             INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes)
             VALUES (?, ?, ?, NULL, 0)
         """, (user_id, today_str, now.isoformat()))
+        new_id = cur.lastrowid
+        refresh_presence(cur, user_id)
         conn.commit()
         
-        new_id = cur.lastrowid
         log.info(f"ATTENDANCE ✓ Giriş: {user['first_name']} {user['last_name']} - {now.strftime('%H:%M:%S')} (Record ID: {new_id}, Date: {today_str})")
         
         conn.close()
 
-        # Panel için gösterilecek son olayı güncelle
-        last_display_event = {
-            "event": "check_in",
-            "timestamp": now.isoformat(),
-            "user": {
-                "id": user_id,
-                "first_name": user["first_name"],
-                "last_name": user["last_name"],
-            },
-            "total_duration_minutes": 0,
-            "msg": None,
-        }
+        # Panel için olayı yayınla
+        publish_display_event("check_in", timestamp=now.isoformat(), user={
+            "id": user_id,
+            "first_name": user["first_name"],
+            "last_name": user["last_name"],
+        })
         
         return {
             "event": "check_in",
@@ -720,6 +1023,7 @@ def process_attendance_event(fp_id: int):
             conn.close()
             return None, "Çıkış kaydı güncellenemedi."
         
+        refresh_presence(cur, user_id)
         conn.commit()
         log.debug(f"ATTENDANCE 💾 Çıkış kaydedildi - Record ID: {open_record['id']}, check_in: {check_in_dt.strftime('%H:%M')}, check_out: {now.strftime('%H:%M')}")
         
@@ -740,18 +1044,12 @@ def process_attendance_event(fp_id: int):
         log.info(f"ATTENDANCE ✓ Çıkış: {user['first_name']} {user['last_name']} - {now.strftime('%H:%M:%S')}")
         log.info(f"ATTENDANCE ⏱️  Oturum süresi: {hours}s {minutes}d | Günlük toplam: {total_duration_minutes} dakika")
 
-        # Panel için gösterilecek son olayı güncelle
-        last_display_event = {
-            "event": "check_out",
-            "timestamp": now.isoformat(),
-            "user": {
-                "id": user_id,
-                "first_name": user["first_name"],
-                "last_name": user["last_name"],
-            },
-            "total_duration_minutes": total_duration_minutes,
-            "msg": None,
-        }
+        # Panel için olayı yayınla
+        publish_display_event("check_out", timestamp=now.isoformat(), user={
+            "id": user_id,
+            "first_name": user["first_name"],
+            "last_name": user["last_name"],
+        }, total_duration_minutes=total_duration_minutes)
         
         return {
             "event": "check_out",
@@ -842,102 +1140,234 @@ def logout_page():
 #       Web Routes - Dashboard & Attendance
 # =====================================================
 
-@app.route("/")
-@login_required
-def dashboard_today():
+DASHBOARD_QUERY = """
+    SELECT 
+        u.id as user_id,
+        u.first_name, 
+        u.last_name,
+        MIN(a.check_in) as first_check_in,
+        MAX(a.check_out) as last_check_out,
+        SUM(a.duration_minutes) as total_duration,
+        MAX(a.id = p.attendance_id) as is_inside
+    FROM users u
+    LEFT JOIN attendance a ON u.id = a.user_id AND a.date = ?
+    LEFT JOIN presence p ON p.user_id = u.id
+    WHERE a.id IS NOT NULL {user_filter}
+    GROUP BY u.id, u.first_name, u.last_name
+    ORDER BY first_check_in
+"""
+
+def format_dashboard_record(r):
+    """Dashboard sorgu satırını şablonun beklediği sözlüğe çevirir."""
+    # Durum: presence bugünkü bir oturuma işaret ediyorsa içeride
+    status = "İçeride" if r["is_inside"] else "Dışarıda"
+
+    # Timestamp formatını düzelt
+    first_check_in_formatted = None
+    last_check_out_formatted = None
+    duration_str = ""
+    
+    if r["first_check_in"]:
+        dt = datetime.fromisoformat(r["first_check_in"])
+        first_check_in_formatted = dt.strftime("%d.%m.%Y %H:%M")
+    
+    if r["last_check_out"]:
+        dt = datetime.fromisoformat(r["last_check_out"])
+        last_check_out_formatted = dt.strftime("%d.%m.%Y %H:%M")
+    
+    # Toplam süreyi formatlı göster
+    total_duration = r["total_duration"] if r["total_duration"] else 0
+    if total_duration > 0:
+        hours = total_duration // 60
+        minutes = total_duration % 60
+        duration_str = f"{hours}s {minutes}d"
+
+    return {
+        "user_id": r["user_id"],
+        "first_name": r["first_name"],
+        "last_name": r["last_name"],
+        "first_check_in": first_check_in_formatted,
+        "last_check_out": last_check_out_formatted,
+        "duration_minutes": total_duration,
+        "duration_str": duration_str,
+        "status": status
+    }
+
+def get_dashboard_counts(conn, day_str):
+    """(bugün kaydı olan kullanıcı sayısı, şu an içeride olan sayısı) - indeks/presence üzerinden."""
+    total = conn.execute(
+        "SELECT COUNT(DISTINCT user_id) FROM attendance WHERE date = ?", (day_str,)
+    ).fetchone()[0]
+    inside = conn.execute("""
+        SELECT COUNT(*) FROM presence p
+        JOIN attendance a ON a.id = p.attendance_id
+        WHERE a.date = ?
+    """, (day_str,)).fetchone()[0]
+    return total, inside
+
+def publish_dashboard_delta(user_id):
+    """
+    Tek kullanıcının bugünkü satırını ve sayaçları yayınlar.
+    Açık dashboard yoksa (akış da polling de yok) sorgu yapılmaz; yeniden bağlanan
+    istemci 'reset' alıp sayfayı yeniler.
+    """
+    polling = time.time() - dashboard_bus.polled_at < DASHBOARD_POLL_SECONDS * 2
+    if not dashboard_bus.listeners and not polling:
+        dashboard_bus.publish({"event": "reset"})
+        return
+    today_str = get_current_work_day().isoformat()
+    try:
+        conn = get_db()
+        try:
+            row = conn.execute(DASHBOARD_QUERY.format(user_filter="AND u.id = ?"), (today_str, user_id)).fetchone()
+            total, inside = get_dashboard_counts(conn, today_str)
+        finally:
+            conn.close()
+        delta = {"date": today_str, "user_id": user_id, "total": total, "inside_count": inside}
+        if row:
+            with app.app_context():
+                delta["html"] = render_template("_dashboard_row.html", r=format_dashboard_record(row))
+            dashboard_bus.publish(dict(delta, event="row"))
+        else:
+            dashboard_bus.publish(dict(delta, event="remove"))
+    except Exception as e:
+        log.error(f"DASHBOARD Delta hatası (user_id={user_id}): {e}")
+
+def build_dashboard():
+    """Bugünün yoklama tablosu (HTML ve JSON görünümleri ortak kullanır)."""
     today_str = get_current_work_day().isoformat()
     conn = get_db()
-    cur = conn.cursor()
-    
     # Her kullanıcı için tüm giriş-çıkış kayıtlarını ve toplamlarını getir
-    cur.execute("""
-        SELECT 
-            u.id as user_id,
-            u.first_name, 
-            u.last_name,
-            MIN(a.check_in) as first_check_in,
-            MAX(a.check_out) as last_check_out,
-            SUM(a.duration_minutes) as total_duration,
-            COUNT(CASE WHEN a.check_out IS NULL THEN 1 END) as open_sessions
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.user_id AND a.date = ?
-        WHERE a.id IS NOT NULL
-        GROUP BY u.id, u.first_name, u.last_name
-        ORDER BY first_check_in
-    """, (today_str,))
-    rows = cur.fetchall()
+    rows = conn.execute(DASHBOARD_QUERY.format(user_filter=""), (today_str,)).fetchall()
     conn.close()
 
-    records = []
-    inside_count = 0
-    
-    for r in rows:
-        # Durum: Açık oturum varsa (check_out=NULL) içeride
-        if r["open_sessions"] > 0:
-            status = "İçeride"
-            inside_count += 1
-        else:
-            status = "Dışarıda"
+    records = [format_dashboard_record(r) for r in rows]
+    inside_count = sum(1 for r in records if r["status"] == "İçeride")
+    return {
+        "date": today_str,
+        "records": records,
+        "inside_count": inside_count,
+        "total": len(records),
+    }
 
-        # Timestamp formatını düzelt
-        first_check_in_formatted = None
-        last_check_out_formatted = None
-        duration_str = ""
-        
-        if r["first_check_in"]:
-            dt = datetime.fromisoformat(r["first_check_in"])
-            first_check_in_formatted = dt.strftime("%d.%m.%Y %H:%M")
-        
-        if r["last_check_out"]:
-            dt = datetime.fromisoformat(r["last_check_out"])
-            last_check_out_formatted = dt.strftime("%d.%m.%Y %H:%M")
-        
-        # Toplam süreyi formatlı göster
-        total_duration = r["total_duration"] if r["total_duration"] else 0
-        if total_duration > 0:
-            hours = total_duration // 60
-            minutes = total_duration % 60
-            duration_str = f"{hours}s {minutes}d"
-
-        records.append({
-            "first_name": r["first_name"],
-            "last_name": r["last_name"],
-            "first_check_in": first_check_in_formatted,
-            "last_check_out": last_check_out_formatted,
-            "duration_minutes": total_duration,
-            "duration_str": duration_str,
-            "status": status
-        })
+@app.route("/")
+@login_required
+@cached_page()
+def dashboard_today():
+    # Akış bu sayfanın render anından başlar (aradaki değişiklikler kaçmaz)
+    seq = dashboard_bus.seq
+    return render_template("index.html", seq=seq, poll_ms=DASHBOARD_POLL_SECONDS * 1000,
+                           **build_dashboard())
+
+USERS_PER_PAGE = 50
+# ?sort= değeri -> ORDER BY ifadesi (yalnızca bu liste kabul edilir)
+USER_SORTS = {
+    "id": "u.id",
+    "fingerprint_id": "u.fingerprint_id",
+    "first_name": "u.first_name COLLATE NOCASE",
+    "last_name": "u.last_name COLLATE NOCASE",
+    "department": "u.department COLLATE NOCASE",
+    "class": "u.class COLLATE NOCASE",
+    "position": "u.position COLLATE NOCASE",
+    "created_at": "u.created_at",
+}
 
-    return render_template(
-        "index.html",
-        date=today_str,
-        records=records,
-        inside_count=inside_count,
-        total=len(records),
-    )
+def parse_user_listing(args, per_page=USERS_PER_PAGE):
+    """?q=&sort=&dir=asc|desc&page=&per_page= parametrelerini okur. Hatalıysa ValueError."""
+    sort = args.get("sort", "id")
+    direction = args.get("dir", "asc")
+    if sort not in USER_SORTS:
+        raise ValueError(f"Bilinmeyen sıralama: {sort}")
+    if direction not in ("asc", "desc"):
+        raise ValueError("dir asc veya desc olmalı")
+    # Sayı olmayan değer varsayılana düşmez, hata verir (parse_int_arg)
+    page = parse_int_arg(args, "page")
+    page = 1 if page is None else page
+    requested = parse_int_arg(args, "per_page")
+    per_page = per_page if requested is None else requested
+    if page < 1 or (per_page is not None and per_page < 1):
+        raise ValueError("page ve per_page pozitif olmalı")
+    return {
+        "q": (args.get("q") or "").strip(),
+        "sort": sort,
+        "direction": direction,
+        "page": page,
+        "per_page": per_page,
+    }
 
-@app.route("/users")
-@admin_required
-def users_page():
+def user_match_query(q):
+    """Arama metnini FTS5 sorgusuna çevirir: her kelime önek olarak, hepsi birlikte (AND)."""
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{t}"*' for t in terms)
+
+def like_escape(text):
+    """LIKE joker karakterlerini (ESCAPE '\\' ile) kaçırır."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def user_like_filter(q, columns):
+    """
+    FTS5 yokken user_match_query'nin LIKE karşılığı: her kelime herhangi bir sütunda
+    bir kelimenin başında geçmeli, kelimeler birlikte (AND). Sonuç FTS5 desteğine göre değişmesin.
+    """
+    groups, params = [], []
+    for term in re.findall(r"\w+", q):
+        term = like_escape(term)
+        groups.append("(" + " OR ".join(
+            f"u.{c} LIKE ? ESCAPE '\\' OR u.{c} LIKE ? ESCAPE '\\'" for c in columns) + ")")
+        params += [f"{term}%", f"% {term}%"] * len(columns)
+    return "WHERE " + " AND ".join(groups), params
+
+def search_users(q="", sort="id", direction="asc", page=1, per_page=USERS_PER_PAGE):
+    """
+    Kullanıcı listesi (içeride bilgisiyle), arama + sıralama + sayfalama.
+    Arama users_fts (FTS5) indeksinden yapılır; indeks yoksa LIKE'a düşer.
+    per_page=None tüm kullanıcıları döndürür. HTML ve JSON görünümleri ortak kullanır.
+    """
     conn = get_db()
     cur = conn.cursor()
-    # Her kullanıcı için içeride mi kontrolüyle birlikte getir
-    cur.execute("""
+    joins = "FROM users u LEFT JOIN presence p ON p.user_id = u.id"
+    where, params = "", []
+    match = user_match_query(q)
+    if match and has_user_search(conn):
+        joins = "FROM users_fts f JOIN users u ON u.id = f.rowid LEFT JOIN presence p ON p.user_id = u.id"
+        where, params = "WHERE users_fts MATCH ?", [match]
+    elif match:
+        where, params = user_like_filter(q, user_search_columns(conn))
+
+    total = cur.execute(f"SELECT COUNT(*) {joins} {where}", params).fetchone()[0]
+    sql = f"""
         SELECT u.id, u.fingerprint_id, u.first_name, u.last_name, u.department, u.class, u.position, u.created_at,
-               (SELECT COUNT(1) FROM attendance a WHERE a.user_id = u.id AND a.check_out IS NULL) as open_sessions
-        FROM users u
-        ORDER BY u.id
-    """)
-    rows = cur.fetchall()
+               p.user_id IS NOT NULL as is_inside
+        {joins} {where}
+        ORDER BY {USER_SORTS[sort]} {direction.upper()}, u.id
+    """
+    if per_page is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = params + [per_page, (page - 1) * per_page]
+    rows = cur.execute(sql, params).fetchall()
     conn.close()
-    # Dict'e çevir
-    users = []
-    for r in rows:
-        user = dict(r)
-        user['is_inside'] = user.get('open_sessions', 0) > 0
-        users.append(user)
-    return render_template("users.html", users=users)
+    pages = max(1, -(-total // per_page)) if per_page else 1
+    return {
+        "users": [dict(r) for r in rows],
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+        "q": q,
+        "sort": sort,
+        "direction": direction,
+    }
+
+@app.route("/users")
+@admin_required
+@cached_page()
+def users_page():
+    try:
+        listing = search_users(**parse_user_listing(request.args))
+    except ValueError as e:
+        flash(f"Geçersiz liste isteği: {e}", "error")
+        return redirect(url_for("users_page"))
+    return render_template("users.html", **listing)
 
 @app.route("/users/new", methods=["GET", "POST"])
 @admin_required
@@ -1013,6 +1443,7 @@ def user_edit(user_id):
                 WHERE id = ?
             """, (first_name, last_name, department, class_name, position, user_id))
             conn.commit()
+            publish_dashboard_delta(user_id)
             
             log.info(f"USER EDIT ✓ Kullanıcı güncellendi ID={user_id}: {first_name} {last_name}")
             flash(f"✓ {first_name} {last_name} başarıyla güncellendi.", "success")
@@ -1058,21 +1489,22 @@ def user_delete(user_id):
     log.info(f"DELETE USER Siliniyor: ID={user_id}, fp_id={fp_id}, {first_name} {last_name}")
     
     # Önce sensörden parmak izini sil
-    if UART_AVAILABLE and sensor and sensor.is_ready():
-        log.info(f"DELETE USER Sensörden parmak izi siliniyor ID={fp_id}...")
-        ok, msg = sensor.delete_fingerprint(fp_id)
-        if ok:
-            log.info(f"DELETE USER ✓ Sensörden parmak izi silindi ID={fp_id}")
-        else:
-            log.error(f"DELETE USER ✗ Sensörden silinemedi ID={fp_id}: {msg}")
-            flash(f"⚠ Sensörden parmak izi silinemedi: {msg}", "warning")
-    else:
+    log.info(f"DELETE USER Sensörden parmak izi siliniyor ID={fp_id}...")
+    result, _ = delete_sensor_fingerprint(fp_id)
+    if result["status"] == "ok":
+        log.info(f"DELETE USER ✓ Sensörden parmak izi silindi ID={fp_id}")
+    elif result["status"] == "skipped":
         log.warning("DELETE USER Sensör müsait değil, sensörden silme atlandı.")
+    else:
+        log.error(f"DELETE USER ✗ Sensörden silinemedi ID={fp_id}: {result['msg']}")
+        flash(f"⚠ Sensörden parmak izi silinemedi: {result['msg']}", "warning")
     
     # Veritabanından kullanıcıyı sil
     cur.execute("DELETE FROM users WHERE id = ?", (user_id,))
+    cur.execute("DELETE FROM presence WHERE user_id = ?", (user_id,))
     conn.commit()
     conn.close()
+    publish_dashboard_delta(user_id)
     
     log.info(f"DELETE USER ✓ Veritabanından silindi ID={user_id}")
     
@@ -1093,7 +1525,7 @@ def admin_force_checkout(user_id):
         return redirect(url_for("users_page"))
 
     # Açık oturumu bul ve çıkış yap
-    cur.execute("SELECT id, check_in FROM attendance WHERE user_id = ? AND check_out IS NULL ORDER BY check_in DESC LIMIT 1", (user_id,))
+    cur.execute("SELECT attendance_id AS id, since AS check_in FROM presence WHERE user_id = ?", (user_id,))
     open_record = cur.fetchone()
     if not open_record:
         conn.close()
@@ -1106,35 +1538,62 @@ def admin_force_checkout(user_id):
     check_in_dt = datetime.fromisoformat(check_in_time)
     duration_minutes = int((now - check_in_dt).total_seconds() // 60)
     cur.execute("UPDATE attendance SET check_out = ?, duration_minutes = ? WHERE id = ?", (now.isoformat(), duration_minutes, open_record['id']))
+    refresh_presence(cur, user_id)
     conn.commit()
     conn.close()
+    publish_dashboard_delta(user_id)
     flash(f"{user['first_name']} {user['last_name']} için çıkış işlemi başarıyla yapıldı.", "success")
     return redirect(url_for("users_page"))
 
-@app.route("/weekly-summary")
-@admin_required
-def weekly_summary():
+# =====================================================
+#       Raporlar (tarih aralığı)
+# =====================================================
+
+REPORT_MAX_DAYS = 366       # Tek istekte izin verilen en geniş aralık
+# Excel geçici dosyaları - /tmp Pi'de tmpfs (RAM) olabilir, SD karta yazılır
+EXPORT_TMP_DIR = os.path.join(BASE_DIR, "data")
+XLSX_DIRECT_MAX_DAYS = 31   # Daha uzun Excel aralıkları istekte değil, iş kuyruğunda üretilir
+
+def parse_report_range(args, max_days=REPORT_MAX_DAYS):
     """
-    Haftalık toplam süreleri kullanıcı bazında hesaplar ve gösterir.
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD parametrelerini okur.
+    Verilmezse bu haftanın Pazartesi-Pazar aralığı döner. Hatalıysa ValueError.
+    max_days=None aralık sınırını kaldırır (akış halinde dışa aktarım).
     """
-    conn = get_db()
-    cur = conn.cursor()
-    # Pazartesi-Pazar haftası
     today = datetime.now().date()
-    weekday = today.weekday()  # Pazartesi=0
-    monday = today - timedelta(days=weekday)
-    sunday = monday + timedelta(days=6)
-    # Tarih aralığını stringe çevir
-    monday_str = monday.isoformat()
-    sunday_str = sunday.isoformat()
-    cur.execute("""
-        SELECT u.id, u.first_name, u.last_name, SUM(a.duration_minutes) as week_total
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.user_id AND a.date BETWEEN ? AND ?
-        GROUP BY u.id, u.first_name, u.last_name
-        ORDER BY week_total DESC
-    """, (monday_str, sunday_str))
-    rows = cur.fetchall()
+    monday = today - timedelta(days=today.weekday())
+    start_str = (args.get("from") or "").strip()
+    end_str = (args.get("to") or "").strip()
+    start = date.fromisoformat(start_str) if start_str else monday
+    end = date.fromisoformat(end_str) if end_str else start + timedelta(days=6)
+    if end < start:
+        raise ValueError("'to' tarihi 'from' tarihinden önce olamaz")
+    if max_days is not None and (end - start).days >= max_days:
+        raise ValueError(f"En fazla {max_days} günlük aralık istenebilir")
+    return start, end
+
+def parse_int_arg(args, name):
+    """Tamsayı sorgu parametresi; verilmemişse None, sayı değilse ValueError (filtre sessizce düşmesin)."""
+    value = (args.get(name) or "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' tamsayı olmalı: {value}")
+
+def parse_report_cursor(cursor):
+    """'YYYY-MM-DD:id' biçimindeki keyset imlecini (date, id) olarak çözer."""
+    if not cursor:
+        return None
+    day, _, last_id = cursor.partition(":")
+    date.fromisoformat(day)
+    return day, int(last_id)
+
+def build_weekly(start, end):
+    """Aralık toplamları, snapshot'tan (HTML ve JSON görünümleri ortak kullanır)."""
+    conn = get_report_db()
+    rows = get_range_totals(conn, start, end)
     conn.close()
     summary = []
     for r in rows:
@@ -1142,166 +1601,345 @@ def weekly_summary():
         hours = total // 60
         minutes = total % 60
         summary.append({
+            "user_id": r[0],
             "first_name": r[1],
             "last_name": r[2],
             "total_minutes": total,
             "duration_str": f"{hours}s {minutes}d"
         })
-    return render_template("weekly_summary.html", summary=summary, monday=monday_str, sunday=sunday_str)
+    return summary
+
+@app.route("/weekly-summary")
+@admin_required
+@cached_page(source="snapshot")
+def weekly_summary():
+    """
+    Toplam süreleri kullanıcı bazında hesaplar ve gösterir.
+    Varsayılan bu hafta (Pazartesi-Pazar); ?from=&to= ile herhangi bir aralık.
+    """
+    try:
+        start, end = parse_report_range(request.args)
+    except ValueError as e:
+        flash(f"Geçersiz tarih aralığı: {e}", "error")
+        return redirect(url_for("weekly_summary"))
+    # ?job=: uzun aralıklı Excel kuyrukta; sayfa hazır olmasını bekleyip indirir
+    job = report_jobs.get(request.args.get("job", ""))
+    job = report_job_payload(job) if job else None
+    return render_template("weekly_summary.html", summary=build_weekly(start, end),
+                           monday=start.isoformat(), sunday=end.isoformat(), job=job)
+
+def export_response(granularity, fmt, start, end, user_id=None, department=None, filename=None):
+    """
+    Dışa aktarım cevabı.
+    CSV akış halindedir: satırlar okundukça gönderilir. Excel (zip) ancak dosya
+    kapanınca tamamlandığı için akış değildir: constant_memory ile geçici dosyaya
+    yazılır, ilk bayt dosya bitince gider. Bu yüzden XLSX_DIRECT_MAX_DAYS'ten uzun
+    aralıklar buraya gelmez, iş kuyruğunda üretilir (queued_xlsx_response).
+    Dosya açıldıktan hemen sonra silinir ve açık tanıtıcıdan parça parça gönderilir.
+    """
+    filename = filename or report_export.export_filename(granularity, start, end, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if fmt == "csv":
+        def generate():
+            conn = get_report_db()
+            try:
+                rows = report_export.iter_export_rows(conn, granularity, start, end, user_id, department)
+                yield from report_export.iter_csv(granularity, rows)
+            finally:
+                conn.close()
+        return Response(stream_with_context(generate()), mimetype="text/csv", headers=headers)
+
+    import tempfile
+    os.makedirs(EXPORT_TMP_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=".xlsx", dir=EXPORT_TMP_DIR)
+    os.close(fd)
+    conn = get_report_db()
+    try:
+        rows = report_export.iter_export_rows(conn, granularity, start, end, user_id, department)
+        report_export.write_xlsx(path, granularity, rows)
+    except Exception:
+        os.remove(path)
+        raise
+    finally:
+        conn.close()
+    # Dosya açılıp hemen silinir: gövde hiç okunmasa da (HEAD, istemci kopması)
+    # diskte kalmaz; açık tanıtıcı cevap kapanınca kapatılır.
+    f = open(path, "rb")
+    os.remove(path)
+    headers["Content-Length"] = str(os.fstat(f.fileno()).st_size)
+    response = Response(report_export.iter_file_chunks(f), mimetype=report_export.XLSX_MIMETYPE,
+                        headers=headers, direct_passthrough=True)
+    response.call_on_close(f.close)
+    return response
+
+def queued_xlsx_response(params):
+    """
+    Uzun aralıklı Excel'i report_jobs kuyruğuna verir. Dosya hazırsa hemen indirilir;
+    değilse özet sayfasına ?job= ile dönülür, sayfa işi bekleyip indirmeyi başlatır.
+    """
+    job = report_jobs.submit(params, read_data_version("snapshot"))
+    if job["status"] == "done":
+        return report_job_download(job["id"])
+    flash("Uzun aralık: Excel dosyası arka planda hazırlanıyor, hazır olunca indirilecek.", "info")
+    args = {"job": job["id"]}
+    if (date.fromisoformat(params["to"]) - date.fromisoformat(params["from"])).days < REPORT_MAX_DAYS:
+        args.update({"from": params["from"], "to": params["to"]})  # Özet sayfası bu aralığı da gösterebilir
+    return redirect(url_for("weekly_summary", **args))
+
+def xlsx_is_long(start, end):
+    return (end - start).days + 1 > XLSX_DIRECT_MAX_DAYS
 
 @app.route("/weekly-summary-excel")
 @admin_required
 def weekly_summary_excel():
-    import io
-    import xlsxwriter
+    try:
+        start, end = parse_report_range(request.args)
+    except ValueError as e:
+        flash(f"Geçersiz tarih aralığı: {e}", "error")
+        return redirect(url_for("weekly_summary"))
+    if xlsx_is_long(start, end):
+        return queued_xlsx_response({"granularity": "summary", "format": "xlsx", "from": start.isoformat(),
+                                     "to": end.isoformat(), "user": None, "department": None})
+    filename = f"haftalik_ozet_{start.isoformat()}_to_{end.isoformat()}.xlsx"
+    return export_response("summary", "xlsx", start, end, filename=filename)
+
+def parse_export_args(args):
+    """Dışa aktarım parametrelerini doğrular; iş kuyruğu anahtarı olarak da kullanılır."""
+    granularity = args.get("granularity", "session")
+    fmt = args.get("format", "csv")
+    start, end = parse_report_range(args, max_days=None)
+    if granularity not in report_export.EXPORT_GRANULARITIES:
+        raise ValueError(f"Bilinmeyen ayrıntı düzeyi: {granularity}")
+    if fmt not in report_export.EXPORT_FORMATS:
+        raise ValueError(f"Bilinmeyen biçim: {fmt}")
+    user_id = parse_int_arg(args, "user")
+    department = (args.get("department") or "").strip() or None
+    return {
+        "granularity": granularity,
+        "format": fmt,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "user": user_id,
+        "department": department,
+    }
+
+@app.route("/reports/export")
+@admin_required
+def report_export_download():
+    """
+    Herhangi bir aralık için dışa aktarım:
+    ?from=&to=&granularity=session|day|week|summary&format=csv|xlsx&user=&department=
+    """
+    try:
+        params = parse_export_args(request.args)
+    except ValueError as e:
+        flash(f"Geçersiz dışa aktarım isteği: {e}", "error")
+        return redirect(url_for("weekly_summary"))
+    if params["format"] == "xlsx" and xlsx_is_long(date.fromisoformat(params["from"]),
+                                                   date.fromisoformat(params["to"])):
+        return queued_xlsx_response(params)
+    return export_response(params["granularity"], params["format"],
+                           date.fromisoformat(params["from"]), date.fromisoformat(params["to"]),
+                           params["user"], params["department"])
+
+# -------- Arka planda rapor üretimi --------
+
+def build_export_file(params, path):
+    """Rapor işini dosyaya yazar (report-worker thread'inde çalışır)."""
+    start, end = date.fromisoformat(params["from"]), date.fromisoformat(params["to"])
+    conn = get_report_db()
+    try:
+        rows = report_export.iter_export_rows(conn, params["granularity"], start, end,
+                                              params["user"], params["department"])
+        if params["format"] == "xlsx":
+            report_export.write_xlsx(path, params["granularity"], rows)
+        else:
+            with open(path, "wb") as f:
+                for chunk in report_export.iter_csv(params["granularity"], rows):
+                    f.write(chunk)
+    finally:
+        conn.close()
+
+report_jobs = ReportJobQueue(build_export_file)
+
+def report_job_payload(job):
+    payload = {
+        "id": job["id"],
+        "status": job["status"],
+        "params": job["params"],
+        "error": job["error"],
+        "status_url": url_for("api_report_job_status", job_id=job["id"]),
+    }
+    if job["status"] == "done":
+        payload["download_url"] = url_for("report_job_download", job_id=job["id"])
+    return payload
+
+@app.route("/api/reports/jobs", methods=["POST"])
+@admin_required
+def api_report_job_submit():
+    """
+    Dışa aktarımı kuyruğa ekler, hemen döner (202). Parametreler /reports/export ile aynı.
+    Aynı istek, veri sürümü değişmediyse hazır dosyayı döndürür (200).
+    """
+    try:
+        params = parse_export_args(request.values)
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+    job = report_jobs.submit(params, read_data_version("snapshot"))
+    return jsonify(report_job_payload(job)), 200 if job["status"] == "done" else 202
+
+@app.route("/api/reports/jobs/<job_id>", methods=["GET"])
+@admin_required
+def api_report_job_status(job_id):
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "msg": "İş bulunamadı"}), 404
+    return jsonify(report_job_payload(job))
+
+@app.route("/reports/jobs/<job_id>/download")
+@admin_required
+def report_job_download(job_id):
     from flask import send_file
-    conn = get_db()
-    cur = conn.cursor()
-    today = datetime.now().date()
-    weekday = today.weekday()
-    monday = today - timedelta(days=weekday)
-    sunday = monday + timedelta(days=6)
-    monday_str = monday.isoformat()
-    sunday_str = sunday.isoformat()
-    cur.execute("""
-        SELECT u.first_name, u.last_name, SUM(a.duration_minutes) as week_total
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.user_id AND a.date BETWEEN ? AND ?
-        GROUP BY u.id, u.first_name, u.last_name
-        ORDER BY week_total DESC
-    """, (monday_str, sunday_str))
-    rows = cur.fetchall()
-    conn.close()
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-    worksheet = workbook.add_worksheet('Haftalık Özet')
-    worksheet.write_row(0, 0, ['Ad', 'Soyad', 'Toplam Dakika', 'Saat:Dakika'])
-    highlight_format = workbook.add_format({'bg_color': '#dcfce7'})
-    for idx, row in enumerate(rows, 1):
-        total = row[2] if row[2] else 0
-        worksheet.write(idx, 0, row[0])
-        worksheet.write(idx, 1, row[1])
-        worksheet.write(idx, 2, total)
-        worksheet.write(idx, 3, f"{total//60} saat {total%60} dk")
-        if total >= 1080:
-            worksheet.set_row(idx, None, highlight_format)
-    workbook.close()
-    output.seek(0)
-    filename = f"haftalik_ozet_{monday_str}_to_{sunday_str}.xlsx"
-    return send_file(output, as_attachment=True, download_name=filename, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    job = report_jobs.get(job_id)
+    if job is None or job["status"] != "done" or not os.path.exists(job["path"]):
+        flash("Rapor hazır değil veya süresi doldu", "error")
+        return redirect(url_for("weekly_summary"))
+    params = job["params"]
+    filename = report_export.export_filename(params["granularity"], date.fromisoformat(params["from"]),
+                                             date.fromisoformat(params["to"]), params["format"])
+    mimetype = report_export.XLSX_MIMETYPE if params["format"] == "xlsx" else "text/csv"
+    return send_file(job["path"], as_attachment=True, download_name=filename, mimetype=mimetype)
+
+# -------- API: Raporlar (herhangi bir tarih aralığı) --------
+
+@app.route("/api/reports/attendance", methods=["GET"])
+@admin_required
+def api_reports_attendance():
+    """
+    Oturum listesi: ?from=&to=&user=&department=&after=&limit=
+    JSON akış halinde üretilir; limit verilirse 'next' imleci ile sonraki sayfa istenir.
+    """
+    try:
+        # Keyset sayfalı ve akış halinde: aralık sınırı gerekmez
+        start, end = parse_report_range(request.args, max_days=None)
+        user_id = parse_int_arg(request.args, "user")
+        department = (request.args.get("department") or "").strip() or None
+        after = parse_report_cursor(request.args.get("after"))
+        limit = parse_int_arg(request.args, "limit")
+        if limit is not None and limit <= 0:
+            raise ValueError("limit pozitif olmalı")
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+
+    def generate():
+        conn = get_report_db()
+        try:
+            yield json.dumps({"status": "ok", "from": start.isoformat(), "to": end.isoformat()})[:-1]
+            yield ', "rows": ['
+            count = 0
+            last = None
+            for row in iter_report_rows(conn, start, end, user_id, department, after, limit):
+                yield ("," if count else "") + json.dumps(row, ensure_ascii=False)
+                count += 1
+                last = row
+            next_cursor = None
+            if limit is not None and count == limit and last is not None:
+                next_cursor = f"{last['date']}:{last['id']}"
+            yield f'], "count": {count}, "next": {json.dumps(next_cursor)}}}'
+        finally:
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+# -------- API: Salt-okunur JSON (HTML sayfalarıyla aynı veriler) --------
+
+JSON_GZIP_MIN_BYTES = 512   # Bundan küçük cevaplar sıkıştırılmaz
+
+def select_fields(items, fields_arg):
+    """?fields=a,b ile her kayıttan yalnızca istenen alanları bırakır."""
+    if not fields_arg:
+        return items
+    fields = [f.strip() for f in fields_arg.split(",") if f.strip()]
+    if items:
+        unknown = [f for f in fields if f not in items[0]]
+        if unknown:
+            raise ValueError(f"Bilinmeyen alan: {', '.join(unknown)}")
+    return [{f: item[f] for f in fields} for item in items]
+
+def json_api_response(payload):
+    """Kompakt JSON; istemci destekliyorsa ve gövde büyükse gzip ile."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    response = app.response_class(body, mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    if len(body) >= JSON_GZIP_MIN_BYTES and "gzip" in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+@app.route("/api/dashboard", methods=["GET"])
+@login_required
+@cached_page()
+def api_dashboard():
+    """Bugünün yoklaması. ?fields=first_name,status"""
+    data = build_dashboard()
+    try:
+        data["records"] = select_fields(data["records"], request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+    return json_api_response(data)
+
+@app.route("/api/users", methods=["GET"])
+@admin_required
+@cached_page()
+def api_users():
+    """
+    Kullanıcı listesi. ?fields=id,first_name,is_inside
+    ?q=&sort=&dir=&page=&per_page= (per_page verilmezse tüm kullanıcılar)
+    """
+    try:
+        listing = search_users(**parse_user_listing(request.args, per_page=None))
+        listing["users"] = select_fields(listing["users"], request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+    return json_api_response(listing)
+
+@app.route("/api/weekly", methods=["GET"])
+@admin_required
+@cached_page(source="snapshot")
+def api_weekly():
+    """Aralık toplamları. ?from=&to= (varsayılan bu hafta), ?fields="""
+    try:
+        start, end = parse_report_range(request.args)
+        summary = select_fields(build_weekly(start, end), request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+    return json_api_response({"from": start.isoformat(), "to": end.isoformat(), "summary": summary})
 
 # -------- API: Enroll (UI'den "Parmak oku ve ID ver") --------
 
 @app.route("/api/scan-fingerprint", methods=["GET"])
 @admin_required
 def api_scan_fingerprint():
-    global sensor_paused
     log.info("API /api/scan-fingerprint çağrıldı")
-    
-    if not UART_AVAILABLE or not sensor or not sensor.is_ready():
-        log.error("API HATA: Sensör müsait değil")
-        return jsonify({"status": "error", "msg": "Fingerprint sensor not available"}), 500
-    
     try:
-        # Arka plan loop'u duraklat
-        sensor_paused = True
-        time.sleep(0.5)  # Loop'un kilidi bırakması için bekle
-        
-        new_id = get_next_fingerprint_id_from_db()
-        log.info(f"API Yeni parmak izi kaydı başlatılıyor - ID={new_id}")
-        
-        with sensor_lock:
-            ok, msg = sensor.enroll_fingerprint(new_id, timeout_per_step=20)
-        
-        if ok:
-            log.info(f"API ✓ Parmak izi başarıyla kaydedildi - ID={new_id}")
-            return jsonify({
-                "status": "ok",
-                "msg": f"Parmak izi başarıyla kaydedildi (ID={new_id})",
-                "fingerprint_id": new_id
-            })
-        else:
-            log.error(f"API ✗ Parmak izi kaydı başarısız - ID={new_id}: {msg}")
-            return jsonify({"status": "error", "msg": msg or "Parmak izi kaydedilemedi - Tekrar deneyin"}), 400
+        data, status = enroll_next_fingerprint()
+        return jsonify(data), status
     except Exception as e:
         log.error(f"API Exception in scan-fingerprint: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"status": "error", "msg": str(e)}), 500
-    finally:
-        # Her durumda arka plan loop'u devam ettir
-        sensor_paused = False
 
 # -------- API: Match + Attendance (Ana sayfa butonu) --------
 
 @app.route("/api/match-fingerprint", methods=["GET"])
 # @user_required  # Panel UI için session kontrolü kaldırıldı
 def api_match_fingerprint():
-    global last_display_event
     log.info("API /api/match-fingerprint çağrıldı")
-    
-    if not UART_AVAILABLE or not sensor or not sensor.is_ready():
-        log.error("API HATA: Sensör müsait değil")
-        return jsonify({"status": "error", "msg": "Fingerprint sensor not available"}), 500
-
     try:
-        log.debug("API Calling sensor.match_fingerprint()...")
-
-        with sensor_lock:
-            fp_id, err = sensor.match_fingerprint(timeout=15, comparison_level=6, silent=False)
-        
-        if fp_id is None:
-            err_msg = err or "Parmak izi eşleşmesi bulunamadı"
-            if err:  # Sadece gerçek hata varsa logla
-                log.warning(f"API Eşleşme başarısız: {err}")
-                last_display_event = {
-                    "event": "error",
-                    "timestamp": datetime.now().isoformat(),
-                    "user": None,
-                    "total_duration_minutes": 0,
-                    "msg": err,
-                }
-            return jsonify({"status": "error", "msg": err_msg}), 400
-
-        log.info(f"API ✓ Eşleşme başarılı: fingerprint_id={fp_id}")
-        
-        result, logic_err = process_attendance_event(fp_id)
-        
-        if logic_err:
-            log.error(f"API ✗ Yoklama işleme hatası: {logic_err}")
-            last_display_event = {
-                "event": "error",
-                "timestamp": datetime.now().isoformat(),
-                "user": None,
-                "total_duration_minutes": 0,
-                "msg": logic_err,
-            }
-            return jsonify({"status": "error", "msg": logic_err}), 400
-
-        user_info = result['user']
-        user_name = f"{user_info['first_name']} {user_info['last_name']}"
-        event_text = "Giriş" if result['event'] == 'check_in' else "Çıkış"
-        
-        log.info(f"API ✓ Yoklama kaydedildi: {event_text} - {user_name}")
-        
-        # API Response düzenle: panel_ui.py'nin beklediği format
-        response_data = {
-            "status": "ok",
-            "event": result["event"],
-            "timestamp": result["timestamp"],
-            "user": {
-                "id": user_info["id"],
-                "first_name": user_info["first_name"],
-                "last_name": user_info["last_name"]
-            },
-            "fingerprint_id": fp_id
-        }
-        
-        # Çıkış ise toplam saati de ekle
-        if result["event"] == "check_out" and "total_duration_minutes" in result:
-            response_data["total_duration_minutes"] = result["total_duration_minutes"]
-        
-        return jsonify(response_data)
+        data, status = match_and_record(timeout=15)
+        return jsonify(data), status
     except Exception as e:
         log.error(f"API Exception in match-fingerprint: {e}")
         import traceback
@@ -1309,53 +1947,202 @@ def api_match_fingerprint():
         return jsonify({"status": "error", "msg": str(e)}), 500
 
 
-# -------- API: Panel pasif bildirim --------
+# -------- API: Panel bildirimleri (long-poll + SSE) --------
+
+LONG_POLL_MAX_SECONDS = 30      # /api/last-event?timeout= üst sınırı
+SSE_KEEPALIVE_SECONDS = 15      # Olay yokken bağlantıyı canlı tutan yorum satırı aralığı
+MAX_STREAMS = 8                 # Aynı anda açık SSE / long-poll (serve: thread sayısının yarısı)
+DASHBOARD_MAX_LISTENERS = 4     # Açık dashboard akışı; fazlası polling'e geçer (panel akışına yer kalır)
+DASHBOARD_POLL_SECONDS = 10     # index.html polling aralığı
+
+class StreamSlots:
+    """
+    Uzun süren bağlantı (SSE, bekleyen long-poll) sayacı. Her biri bir worker thread'i
+    tuttuğu için limit dolunca yeni akış 503 alır; kalan thread'ler normal isteklere kalır.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def acquire(self):
+        with self.lock:
+            if self.count >= self.limit:
+                return False
+            self.count += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.count -= 1
+
+stream_slots = StreamSlots(MAX_STREAMS)
+
+def streams_busy_response():
+    """Akış limiti dolu: istemci Retry-After sonrası yeniden dener (veya polling'e geçer)."""
+    response = jsonify({"status": "error", "msg": "Too many open streams"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "10"
+    return response
 
 @app.route("/api/last-event", methods=["GET"])
 def api_last_event():
-    """Panel LCD pasif dinleme için son yoklama olayını döner ve sıfırlar."""
-    global last_display_event
+    """
+    Long-poll: ?after=<seq>&timeout=<saniye>
+    after'dan sonraki olayları döner; olay yoksa timeout kadar bekler.
+    after verilmezse beklemeden güncel seq döner (istemci buradan başlar).
+    """
+    after = request.args.get("after", type=int)
+    if after is None:
+        return jsonify({"status": "empty", "seq": event_bus.seq})
+
+    timeout = request.args.get("timeout", default=0.0, type=float)
+    timeout = max(0.0, min(timeout, LONG_POLL_MAX_SECONDS))
+    if timeout > 0 and not stream_slots.acquire():
+        return streams_busy_response()
+    try:
+        events, seq = event_bus.wait(after, timeout)
+    finally:
+        if timeout > 0:
+            stream_slots.release()
+    if not events:
+        return jsonify({"status": "empty", "seq": seq})
+    return jsonify({"status": "ok", "seq": seq, "events": events})
 
-    event_type = last_display_event.get("event")
-    if not event_type:
-        # Boş response'ları loglama
-        return jsonify({"status": "empty"})
+def sse_response(bus):
+    """
+    bus için Server-Sent Events cevabı. Yeniden bağlanan istemci Last-Event-ID ile
+    kaldığı yerden devam eder; arada halkadan düşen olay varsa 'reset' gönderilir.
+    Açık akış sayısı stream_slots limitindeyse 503 döner.
+    """
+    if not stream_slots.acquire():
+        return streams_busy_response()
+    after = request.headers.get("Last-Event-ID", type=int)
+    if after is None:
+        after = request.args.get("after", default=bus.seq, type=int)
+
+    def generate(after):
+        with bus.cond:
+            bus.listeners += 1
+        try:
+            yield "retry: 3000\n\n"
+            if bus.missed(after):
+                yield f"id: {bus.seq}\nevent: reset\ndata: {{}}\n\n"
+                after = bus.seq
+            while True:
+                events, seq = bus.wait(after, SSE_KEEPALIVE_SECONDS)
+                for e in events:
+                    yield f"id: {e['seq']}\nevent: {e['event']}\ndata: {json.dumps(e, ensure_ascii=False)}\n\n"
+                after = seq
+                if bus.closed:
+                    break  # Sunucu kapanıyor
+                if not events:
+                    yield ": keepalive\n\n"
+        finally:
+            with bus.cond:
+                bus.listeners -= 1
 
-    response_data = {
-        "status": "ok",
-        "event": event_type,
-        "timestamp": last_display_event.get("timestamp"),
-        "user": last_display_event.get("user"),
-        "total_duration_minutes": last_display_event.get("total_duration_minutes", 0),
-        "msg": last_display_event.get("msg"),
-    }
+    response = Response(generate(after), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # Akış hiç başlamasa da (HEAD, erken kopan istemci) yer geri verilir
+    response.call_on_close(stream_slots.release)
+    return response
 
-    # Sadece event varsa logla (log.info ile - debug değil)
-    user_info = response_data.get('user')
-    if user_info:
-        user_name = f"{user_info.get('first_name', '')} {user_info.get('last_name', '')}"
-        log.info(f"API /api/last-event -> {event_type} | {user_name}")
-    else:
-        log.info(f"API /api/last-event -> {event_type}")
-
-    # Bir kez okunduktan sonra sıfırla ki aynı event tekrar gösterilmesin
-    last_display_event = {
-        "event": None,
-        "timestamp": None,
-        "user": None,
-        "total_duration_minutes": 0,
-        "msg": None,
-    }
+@app.route("/api/events", methods=["GET"])
+def api_events():
+    """Panel olayları (check_in / check_out / error) SSE akışı."""
+    return sse_response(event_bus)
 
-    return jsonify(response_data)
+@app.route("/api/dashboard/stream", methods=["GET"])
+@login_required
+def api_dashboard_stream():
+    """
+    Dashboard satır değişiklikleri (row / remove / reset) SSE akışı.
+    DASHBOARD_MAX_LISTENERS açık akıştan sonrası 503 alır ve /api/dashboard/changes ile polling yapar.
+    """
+    if dashboard_bus.listeners >= DASHBOARD_MAX_LISTENERS:
+        return streams_busy_response()
+    return sse_response(dashboard_bus)
+
+@app.route("/api/dashboard/changes", methods=["GET"])
+@login_required
+def api_dashboard_changes():
+    """
+    Akış alamayan dashboard için polling: ?after=<seq> sonrası değişiklikler, beklemeden.
+    Arada halkadan düşen olay varsa yalnızca 'reset' döner.
+    """
+    try:
+        after = parse_int_arg(request.args, "after")
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+    dashboard_bus.polled_at = time.time()
+    if after is None or dashboard_bus.missed(after):
+        return jsonify({"seq": dashboard_bus.seq, "events": [{"event": "reset"}]})
+    events, seq = dashboard_bus.wait(after, 0)
+    return jsonify({"seq": seq, "events": events})
 
 # =====================================================
 
-if __name__ == "__main__":
+# =====================================================
+#       Başlatma (serve / dev)
+# =====================================================
+
+_background_lock = threading.Lock()
+_background_started = False
+
+def start_background_services():
+    """
+    Sensör döngüsü, yedekleme ve snapshot thread'lerini başlatır.
+    Süreç başına yalnızca bir kez çalışır; sonraki çağrılar False döner.
+    """
+    global _background_started, sensor_thread
+    with _background_lock:
+        if _background_started:
+            return False
+        _background_started = True
+
     init_db_if_needed()
-    if UART_AVAILABLE and sensor:
+    if SENSOR_MODE == "daemon":
+        # Sensör sensor_daemon.py'de; olaylarını panel dinleyicilerine aktar
+        sensor_ipc.start_event_relay(relay_display_event)
+        log.info("MAIN Sensör daemon modunda (sensor_daemon.py)")
+    elif UART_AVAILABLE and sensor:
         sensor_thread = threading.Thread(target=sensor_background_loop, daemon=True)
         sensor_thread.start()
         log.info("MAIN Arka plan parmak okuma başlatıldı")
-    # Flask sunucusunu başlat
-    app.run(host="0.0.0.0", port=5000)
+    # Periyodik online yedekleme (data/backups/)
+    start_backup_scheduler(DB_PATH)
+    # Raporlar için salt-okunur snapshot
+    start_snapshot_refresher(DB_PATH)
+    return True
+
+def main(argv=None):
+    import argparse
+    from utils import wsgi_server
+
+    parser = argparse.ArgumentParser(description="Parmak izi yoklama web sunucusu")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "dev"],
+                        help="serve: çok thread'li sunucu (varsayılan), dev: Flask geliştirme sunucusu")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=wsgi_server.SERVE_THREADS, help="Worker thread sayısı")
+    parser.add_argument("--timeout", type=int, default=wsgi_server.REQUEST_TIMEOUT, help="İstek zaman aşımı (saniye)")
+    parser.add_argument("--keepalive", type=int, default=wsgi_server.KEEPALIVE_TIMEOUT, help="Keep-alive bekleme süresi, 0 kapatır")
+    parser.add_argument("--drain", type=int, default=wsgi_server.DRAIN_TIMEOUT, help="Kapanırken süren isteklere tanınan süre")
+    args = parser.parse_args(argv)
+
+    start_background_services()
+    # Thread'lerin en az yarısı kısa isteklere (yoklama, giriş) kalsın
+    stream_slots.limit = max(1, args.threads // 2)
+
+    if args.command == "dev":
+        app.run(host=args.host, port=args.port, threaded=True)
+        return 0
+    # Kapanırken bekleyen long-poll / SSE dinleyicilerini hemen bırak
+    return wsgi_server.serve(app, host=args.host, port=args.port, threads=args.threads,
+                             timeout=args.timeout, keepalive=args.keepalive, drain=args.drain,
+                             on_shutdown=close_event_buses)
+
+if __name__ == "__main__":
+    sys.exit(main())
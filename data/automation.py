@@ -4,16 +4,30 @@ import gspread
 from time import sleep
 from datetime import datetime, timedelta
 import os
+import sys
 
 # --- Yapılandırma ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from utils.db_snapshot import connect_snapshot, ensure_fresh_snapshot, refresh_snapshot
+from utils.db_schema import ensure_schema_at, refresh_presence
 DB_PATH = os.path.join(SCRIPT_DIR, 'attendance.db')
 SHEET_TITLE = 'Laboratuvar Giriş Çıkış Takibi'
 CREDENTIALS_FILE = os.path.join(SCRIPT_DIR, 'service_account.json')
 UPDATE_INTERVAL_SECONDS = 10  # Google Sheets güncelleme aralığı
 MAX_WEEKS_TO_KEEP = 3  # En fazla 3 hafta tutulacak
 
+# ensure_schema çalıştırılmış veritabanı yolları
+_schema_checked = set()
+
+def ensure_db_schema():
+    """Veritabanı şemasını (presence tablosu, indeksler) bir kez günceller."""
+    if DB_PATH not in _schema_checked:
+        ensure_schema_at(DB_PATH)
+        _schema_checked.add(DB_PATH)
+
 def get_current_work_day():
     """
     24 saat sabah 6'dan sabah 6'ya (06:00-05:59).
@@ -46,6 +60,7 @@ def auto_checkout_forgotten_users():
     çıkış saatini 05:59 yapar.
     """
     try:
+        ensure_db_schema()
         current_work_day = get_current_work_day()
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
@@ -53,7 +68,7 @@ def auto_checkout_forgotten_users():
         # Bir önceki çalışma gününden bugüne kadar check_out NULL olanları bul
         # (check_in var, yani giriş yapmış ama çıkış yapmamış)
         c.execute("""
-            SELECT id, check_in, date
+            SELECT id, user_id, check_in, date
             FROM attendance
             WHERE check_out IS NULL 
               AND check_in IS NOT NULL
@@ -62,7 +77,8 @@ def auto_checkout_forgotten_users():
         
         forgotten_sessions = c.fetchall()
         
-        for session_id, check_in, session_date in forgotten_sessions:
+        closed_users = set()
+        for session_id, user_id, check_in, session_date in forgotten_sessions:
             # check_in tarihinin bir sonraki günü saat 05:59'u hesapla
             check_in_dt = datetime.fromisoformat(check_in)
             checkout_time = check_in_dt.replace(hour=5, minute=59, second=0) + timedelta(days=1)
@@ -76,9 +92,14 @@ def auto_checkout_forgotten_users():
                 SET check_out = ?, duration_minutes = ?
                 WHERE id = ?
             """, (checkout_time.isoformat(), duration_minutes, session_id))
+            closed_users.add(user_id)
             
             print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Otomatik çıkış: Session ID {session_id} -> {checkout_time.strftime('%H:%M')}")
         
+        # İçeridekiler tablosunu aynı transaction içinde güncelle
+        for user_id in closed_users:
+            refresh_presence(c, user_id)
+        
         conn.commit()
         conn.close()
         
@@ -88,10 +109,13 @@ def auto_checkout_forgotten_users():
         return 0
 
 def get_week_data(week_start, week_end):
-    """Belirli hafta için günlük bazda veritabanından veri çeker - her kullanıcı günde tek satır."""
+    """Belirli hafta için günlük bazda veritabanından veri çeker - her kullanıcı günde tek satır.
+    Okuma salt-okunur snapshot üzerinden yapılır (canlı dosyaya dokunulmaz)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        ensure_db_schema()
+        conn = connect_snapshot(DB_PATH)
         # Her kullanıcı için günlük: ilk giriş, son çıkış, toplam süre
+        # Durum presence tablosundan: açık oturum o güne aitse 'İçeride'
         query = f"""
             SELECT
                 T.date AS 'Tarih',
@@ -99,15 +123,10 @@ def get_week_data(week_start, week_end):
                 U.last_name AS 'Soyad',
                 U.department AS 'Departman',
                 MIN(T.check_in) AS 'İlk Giriş',
-                (SELECT check_out FROM attendance WHERE user_id = U.id 
-                 AND date = T.date
-                 AND check_out IS NOT NULL
-                 ORDER BY check_out DESC LIMIT 1) AS 'Son Çıkış',
+                MAX(T.check_out) AS 'Son Çıkış',
                 SUM(T.duration_minutes) AS 'Toplam Dakika',
                 CASE 
-                    WHEN (SELECT COUNT(*) FROM attendance WHERE user_id = U.id 
-                         AND date = T.date
-                         AND check_out IS NULL) > 0
+                    WHEN MAX(T.id = P.attendance_id) = 1
                     THEN 'İçeride'
                     ELSE 'Dışarıda'
                 END AS 'Durum'
@@ -115,6 +134,8 @@ def get_week_data(week_start, week_end):
                 attendance AS T
             JOIN
                 users AS U ON T.user_id = U.id
+            LEFT JOIN
+                presence AS P ON P.user_id = U.id
             WHERE
                 T.date >= '{week_start}' AND T.date <= '{week_end}'
             GROUP BY
@@ -314,7 +335,13 @@ def main_automation_loop():
     while True:
         try:
             # Otomatik çıkış kontrolü (her döngüde)
-            auto_checkout_forgotten_users()
+            closed = auto_checkout_forgotten_users()
+            
+            # Rapor snapshot'ını güncelle (otomatik çıkış yapıldıysa hemen)
+            if closed:
+                refresh_snapshot(DB_PATH)
+            else:
+                ensure_fresh_snapshot(DB_PATH, max_age=UPDATE_INTERVAL_SECONDS)
             
             # Google Sheets bağlantısı
             gc = gspread.service_account(filename=CREDENTIALS_FILE)
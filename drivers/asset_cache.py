@@ -0,0 +1,103 @@
+# asset_cache.py
+# LCD görselleri için ön-dönüştürülmüş RGB565 önbelleği.
+#
+# Her görsel (assets/home_bg.png gibi) yalnızca bir kez PIL ile açılıp ekran
+# boyutuna ölçeklenir ve big-endian RGB565 (ekrana gönderildiği bayt sırası)
+# olarak data/lcd_cache/ altına yazılır. Sonraki çizimlerde dosya mmap ile
+# açılır; PIL ve numpy hiç çalışmaz.
+#
+# Dosya adı kaynak yol + mtime + boyut + hedef çözünürlükten türetilir:
+# görsel değişince ad değişir ve yeniden dönüştürülür, eskisi silinir.
+
+import hashlib
+import mmap
+import os
+import sys
+import threading
+
+# Parent dizini path'e ekle (logger için)
+DRIVER_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(DRIVER_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+log = setup_logger("lcd")
+
+CACHE_DIR = os.path.join(BASE_DIR, "data", "lcd_cache")
+CACHE_SUFFIX = ".rgb565"
+
+
+def cache_path_for(image_path, width, height, cache_dir=CACHE_DIR):
+    """Kaynak dosyanın güncel hâline karşılık gelen önbellek dosyası yolu."""
+    st = os.stat(image_path)
+    source = os.path.abspath(image_path)
+    key = hashlib.sha1(f"{source}|{st.st_mtime_ns}|{st.st_size}|{width}x{height}".encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(cache_dir, f"{stem}.{width}x{height}.{key}{CACHE_SUFFIX}")
+
+
+def convert_image(image_path, width, height):
+    """Görseli width x height boyutunda big-endian RGB565 baytlarına çevirir (PIL + numpy)."""
+    from PIL import Image
+    import numpy as np
+
+    img = Image.open(image_path).convert("RGB")
+    if img.size != (width, height):
+        log.debug(f"Image resized from {img.size[0]}x{img.size[1]} to {width}x{height}")
+        img = img.resize((width, height), Image.LANCZOS)
+    arr = np.asarray(img, dtype=np.uint16)
+    arr565 = ((arr[:, :, 0] & 0xF8) << 8) | ((arr[:, :, 1] & 0xFC) << 3) | ((arr[:, :, 2] & 0xF8) >> 3)
+    return arr565.astype(">u2").tobytes()
+
+
+class AssetCache:
+    """
+    load() görselin RGB565 baytlarını salt-okunur mmap olarak döndürür.
+    Açılan eşlemeler süreç boyunca tutulur; kaynak değişmedikçe tekrar açılmaz.
+    Kaynak değişince eski eşleme kapatılmaz, yalnızca bırakılır: sürücü onu hâlâ
+    zemin olarak tutuyor olabilir (ILI9486.background). Referansı kalmayınca kapanır.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.maps = {}      # (kaynak, w, h) -> (önbellek yolu, mmap)
+        self.lock = threading.Lock()
+
+    def load(self, image_path, width, height):
+        path = cache_path_for(image_path, width, height, self.cache_dir)
+        key = (os.path.abspath(image_path), width, height)
+        with self.lock:
+            entry = self.maps.get(key)
+            if entry and entry[0] == path:
+                return entry[1]
+            if not os.path.exists(path) or os.path.getsize(path) != width * height * 2:
+                self._build(image_path, width, height, path)
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[key] = (path, data)
+            return data
+
+    def _build(self, image_path, width, height, path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = convert_image(image_path, width, height)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        log.info(f"Image cached: {image_path} -> {os.path.basename(path)}")
+
+        # Aynı görselin eski sürümlerini sil
+        prefix = os.path.basename(path).rsplit(".", 2)[0] + "."
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(CACHE_SUFFIX) and name != os.path.basename(path):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def close(self):
+        with self.lock:
+            for _, data in self.maps.values():
+                data.close()
+            self.maps.clear()
+
+
+asset_cache = AssetCache()
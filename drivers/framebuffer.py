@@ -0,0 +1,128 @@
+# framebuffer.py
+# LCD için bellekte RGB565 çerçeve tamponu ve kirli dikdörtgen (dirty rect) hesabı.
+#
+# Çizimler önce bu tampona yapılır; flush() ekrana en son gönderilen kareyle
+# karşılaştırıp yalnızca değişen bölgeleri gönderir. Aynı arka plan üzerinde
+# ekran değişirken (ana ekran -> "GIRIS YAPILDI") yalnızca yazıların olduğu
+# şeritler veri yolundan geçer.
+#
+# Pikseller big-endian uint16 tutulur: bir bölgenin tobytes() çıktısı doğrudan
+# ekrana gönderilecek bayt sırasıdır.
+
+import numpy as np
+
+# Aynı satır bandında bu kadar pikselden geniş değişmeyen boşluk varsa
+# bölge ikiye ayrılır (adres penceresi kurmak ~11 bayt, boşluk göndermekten ucuz)
+COLUMN_SPLIT_GAP = 32
+
+# Bu kadar ve daha uzun aynı renkli piksel dizileri bus.fill ile gönderilir
+MIN_FILL_RUN = 8
+
+
+def pixel_runs(data, min_run=MIN_FILL_RUN):
+    """
+    Big-endian RGB565 baytlarını (başlangıç, bitiş, renk) parçalarına ayırır (piksel
+    indeksleri, bitiş hariç). En az min_run uzunluğundaki tek renk dizilerinde renk
+    verilir; aradaki karışık bölgeler renk=None ile ham gönderilir.
+    """
+    px = np.frombuffer(data, dtype=">u2")
+    n = px.size
+    if n == 0:
+        return []
+    change = np.flatnonzero(px[1:] != px[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [n]))
+
+    segments = []
+    pos = 0
+    for i in np.flatnonzero(ends - starts >= min_run):
+        start, end = int(starts[i]), int(ends[i])
+        if start > pos:
+            segments.append((pos, start, None))
+        segments.append((start, end, int(px[start])))
+        pos = end
+    if pos < n:
+        segments.append((pos, n, None))
+    return segments
+
+
+class FrameBuffer:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width), dtype=">u2")
+        # Ekranda olduğu bilinen kare; None ise ekran içeriği bilinmiyor (tamamı kirli)
+        self.shown = None
+
+    def _clip(self, x, y, w, h):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def fill_rect(self, x, y, w, h, color):
+        clipped = self._clip(x, y, w, h)
+        if clipped:
+            x0, y0, x1, y1 = clipped
+            self.pixels[y0:y1, x0:x1] = color
+
+    def fill(self, color):
+        self.pixels[:, :] = color
+
+    def blit(self, x, y, w, h, data):
+        """Hazır big-endian RGB565 baytlarını (w*h piksel) (x, y)'ye kopyalar."""
+        block = np.frombuffer(data, dtype=">u2", count=w * h).reshape(h, w)
+        clipped = self._clip(x, y, w, h)
+        if clipped:
+            x0, y0, x1, y1 = clipped
+            self.pixels[y0:y1, x0:x1] = block[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    def snapshot(self):
+        """Tamponun kopyası (ör. bir ekranın sabit katmanı)."""
+        return self.pixels.copy()
+
+    def restore(self, snapshot):
+        """snapshot() ile alınan kopyayı tampona geri yazar."""
+        np.copyto(self.pixels, snapshot)
+
+    def dirty_rects(self):
+        """
+        Gösterilen kareden farklı bölgeleri (x0, y0, x1, y1) dahil sınırlarla döndürür.
+        Ardışık değişen satırlar bir bant olur; bant içinde geniş boşluklar ayrı bölgedir.
+        """
+        if self.shown is None:
+            return [(0, 0, self.width - 1, self.height - 1)]
+        diff = self.pixels != self.shown
+        rows = np.flatnonzero(diff.any(axis=1))
+        if rows.size == 0:
+            return []
+
+        rects = []
+        # Satırları ardışık bantlara böl
+        breaks = np.flatnonzero(np.diff(rows) > 1)
+        starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+        ends = np.concatenate((rows[breaks], [rows[-1]]))
+        for y0, y1 in zip(starts, ends):
+            cols = np.flatnonzero(diff[y0:y1 + 1].any(axis=0))
+            gaps = np.flatnonzero(np.diff(cols) > COLUMN_SPLIT_GAP)
+            col_starts = np.concatenate(([cols[0]], cols[gaps + 1]))
+            col_ends = np.concatenate((cols[gaps], [cols[-1]]))
+            for x0, x1 in zip(col_starts, col_ends):
+                rects.append((int(x0), int(y0), int(x1), int(y1)))
+        return rects
+
+    def region_bytes(self, x0, y0, x1, y1):
+        """Bölgenin ekrana gidecek baytları (satır satır)."""
+        return self.pixels[y0:y1 + 1, x0:x1 + 1].tobytes()
+
+    def mark_shown(self):
+        """Tamponun tamamının ekrana gönderildiğini kaydeder."""
+        if self.shown is None:
+            self.shown = self.pixels.copy()
+        else:
+            np.copyto(self.shown, self.pixels)
+
+    def invalidate(self):
+        """Ekran içeriği bilinmiyor (ör. doğrudan çizim yapıldı): sonraki flush tam kare gönderir."""
+        self.shown = None
@@ -0,0 +1,72 @@
+# glyphs.py
+# 5x7 font için hazır glif ve satır önbelleği.
+#
+# draw_char her yanan piksel için ayrı adres penceresi açıyordu. Burada her
+# karakter (karakter, ölçek) başına bir kez bit maskesine çevrilir; bir metin
+# satırı maskeler yan yana dizilerek tek blok olarak üretilir ve tek adres
+# penceresiyle gönderilir. Renklendirilmiş satırlar (metin, ölçek, yazı rengi,
+# zemin rengi) anahtarıyla LRU önbellekte tutulur.
+#
+# Hücre boyutu draw_text ile aynıdır: (5 + 1) x (7 + 1) piksel * ölçek.
+
+from collections import OrderedDict
+
+import numpy as np
+
+CELL_W = 6
+CELL_H = 8
+LINE_CACHE_SIZE = 128
+
+
+class GlyphCache:
+    def __init__(self, font, line_cache_size=LINE_CACHE_SIZE):
+        self.font = font
+        self.masks = {}
+        self.lines = OrderedDict()
+        self.line_cache_size = line_cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def glyph_mask(self, ch, size):
+        """Karakter hücresinin (8*size x 6*size) maskesi; True = yazı pikseli."""
+        key = (ch, size)
+        mask = self.masks.get(key)
+        if mask is None:
+            pattern = self.font.get(ch, self.font[' '])
+            cell = np.zeros((CELL_H, CELL_W), dtype=bool)
+            for col in range(5):
+                for row in range(7):
+                    cell[row, col] = (pattern[col] >> row) & 0x01
+            mask = np.kron(cell, np.ones((size, size), dtype=bool))
+            self.masks[key] = mask
+        return mask
+
+    def line_mask(self, text, size):
+        if not text:
+            return np.zeros((CELL_H * size, 0), dtype=bool)
+        return np.hstack([self.glyph_mask(ch, size) for ch in text])
+
+    def line_block(self, text, size, fg, bg):
+        """Satırın zemin rengiyle boyanmış RGB565 bloğu (big-endian, satır x sütun)."""
+        key = (text, size, fg, bg)
+        block = self.lines.get(key)
+        if block is not None:
+            self.lines.move_to_end(key)
+            self.hits += 1
+            return block
+        self.misses += 1
+        block = np.where(self.line_mask(text, size), fg, bg).astype(">u2")
+        self.lines[key] = block
+        while len(self.lines) > self.line_cache_size:
+            self.lines.popitem(last=False)
+        return block
+
+    def compose(self, text, size, fg, background):
+        """
+        Satırı verilen arka plan bölgesinin üzerine yazar (zemin boyanmaz).
+        background: satırın kapladığı (kırpılmış) bölgenin RGB565 pikselleri.
+        """
+        h, w = background.shape
+        block = background.astype(">u2", copy=True)
+        block[self.line_mask(text, size)[:h, :w]] = fg
+        return block
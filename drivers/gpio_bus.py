@@ -0,0 +1,244 @@
+# gpio_bus.py
+# ILI9486 paralel arayüzü (8 veri hattı + WR/RS/CS/RST) için veri yolu arka uçları.
+#
+#   GpioMemBus  : /dev/gpiomem'i mmap ile açar, baytı GPSET0/GPCLR0 register'larına
+#                 önceden hesaplanmış 256 girişlik set/clear maske tablosuyla tek seferde
+#                 yazar (bayt başına 3 register yazımı; RPi.GPIO ile 10 çağrı)
+#   RPiGPIOBus  : RPi.GPIO ile pin pin yazım (yedek; gpiomem açılamazsa)
+#
+# Her iki yol da hatlarda duran son baytı hatırlar: aynı bayt tekrar gelirse veri
+# hatlarına yazılmaz, yalnızca WR darbesi verilir. fill(hi, lo, count) tek renkli
+# alanlar içindir; hi == lo ise veri yolu bir kez kurulur ve yalnızca WR çekilir.
+#
+# open_bus() LCD_BUS ortam değişkenine göre seçer: auto (varsayılan) | gpiomem | rpi | virtual
+# (virtual: donanımsız, virtual_lcd.py)
+# Testler için GpioMemBus'a /dev/gpiomem yerine anonim bir mmap verilebilir
+# (open_fake_gpiomem); register'lara yazılanlar doğrudan okunabilir.
+
+import mmap
+import os
+import sys
+
+# Parent dizini path'e ekle (logger için)
+DRIVER_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(DRIVER_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+log = setup_logger("lcd")
+
+GPIO_MEM_PATH = "/dev/gpiomem"
+GPIO_BLOCK_SIZE = 4096
+
+# BCM2835/2711 GPIO register ofsetleri (bayt)
+GPFSEL0 = 0x00
+GPSET0 = 0x1C
+GPCLR0 = 0x28
+GPLEV0 = 0x34
+
+# Pi 5'te GPIO'lar RP1 üzerinde, register düzeni farklı - gpiomem yolu kullanılamaz
+UNSUPPORTED_SOCS = ("brcm,bcm2712",)
+
+
+def build_mask_tables(data_pins):
+    """Her bayt değeri için (GPSET0 maskesi, GPCLR0 maskesi) tabloları."""
+    set_masks = []
+    clr_masks = []
+    for value in range(256):
+        set_mask = clr_mask = 0
+        for bit, pin in enumerate(data_pins):
+            if (value >> bit) & 1:
+                set_mask |= 1 << pin
+            else:
+                clr_mask |= 1 << pin
+        set_masks.append(set_mask)
+        clr_masks.append(clr_mask)
+    return set_masks, clr_masks
+
+
+def open_fake_gpiomem():
+    """/dev/gpiomem yerine geçen anonim bellek (testler ve donanımsız çalışma için)."""
+    return mmap.mmap(-1, GPIO_BLOCK_SIZE)
+
+
+def gpiomem_supported():
+    try:
+        with open("/proc/device-tree/compatible", "rb") as f:
+            compatible = f.read().decode("ascii", "ignore")
+    except OSError:
+        compatible = ""
+    if any(soc in compatible for soc in UNSUPPORTED_SOCS):
+        return False
+    return os.path.exists(GPIO_MEM_PATH)
+
+
+class GpioMemBus:
+    """GPIO register'larına doğrudan yazan veri yolu."""
+
+    name = "gpiomem"
+
+    def __init__(self, data_pins, wr_pin, control_pins, mem=None):
+        if mem is None:
+            fd = os.open(GPIO_MEM_PATH, os.O_RDWR | os.O_SYNC)
+            try:
+                mem = mmap.mmap(fd, GPIO_BLOCK_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            finally:
+                os.close(fd)
+        self.mem = mem
+        self.regs = memoryview(mem).cast("I")
+        self.data_pins = list(data_pins)
+        self.wr_mask = 1 << wr_pin
+        self.set_masks, self.clr_masks = build_mask_tables(self.data_pins)
+        self.last = None    # veri hatlarındaki son bayt
+        for pin in self.data_pins + [wr_pin] + list(control_pins):
+            self.setup_output(pin)
+
+    def setup_output(self, pin):
+        """GPFSELn içinde pinin 3 bitlik fonksiyonunu 001 (çıkış) yapar."""
+        index = GPFSEL0 // 4 + pin // 10
+        shift = (pin % 10) * 3
+        self.regs[index] = (self.regs[index] & ~(0b111 << shift)) | (0b001 << shift)
+
+    def set_pin(self, pin, value):
+        if value:
+            self.regs[GPSET0 // 4] = 1 << pin
+        else:
+            self.regs[GPCLR0 // 4] = 1 << pin
+
+    def write_byte(self, value):
+        if value == self.last:
+            return
+        self.regs[GPCLR0 // 4] = self.clr_masks[value]
+        self.regs[GPSET0 // 4] = self.set_masks[value]
+        self.last = value
+
+    def strobe(self):
+        self.regs[GPCLR0 // 4] = self.wr_mask
+        self.regs[GPSET0 // 4] = self.wr_mask
+
+    def write_bytes(self, data):
+        """
+        Baytları sırayla gönderir. WR'yi düşürmek veri hatlarının temizlenmesiyle
+        aynı yazımda yapılır; ILI9486 veriyi WR'nin yükselen kenarında alır.
+        Bir önceki baytla aynı olan bayt için yalnızca WR darbesi verilir.
+        """
+        regs = self.regs
+        set_reg, clr_reg = GPSET0 // 4, GPCLR0 // 4
+        set_masks, clr_masks = self.set_masks, self.clr_masks
+        wr = self.wr_mask
+        last = self.last
+        for value in data:
+            if value == last:
+                regs[clr_reg] = wr
+                regs[set_reg] = wr
+                continue
+            regs[clr_reg] = clr_masks[value] | wr
+            regs[set_reg] = set_masks[value]
+            regs[set_reg] = wr
+            last = value
+        self.last = last
+
+    def fill(self, hi, lo, count):
+        """Aynı 16-bit pikseli (hi, lo) count kez gönderir."""
+        if count <= 0:
+            return
+        if hi == lo:
+            # Veri hatları hiç değişmez: bir kez kur, yalnızca WR çek
+            self.write_byte(hi)
+            regs = self.regs
+            set_reg, clr_reg = GPSET0 // 4, GPCLR0 // 4
+            wr = self.wr_mask
+            for _ in range(count * 2):
+                regs[clr_reg] = wr
+                regs[set_reg] = wr
+            return
+        self.write_bytes(bytes((hi, lo)) * count)
+
+    def cleanup(self):
+        self.regs.release()
+        self.mem.close()
+
+
+class RPiGPIOBus:
+    """RPi.GPIO ile pin pin yazan veri yolu (yedek)."""
+
+    name = "rpi"
+
+    def __init__(self, data_pins, wr_pin, control_pins):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        self.data_pins = list(data_pins)
+        self.wr_pin = wr_pin
+        self.last = None    # veri hatlarındaki son bayt
+        GPIO.setmode(GPIO.BCM)
+        for pin in self.data_pins + [wr_pin] + list(control_pins):
+            GPIO.setup(pin, GPIO.OUT)
+
+    def set_pin(self, pin, value):
+        self.GPIO.output(pin, value)
+
+    def write_byte(self, value):
+        # 8-bit değeri D0..D7 pinlerine bas; yalnızca değişen bitler yazılır
+        last = self.last
+        changed = 0xFF if last is None else value ^ last
+        if not changed:
+            return
+        for i, pin in enumerate(self.data_pins):
+            if (changed >> i) & 0x01:
+                self.GPIO.output(pin, (value >> i) & 0x01)
+        self.last = value
+
+    def strobe(self):
+        self.GPIO.output(self.wr_pin, 0)
+        self.GPIO.output(self.wr_pin, 1)
+
+    def write_bytes(self, data):
+        for value in data:
+            self.write_byte(value)
+            self.strobe()
+
+    def fill(self, hi, lo, count):
+        """Aynı 16-bit pikseli (hi, lo) count kez gönderir."""
+        if hi == lo:
+            self.write_byte(hi)
+            for _ in range(count * 2):
+                self.strobe()
+            return
+        for _ in range(count):
+            self.write_byte(hi)
+            self.strobe()
+            self.write_byte(lo)
+            self.strobe()
+
+    def cleanup(self):
+        self.GPIO.cleanup()
+
+
+def open_bus(data_pins, wr_pin, control_pins, kind=None):
+    """
+    Veri yolunu açar. kind verilmezse LCD_BUS ortam değişkeni (varsayılan auto):
+    auto'da gpiomem açılamazsa RPi.GPIO'ya düşülür.
+    control_pins sırası: RS, CS, RST.
+    """
+    kind = kind or os.environ.get("LCD_BUS", "auto")
+    if kind == "virtual":
+        from virtual_lcd import VirtualBus
+        log.info("LCD veri yolu: sanal (donanımsız)")
+        return VirtualBus(rs_pin=control_pins[0])
+    if kind == "rpi":
+        return RPiGPIOBus(data_pins, wr_pin, control_pins)
+    if kind == "gpiomem":
+        return GpioMemBus(data_pins, wr_pin, control_pins)
+    if kind != "auto":
+        raise ValueError(f"Bilinmeyen LCD_BUS: {kind}")
+
+    if gpiomem_supported():
+        try:
+            bus = GpioMemBus(data_pins, wr_pin, control_pins)
+            log.info("LCD veri yolu: /dev/gpiomem")
+            return bus
+        except OSError as e:
+            log.warning(f"/dev/gpiomem açılamadı ({e}), RPi.GPIO kullanılacak")
+    log.info("LCD veri yolu: RPi.GPIO")
+    return RPiGPIOBus(data_pins, wr_pin, control_pins)
@@ -4,8 +4,18 @@
 #
 # Ek olarak:
 # - 5x7 bitmap font ile draw_char / draw_text fonksiyonları eklendi.
+# - draw_image görselleri data/lcd_cache/ altındaki RGB565 önbelleğinden çizer (asset_cache.py).
+# - Pinlere yazım gpio_bus.py'deki veri yolu üzerinden yapılır (/dev/gpiomem veya RPi.GPIO).
+# - buffered=True ile çizimler bellekteki çerçeve tamponuna yapılır, flush() yalnızca
+#   değişen bölgeleri gönderir (framebuffer.py).
+# - draw_text her satırı glyphs.py'deki önbellekten tek adres penceresiyle gönderir
+#   (numpy yoksa eski piksel piksel çizime düşülür).
+# - Tek renkli alanlar (fill_screen, fill_rect, gönderilen baytlardaki uzun diziler)
+#   bus.fill ile gönderilir: hi == lo ise veri hatları bir kez kurulur, yalnızca WR çekilir.
+# - save_layer / restore_layer: tamponlu modda ekranların sabit katmanları adıyla saklanır.
+# - define_scroll_area / scroll_to: denetleyicinin donanım kaydırması (0x33 / 0x37).
+#   Panel yatay (MADCTL MV=1) kullanıldığı için "dikey" kaydırma ekranda x ekseninde olur.
 
-import RPi.GPIO as GPIO
 import time
 import os
 import sys
@@ -14,8 +24,20 @@ import sys
 DRIVER_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(DRIVER_DIR)
 sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, DRIVER_DIR)
 
 from logger import setup_logger
+from asset_cache import asset_cache
+from gpio_bus import open_bus
+
+try:
+    import numpy as np
+    from glyphs import GlyphCache
+    from framebuffer import pixel_runs
+except ImportError:
+    np = None
+    GlyphCache = None
+    pixel_runs = None
 
 # Logger oluştur
 log = setup_logger("lcd")
@@ -82,52 +104,59 @@ FONT_5x7 = {
 
 
 class ILI9486:
-    def __init__(self):
-        GPIO.setmode(GPIO.BCM)
-        # data pinleri output
-        for p in DATA_PINS:
-            GPIO.setup(p, GPIO.OUT)
-        # control pinleri output
-        for p in [PIN_RS, PIN_CS, PIN_WR, PIN_RST]:
-            GPIO.setup(p, GPIO.OUT)
-
-        GPIO.output(PIN_CS, 1)
-        GPIO.output(PIN_WR, 1)
-        GPIO.output(PIN_RS, 1)
+    def __init__(self, bus=None, buffered=False):
+        # buffered: çizimler tampona, ekrana flush() ile (numpy gerekir)
+        self.frame = None
+        if buffered:
+            from framebuffer import FrameBuffer
+            self.frame = FrameBuffer(TFT_WIDTH, TFT_HEIGHT)
+        self.glyphs = GlyphCache(FONT_5x7) if GlyphCache else None
+        # Doğrudan modda ekrandaki son zemin: ("color", renk) | ("image", x, y, w, h, veri)
+        # paint_bg=False yazılar bu zeminin üzerine bestelenip tek blok gönderilir.
+        self.background = None
+        # Tamponlu modda adıyla saklanan ekran katmanları (save_layer / restore_layer)
+        self.layers = {}
+        # Donanım kaydırması: (sabit sol, kaydırılan genişlik, sabit sağ) ve kayma miktarı
+        self.scroll_area = (0, TFT_WIDTH, 0)
+        self.scroll_offset = 0
+        # bus verilmezse LCD_BUS'a göre gpiomem / RPi.GPIO (gpio_bus.open_bus)
+        self.bus = bus or open_bus(DATA_PINS, PIN_WR, [PIN_RS, PIN_CS, PIN_RST])
+
+        self.bus.set_pin(PIN_CS, 1)
+        self.bus.set_pin(PIN_WR, 1)
+        self.bus.set_pin(PIN_RS, 1)
 
         self.reset()
         self.init_lcd()
 
     def reset(self):
-        GPIO.output(PIN_RST, 1)
+        self.bus.set_pin(PIN_RST, 1)
         time.sleep(0.05)
-        GPIO.output(PIN_RST, 0)
+        self.bus.set_pin(PIN_RST, 0)
         time.sleep(0.05)
-        GPIO.output(PIN_RST, 1)
+        self.bus.set_pin(PIN_RST, 1)
         time.sleep(0.15)
 
     def write_bus(self, val: int):
         # 8-bit değeri D0..D7 pinlerine bas
-        for i, pin in enumerate(DATA_PINS):
-            GPIO.output(pin, (val >> i) & 0x01)
+        self.bus.write_byte(val)
 
     def pulse_wr(self):
-        GPIO.output(PIN_WR, 0)
-        GPIO.output(PIN_WR, 1)
+        self.bus.strobe()
 
     def write_command(self, cmd: int):
-        GPIO.output(PIN_CS, 0)
-        GPIO.output(PIN_RS, 0)   # command
+        self.bus.set_pin(PIN_CS, 0)
+        self.bus.set_pin(PIN_RS, 0)   # command
         self.write_bus(cmd & 0xFF)
         self.pulse_wr()
-        GPIO.output(PIN_CS, 1)
+        self.bus.set_pin(PIN_CS, 1)
 
     def write_data8(self, data: int):
-        GPIO.output(PIN_CS, 0)
-        GPIO.output(PIN_RS, 1)   # data
+        self.bus.set_pin(PIN_CS, 0)
+        self.bus.set_pin(PIN_RS, 1)   # data
         self.write_bus(data & 0xFF)
         self.pulse_wr()
-        GPIO.output(PIN_CS, 1)
+        self.bus.set_pin(PIN_CS, 1)
 
     def write_data16(self, val: int):
         # 16-bit RGB565 data: high, low
@@ -182,27 +211,28 @@ class ILI9486:
 
     def fill_screen(self, r, g, b):
         color = self.rgb565(r, g, b)
+        if self.frame is not None:
+            self.frame.fill(color)
+            return
+        self.background = ("color", color)
         self.set_address_window(0, 0, TFT_WIDTH - 1, TFT_HEIGHT - 1)
-        GPIO.output(PIN_CS, 0)
-        GPIO.output(PIN_RS, 1)
-        for _ in range(TFT_WIDTH * TFT_HEIGHT):
-            self.write_bus((color >> 8) & 0xFF)
-            self.pulse_wr()
-            self.write_bus(color & 0xFF)
-            self.pulse_wr()
-        GPIO.output(PIN_CS, 1)
+        self.fill_pixels(color, TFT_WIDTH * TFT_HEIGHT)
 
     def fill_rect(self, x, y, w, h, r, g, b):
         color = self.rgb565(r, g, b)
+        if self.frame is not None:
+            self.frame.fill_rect(x, y, w, h, color)
+            return
+        self.background = None
         self.set_address_window(x, y, x + w - 1, y + h - 1)
-        GPIO.output(PIN_CS, 0)
-        GPIO.output(PIN_RS, 1)
-        for _ in range(w * h):
-            self.write_bus((color >> 8) & 0xFF)
-            self.pulse_wr()
-            self.write_bus(color & 0xFF)
-            self.pulse_wr()
-        GPIO.output(PIN_CS, 1)
+        self.fill_pixels(color, w * h)
+
+    def fill_pixels(self, color, count):
+        """Açık adres penceresine aynı renkten count piksel gönderir."""
+        self.bus.set_pin(PIN_CS, 0)
+        self.bus.set_pin(PIN_RS, 1)
+        self.bus.fill((color >> 8) & 0xFF, color & 0xFF, count)
+        self.bus.set_pin(PIN_CS, 1)
 
     # ----------------- PIXEL & TEXT FONKSIYONLARI -----------------
 
@@ -211,16 +241,20 @@ class ILI9486:
         if x < 0 or x >= TFT_WIDTH or y < 0 or y >= TFT_HEIGHT:
             return
         color = self.rgb565(r, g, b)
+        if self.frame is not None:
+            self.frame.fill_rect(x, y, 1, 1, color)
+            return
+        self.background = None
         self.set_address_window(x, y, x, y)
-        GPIO.output(PIN_CS, 0)
-        GPIO.output(PIN_RS, 1)
+        self.bus.set_pin(PIN_CS, 0)
+        self.bus.set_pin(PIN_RS, 1)
         # high byte
         self.write_bus((color >> 8) & 0xFF)
         self.pulse_wr()
         # low byte
         self.write_bus(color & 0xFF)
         self.pulse_wr()
-        GPIO.output(PIN_CS, 1)
+        self.bus.set_pin(PIN_CS, 1)
 
     def _normalize_char(self, ch: str) -> str:
         """Türkçe karakterleri en yakın Latin'e çevir, küçükleri büyüt."""
@@ -283,7 +317,90 @@ class ILI9486:
         fr,fg,fb : yazı rengi
         br,bg,bb : arka plan rengi
         size: ölçek (1,2,3…)
+        Her satır glif önbelleğinden tek blok olarak çizilir.
+        """
+        if self.glyphs is None:
+            self._draw_text_pixels(x, y, text, fr, fg, fb, br, bg, bb, size, paint_bg)
+            return
+
+        fore = self.rgb565(fr, fg, fb)
+        back = self.rgb565(br, bg, bb)
+        for line_x, line_y, line in self._layout_text(x, y, text, size):
+            if not self._blit_line(line_x, line_y, line, size, fore, back, paint_bg):
+                for i, ch in enumerate(line):
+                    self.draw_char(line_x + i * 6 * size, line_y, ch,
+                                   fr, fg, fb, br, bg, bb,
+                                   size=size, paint_bg=paint_bg)
+
+    def _layout_text(self, x, y, text, size):
+        """Metni draw_char'ın imleç kurallarıyla (\n ve sağ kenarda kaydırma) satırlara böler."""
+        lines = []
+        current = []
+        cursor_x = line_x = x
+        cursor_y = line_y = y
+        step_x = (5 + 1) * size
+
+        for ch in text:
+            wrap = ch == '\n' or cursor_x + 5 * size >= TFT_WIDTH
+            if wrap:
+                if current:
+                    lines.append((line_x, line_y, "".join(current)))
+                    current = []
+                cursor_x = line_x = x
+                cursor_y += 8 * size
+                line_y = cursor_y
+                if ch == '\n':
+                    continue
+            current.append(self._normalize_char(ch))
+            cursor_x += step_x
+
+        if current:
+            lines.append((line_x, line_y, "".join(current)))
+        return lines
+
+    def _background_region(self, x, y, w, h):
+        """Doğrudan modda bilinen zeminin (x,y,w,h) bölgesi; bilinmiyorsa None."""
+        if self.background is None:
+            return None
+        if self.background[0] == "color":
+            return np.full((h, w), self.background[1], dtype=">u2")
+        _, img_x, img_y, img_w, img_h, data = self.background
+        if x < img_x or y < img_y or x + w > img_x + img_w or y + h > img_y + img_h:
+            return None
+        pixels = np.frombuffer(data, dtype=">u2", count=img_w * img_h).reshape(img_h, img_w)
+        return pixels[y - img_y:y - img_y + h, x - img_x:x - img_x + w]
+
+    def _blit_line(self, x, y, line, size, fore, back, paint_bg):
+        """
+        Tek satırı ekrana / tampona yazar. Doğrudan modda paint_bg=False ve zemin
+        bilinmiyorsa False döner (çağıran piksel piksel çizer).
         """
+        w = min(6 * size * len(line), TFT_WIDTH - x)
+        h = min(8 * size, TFT_HEIGHT - y)
+        if x < 0 or y < 0 or w <= 0 or h <= 0:
+            return True
+
+        if self.frame is not None:
+            region = self.frame.pixels[y:y + h, x:x + w]
+            if paint_bg:
+                region[:, :] = self.glyphs.line_block(line, size, fore, back)[:h, :w]
+            else:
+                region[self.glyphs.line_mask(line, size)[:h, :w]] = fore
+            return True
+
+        if paint_bg:
+            block = self.glyphs.line_block(line, size, fore, back)[:h, :w]
+        else:
+            background = self._background_region(x, y, w, h)
+            if background is None:
+                return False
+            block = self.glyphs.compose(line, size, fore, background)
+        self.set_address_window(x, y, x + w - 1, y + h - 1)
+        self.write_pixels(block.tobytes())
+        return True
+
+    def _draw_text_pixels(self, x, y, text, fr, fg, fb, br, bg, bb, size=1, paint_bg=True):
+        """numpy yoksa kullanılan eski yol: karakter karakter, piksel piksel çizim."""
         # Clear the area before drawing new text
         if paint_bg:
             self.fill_rect(x, y, (5 + 1) * size * len(text), 8 * size, br, bg, bb)
@@ -319,60 +436,121 @@ class ILI9486:
         start_x = max((TFT_WIDTH - text_width) // 2, 0)
         self.draw_text(start_x, y, text, fr, fg, fb, br, bg, bb, size=size, paint_bg=paint_bg)
 
+    def write_pixels(self, data):
+        """
+        Hazır RGB565 baytlarını (high, low sırasıyla) açık adres penceresine gönderir.
+        Uzun tek renk dizileri bus.fill ile, geri kalanı olduğu gibi gönderilir.
+        """
+        self.bus.set_pin(PIN_CS, 0)
+        self.bus.set_pin(PIN_RS, 1)
+        if pixel_runs is None:
+            self.bus.write_bytes(data)
+        else:
+            view = memoryview(data)
+            for start, end, color in pixel_runs(data):
+                if color is None:
+                    self.bus.write_bytes(view[start * 2:end * 2])
+                else:
+                    self.bus.fill((color >> 8) & 0xFF, color & 0xFF, end - start)
+            view.release()
+        self.bus.set_pin(PIN_CS, 1)
+
     def draw_image(self, x, y, image_path):
         """
         PNG resmini ekranda belirtilen (x,y) konumundan çiz.
-        Resim ekran boyutuna göre otomatik ölçeklenir.
+        Resim ekran boyutuna göre otomatik ölçeklenir. Dönüştürülmüş RGB565 hâli
+        data/lcd_cache/ altında saklanır (asset_cache.py); sonraki çizimler PIL kullanmaz.
         """
-        import os
         if not os.path.exists(image_path):
             log.error(f"Image file not found: {image_path}")
             return False
-            
+
+        img_w = TFT_WIDTH - x
+        img_h = TFT_HEIGHT - y
         try:
-            from PIL import Image
-            import numpy as np
+            data = asset_cache.load(image_path, img_w, img_h)
         except ImportError:
             log.error("PIL/numpy not available, skipping image draw")
             return False
-
-        try:
-            img = Image.open(image_path)
-            img = img.convert("RGB")
-            
-            # Ekran boyutuna sığdır
-            target_w = TFT_WIDTH - x
-            target_h = TFT_HEIGHT - y
-            img_w, img_h = img.size
-            
-            # Eğer resim ekran boyutundan farklıysa, ölçekle
-            if img_w != target_w or img_h != target_h:
-                img = img.resize((target_w, target_h), Image.LANCZOS)
-                log.debug(f"Image resized from {img_w}x{img_h} to {target_w}x{target_h}")
-            
-            img_w, img_h = img.size
-            arr = np.array(img, dtype=np.uint8)
-            self.set_address_window(x, y, x + img_w - 1, y + img_h - 1)
-            GPIO.output(PIN_CS, 0)
-            GPIO.output(PIN_RS, 1)
-            # RGB888 -> RGB565 batch
-            arr565 = (((arr[:,:,0].astype(np.uint16) & 0xF8) << 8) | 
-                      ((arr[:,:,1].astype(np.uint16) & 0xFC) << 3) | 
-                      ((arr[:,:,2].astype(np.uint16) & 0xF8) >> 3)).flatten()
-            for i in range(0, len(arr565)):
-                color = int(arr565[i])  # numpy int -> Python int
-                self.write_bus((color >> 8) & 0xFF)
-                self.pulse_wr()
-                self.write_bus(color & 0xFF)
-                self.pulse_wr()
-            GPIO.output(PIN_CS, 1)
-            log.info(f"Image loaded: {image_path} ({img_w}x{img_h})")
-            return True
         except Exception as e:
             log.error(f"Error loading image {image_path}: {e}")
-            import traceback
-            traceback.print_exc()
             return False
 
+        if self.frame is not None:
+            self.frame.blit(x, y, img_w, img_h, data)
+        else:
+            self.set_address_window(x, y, x + img_w - 1, y + img_h - 1)
+            self.write_pixels(data)
+            self.background = ("image", x, y, img_w, img_h, data)
+        log.info(f"Image loaded: {image_path} ({img_w}x{img_h})")
+        return True
+
+    def flush(self):
+        """
+        Tamponda son gönderilen kareden farklı olan bölgeleri ekrana gönderir.
+        Gönderilen bölge sayısını döndürür (buffered=False ise 0).
+        """
+        if self.frame is None:
+            return 0
+        rects = self.frame.dirty_rects()
+        for x0, y0, x1, y1 in rects:
+            self.set_address_window(x0, y0, x1, y1)
+            self.write_pixels(self.frame.region_bytes(x0, y0, x1, y1))
+        self.frame.mark_shown()
+        return len(rects)
+
+    def save_layer(self, name):
+        """
+        Tamponun şu anki içeriğini name adıyla saklar (bir ekranın sabit katmanı).
+        Doğrudan modda saklanacak tampon yoktur, False döner.
+        """
+        if self.frame is None:
+            return False
+        self.layers[name] = self.frame.snapshot()
+        return True
+
+    def restore_layer(self, name):
+        """Saklanan katmanı tampona geri koyar; katman yoksa False döner."""
+        layer = self.layers.get(name)
+        if layer is None or self.frame is None:
+            return False
+        self.frame.restore(layer)
+        return True
+
+    def drop_layer(self, name):
+        """Saklanan katmanı siler (içeriği eskidiyse); sonraki çizimde yeniden hazırlanır."""
+        self.layers.pop(name, None)
+
+    # ----------------- DONANIM KAYDIRMASI -----------------
+
+    def define_scroll_area(self, fixed_start, scroll_width, fixed_end=None):
+        """
+        VSCRDEF (0x33): kaydırma alanını tanımlar. Denetleyici belleğin uzun
+        kenarını (480 satır) kaydırır; MADCTL 0x28 (MV=1) ile bu eksen ekranın x
+        eksenidir. fixed_start soldaki, fixed_end sağdaki sabit sütun sayısıdır.
+        """
+        if fixed_end is None:
+            fixed_end = TFT_WIDTH - fixed_start - scroll_width
+        if min(fixed_start, fixed_end) < 0 or scroll_width <= 0 or fixed_start + scroll_width + fixed_end != TFT_WIDTH:
+            raise ValueError("Kaydırma alanı ekran genişliğini tam kaplamalı")
+        self.write_command(0x33)
+        self.write_data16(fixed_start)
+        self.write_data16(scroll_width)
+        self.write_data16(fixed_end)
+        self.scroll_area = (fixed_start, scroll_width, fixed_end)
+        self.scroll_offset = 0
+
+    def scroll_to(self, offset):
+        """
+        VSCRSADD (0x37): kaydırma alanının sol kenarında gösterilecek bellek
+        sütunu fixed_start + offset olur; içerik offset kadar sola kayar.
+        Bellek (ve tampon) koordinatları değişmez, yalnızca görüntüleme kayar.
+        """
+        fixed_start, scroll_width, _ = self.scroll_area
+        offset %= scroll_width
+        self.write_command(0x37)
+        self.write_data16(fixed_start + offset)
+        self.scroll_offset = offset
+
     def cleanup(self):
-        GPIO.cleanup()
\ No newline at end of file
+        self.bus.cleanup()
@@ -0,0 +1,186 @@
+# virtual_lcd.py
+# Donanımsız çalışma için sanal ILI9486 veri yolu.
+#
+# VirtualBus, gpio_bus.py'deki veri yollarıyla aynı arayüzü (set_pin / write_byte /
+# strobe / write_bytes / fill) sunar; RS hattına bakarak gelen baytları komut ve
+# veri olarak yorumlar ve sürücünün ekrana gönderdiklerini bellekteki bir kareye
+# yazar:
+#   0x2A / 0x2B : adres penceresi (sütun / satır)
+#   0x2C        : bellek yazımı (RGB565, high + low)
+#   0x33 / 0x37 : kaydırma alanı ve başlangıç adresi (screen() ekranda görüneni verir)
+# Diğer komutlar yalnızca sayılır. Veri yolu işlemleri (WR darbesi, veri hattı
+# değişimi, komut, adres penceresi) stats içinde tutulur; save_png ile ekran
+# görüntüsü alınabilir. LCD_BUS=virtual ile panel_ui Pi dışında da çalışır.
+
+import numpy as np
+
+PIN_RS = 16
+
+CMD_CASET = 0x2A
+CMD_PASET = 0x2B
+CMD_RAMWR = 0x2C
+CMD_VSCRDEF = 0x33
+CMD_VSCRSADD = 0x37
+
+
+class VirtualBus:
+    """Komut/veri akışını bellekteki kareye işleyen sahte veri yolu."""
+
+    name = "virtual"
+
+    def __init__(self, width=480, height=320, rs_pin=PIN_RS):
+        self.width = width
+        self.height = height
+        self.rs_pin = rs_pin
+        self.pixels = np.zeros((height, width), dtype=">u2")
+        self.rs = 1
+        self.value = None       # veri hatlarındaki son bayt
+        self.command = None
+        self.params = []
+        self.window = (0, 0, width - 1, height - 1)
+        self.cursor = 0         # pencere içindeki piksel konumu
+        self.pending = None     # yarım kalmış pikselin high baytı
+        # Donanım kaydırması: (sabit başlangıç, kaydırılan, sabit son), VSP
+        self.scroll_area = (0, width, 0)
+        self.scroll_start = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            "strobes": 0,       # WR darbeleri (gönderilen bayt sayısı)
+            "line_writes": 0,   # veri hatlarının değiştiği yazımlar
+            "commands": 0,
+            "windows": 0,
+            "data_bytes": 0,
+        }
+
+    @property
+    def bus_ops(self):
+        """Yaklaşık GPIO işlemi: her WR darbesi ve her veri hattı değişimi."""
+        return self.stats["strobes"] + self.stats["line_writes"]
+
+    # ----------------- Veri yolu arayüzü -----------------
+
+    def set_pin(self, pin, value):
+        if pin == self.rs_pin:
+            self.rs = value
+
+    def write_byte(self, value):
+        if value != self.value:
+            self.stats["line_writes"] += 1
+            self.value = value
+
+    def strobe(self):
+        self.stats["strobes"] += 1
+        if self.rs == 0:
+            self._command(self.value)
+        else:
+            self._data(bytes((self.value,)))
+
+    def write_bytes(self, data):
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if buf.size == 0:
+            return
+        changes = int(np.count_nonzero(buf[1:] != buf[:-1]))
+        if int(buf[0]) != self.value:
+            changes += 1
+        self.stats["line_writes"] += changes
+        self.stats["strobes"] += buf.size
+        self.value = int(buf[-1])
+        self._data(buf)
+
+    def fill(self, hi, lo, count):
+        if count <= 0:
+            return
+        self.stats["line_writes"] += (hi != self.value) + (0 if hi == lo else 2 * count - 1)
+        self.stats["strobes"] += count * 2
+        self.value = lo
+        if self.command == CMD_RAMWR and self.pending is None:
+            self.stats["data_bytes"] += count * 2
+            self._store(np.full(count, (hi << 8) | lo, dtype=">u2"))
+        else:
+            self._data(np.frombuffer(bytes((hi, lo)) * count, dtype=np.uint8))
+
+    def cleanup(self):
+        pass
+
+    # ----------------- Komut yorumlama -----------------
+
+    def _command(self, cmd):
+        self.stats["commands"] += 1
+        self.command = cmd
+        self.params = []
+        if cmd == CMD_RAMWR:
+            self.stats["windows"] += 1
+            self.cursor = 0
+            self.pending = None
+
+    def _data(self, data):
+        if self.command != CMD_RAMWR:
+            self.params.extend(int(b) for b in data)
+            if len(self.params) == 4 and self.command in (CMD_CASET, CMD_PASET):
+                start = (self.params[0] << 8) | self.params[1]
+                end = (self.params[2] << 8) | self.params[3]
+                x0, y0, x1, y1 = self.window
+                if self.command == CMD_CASET:
+                    self.window = (start, y0, end, y1)
+                else:
+                    self.window = (x0, start, x1, end)
+            elif len(self.params) == 6 and self.command == CMD_VSCRDEF:
+                p = self.params
+                self.scroll_area = ((p[0] << 8) | p[1], (p[2] << 8) | p[3], (p[4] << 8) | p[5])
+            elif len(self.params) == 2 and self.command == CMD_VSCRSADD:
+                self.scroll_start = (self.params[0] << 8) | self.params[1]
+            return
+
+        self.stats["data_bytes"] += len(data)
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if self.pending is not None:
+            buf = np.concatenate(([self.pending], buf)).astype(np.uint8)
+            self.pending = None
+        if buf.size % 2:
+            self.pending = int(buf[-1])
+            buf = buf[:-1]
+        if buf.size:
+            self._store(buf.view(">u2"))
+
+    def _store(self, values):
+        """Pikselleri pencere içinde soldan sağa, yukarıdan aşağı yazar (sona gelince başa döner)."""
+        x0, y0, x1, y1 = self.window
+        w = x1 - x0 + 1
+        h = y1 - y0 + 1
+        if w <= 0 or h <= 0:
+            return
+        idx = (self.cursor + np.arange(values.size)) % (w * h)
+        self.pixels[y0 + idx // w, x0 + idx % w] = values
+        self.cursor = (self.cursor + values.size) % (w * h)
+
+    # ----------------- Çıktı -----------------
+
+    def screen(self):
+        """
+        Ekranda görünen kare. Yatay kullanımda (MADCTL MV=1) kaydırma x ekseninde:
+        kaydırma alanındaki x sütununda bellekteki start + (x - start + VSP - start)
+        mod alan sütunu görünür.
+        """
+        start, size, _ = self.scroll_area
+        vsp = self.scroll_start
+        if size <= 0 or not start <= vsp < start + size or vsp == start:
+            return self.pixels
+        cols = np.arange(self.width)
+        area = (cols >= start) & (cols < start + size)
+        cols[area] = start + (cols[area] - start + vsp - start) % size
+        return self.pixels[:, cols]
+
+    def to_rgb(self):
+        """Ekranda görünen kareyi (yükseklik, genişlik, 3) uint8 RGB dizisi olarak döndürür."""
+        px = self.screen().astype(np.uint16)
+        rgb = np.empty(px.shape + (3,), dtype=np.uint8)
+        rgb[:, :, 0] = ((px >> 11) & 0x1F) << 3
+        rgb[:, :, 1] = ((px >> 5) & 0x3F) << 2
+        rgb[:, :, 2] = (px & 0x1F) << 3
+        return rgb
+
+    def save_png(self, path):
+        from PIL import Image
+        Image.fromarray(self.to_rgb(), "RGB").save(path)
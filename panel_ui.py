@@ -3,7 +3,9 @@ import time
 import requests
 import os
 import sys
-import socket
+import threading
+import traceback
+from collections import deque
 from datetime import datetime
 
 # Proje kök dizinini path'e ekle
@@ -12,20 +14,35 @@ sys.path.insert(0, os.path.join(BASE_DIR, "drivers"))
 
 from ili9486 import ILI9486, TFT_WIDTH, TFT_HEIGHT
 from logger import setup_logger
+from utils.network_status import NetworkStatus
 
 # Logger oluştur
 log = setup_logger("panel")
 
 API_BASE = "http://127.0.0.1:5000"
 ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
+LONG_POLL_TIMEOUT = 25  # Sunucu olay yoksa bu kadar bekletir (saniye)
+EVENT_HOLD_SECONDS = 1.5  # Olay ekranı bu kadar kalır, sonra ana ekrana dönülür
+RENDER_QUEUE_SIZE = 8   # Çizilmeyi bekleyen en fazla olay (dolarsa en eskisi düşer)
+RECENT_SCANS = 5        # Yoğunlukta listelenen son okutma sayısı
+TICKER_CARD_WIDTH = 160  # Kayan şeritte bir okutma kartının genişliği (ekranda 3 kart)
+
+# Ana ekrandaki IP adresi; main() başlatır, değişiklikte ana ekran katmanı yenilenir
+network = NetworkStatus()
 
 
 # ---------- API Yardımcıları ----------
 
-def fetch_last_event():
-    """Panel için son yoklama olayını çeker (pasif dinleme)."""
+def fetch_events(after=None):
+    """
+    Yeni yoklama olaylarını long-poll ile bekler.
+    after=None ise sunucunun güncel seq değeri alınır (beklemeden).
+    """
+    params = {}
+    if after is not None:
+        params = {"after": after, "timeout": LONG_POLL_TIMEOUT}
     try:
-        r = requests.get(API_BASE + "/api/last-event", timeout=5)
+        r = requests.get(API_BASE + "/api/last-event", params=params, timeout=LONG_POLL_TIMEOUT + 5)
         if r.status_code == 200:
             return r.json(), None
         try:
@@ -38,8 +55,12 @@ def fetch_last_event():
 
 # ---------- Ekran Çizim Fonksiyonları ----------
 
-def draw_home_screen(tft: ILI9486):
-    """Ana bekleme ekranı."""
+# Her ekran iki katmandan oluşur: arka plan + sabit başlıklardan oluşan sabit katman
+# ve olaydan olaya değişen alanlar (ad, saat, süre). Tamponlu modda sabit katmanlar
+# başlangıçta bir kez çizilip saklanır (prepare_layers); olay geldiğinde katman
+# tampona kopyalanır, yalnızca değişen alanlar çizilir ve flush() farkı gönderir.
+
+def _home_layer(tft: ILI9486):
     if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
         tft.fill_screen(10, 20, 40)
 
@@ -50,27 +71,18 @@ def draw_home_screen(tft: ILI9486):
     
     # Sensör temizleme uyarısı (kırmızı, orta-alt arasında)
     tft.draw_text_center(165, "Sensoru Temizleyiniz", 0, 0, 0, 255, 100, 0, size=1, paint_bg=False)
-    
-    # IP adresi (sol alt köşe)
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-    except:
-        ip = "N/A"
-    tft.draw_text(10, 300, f"IP: {ip}", 200, 200, 200, 0, 0, 0, size=1, paint_bg=False)
 
+    # IP adresi (sol alt köşe) - önbellekteki adres; değişince katman yeniden çizilir
+    tft.draw_text(10, 300, f"IP: {network.address or 'N/A'}", 200, 200, 200, 0, 0, 0, size=1, paint_bg=False)
 
-def show_loading(tft: ILI9486):
-    """Parmak okunurken gösterilen ekran."""
+
+def _loading_layer(tft: ILI9486):
     if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
         tft.fill_screen(30, 30, 30)
     tft.draw_text_center(120, "OKUNUYOR", 0, 0, 0, 30, 30, 30, size=3, paint_bg=False)
 
 
-def show_error(tft: ILI9486, msg: str = "KAYITSIZ"):
-    """Parmak izi kaydı yok veya genel hata ekranı."""
+def _error_layer(tft: ILI9486):
     if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
         tft.fill_screen(90, 30, 0)
 
@@ -78,31 +90,96 @@ def show_error(tft: ILI9486, msg: str = "KAYITSIZ"):
     tft.draw_text_center(140, "YETKILIYLE", 0, 0, 0, 90, 30, 0, size=2, paint_bg=False)
     tft.draw_text_center(190, "GORUSUNUZ", 0, 0, 0, 90, 30, 0, size=2, paint_bg=False)
 
+
+def _welcome_layer(tft: ILI9486):
+    if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
+        tft.fill_screen(0, 100, 0)
+    tft.draw_text_center(40, "GIRIS YAPILDI", 0, 0, 0, 255, 255, 255, size=3, paint_bg=False)
+
+
+def _goodbye_layer(tft: ILI9486):
+    if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
+        tft.fill_screen(0, 0, 120)
+    tft.draw_text_center(40, "CIKIS YAPILDI", 0, 0, 0, 255, 255, 255, size=3, paint_bg=False)
+
+
+def _recent_layer(tft: ILI9486):
+    if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
+        tft.fill_screen(20, 20, 60)
+    tft.draw_text_center(20, "SON OKUTMALAR", 0, 0, 0, 20, 20, 60, size=3, paint_bg=False)
+
+
+SCREEN_LAYERS = {
+    "home": _home_layer,
+    "loading": _loading_layer,
+    "error": _error_layer,
+    "welcome": _welcome_layer,
+    "goodbye": _goodbye_layer,
+    "recent": _recent_layer,
+}
+
+
+def prepare_layers(tft: ILI9486):
+    """Tüm ekranların sabit katmanlarını bir kez çizip saklar (yalnızca tamponlu modda)."""
+    if tft.frame is None:
+        return
+    for name, draw in SCREEN_LAYERS.items():
+        draw(tft)
+        tft.save_layer(name)
+    log.info(f"{len(SCREEN_LAYERS)} ekran katmanı hazırlandı")
+
+
+def begin_screen(tft: ILI9486, name: str):
+    """
+    Ekranın sabit katmanını koyar: hazırlanmışsa kopyalanır, değilse çizilir.
+    Hazırlanmış katman silindiyse (ör. IP değişti) yeniden çizilip saklanır.
+    """
+    if not tft.restore_layer(name):
+        SCREEN_LAYERS[name](tft)
+        if tft.layers:
+            tft.save_layer(name)
+
+
+def draw_home_screen(tft: ILI9486):
+    """Ana bekleme ekranı."""
+    begin_screen(tft, "home")
+    tft.flush()
+
+
+def show_loading(tft: ILI9486):
+    """Parmak okunurken gösterilen ekran."""
+    begin_screen(tft, "loading")
+    tft.flush()
+
+
+def show_error(tft: ILI9486, msg: str = "KAYITSIZ"):
+    """Parmak izi kaydı yok veya genel hata ekranı."""
+    begin_screen(tft, "error")
+
     # Hata mesajının kendisini küçük yazıyla alta koyabiliriz
     if msg:
         # 1 satıra sığması için kısalt
         short = msg[:24]
         tft.draw_text_center(250, short.upper(), 0, 0, 0, 90, 30, 0, size=1, paint_bg=False)
+    tft.flush()
 
 
 def show_welcome(tft: ILI9486, name: str):
     """GİRİŞ ekranı – ad soyad ekranda büyük gözükecek."""
-    if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
-        tft.fill_screen(0, 100, 0)
+    begin_screen(tft, "welcome")
 
     name = (name or "").upper()[:16]
     now = datetime.now()
 
-    tft.draw_text_center(40, "GIRIS YAPILDI", 0, 0, 0, 255, 255, 255, size=3, paint_bg=False)
     tft.draw_text_center(110, name, 0, 0, 0, 255, 255, 255, size=2, paint_bg=False)
     tft.draw_text_center(170, now.strftime("%H:%M"), 0, 0, 0, 255, 255, 0, size=2, paint_bg=False)
     tft.draw_text_center(220, now.strftime("%d/%m/%Y"), 0, 0, 0, 255, 255, 0, size=2, paint_bg=False)
+    tft.flush()
 
 
 def show_goodbye(tft: ILI9486, name: str, total_minutes: int):
     """ÇIKIŞ ekranı – ad soyad + toplam süre."""
-    if not tft.draw_image(0, 0, f"{ASSET_DIR}/home_bg.png"):
-        tft.fill_screen(0, 0, 120)
+    begin_screen(tft, "goodbye")
 
     name = (name or "").upper()[:16]
     now = datetime.now()
@@ -111,74 +188,338 @@ def show_goodbye(tft: ILI9486, name: str, total_minutes: int):
     m = total_minutes % 60
     total_str = f"{h} SAAT {m:02d} DK"
 
-    tft.draw_text_center(40, "CIKIS YAPILDI", 0, 0, 0, 255, 255, 255, size=3, paint_bg=False)
     tft.draw_text_center(110, name, 0, 0, 0, 255, 255, 255, size=2, paint_bg=False)
     tft.draw_text_center(170, total_str, 0, 0, 0, 255, 255, 0, size=2, paint_bg=False)
     tft.draw_text_center(220, now.strftime("%H:%M %d/%m/%Y"), 0, 0, 0, 255, 255, 255, size=1, paint_bg=False)
+    tft.flush()
+
+
+def scan_line(data: dict) -> str:
+    """Son okutmalar listesi için tek satır: "09:12 GIRIS AHMET YILMAZ"."""
+    ts = data.get("timestamp") or ""
+    clock = ts[11:16] if len(ts) >= 16 else datetime.now().strftime("%H:%M")
+    user = data.get("user", {}) or {}
+    name = f"{user.get('first_name', '').strip()} {user.get('last_name', '').strip()}".strip()
+    event = data.get("event", "")
+    if event == "check_in":
+        label = "GIRIS"
+    elif event == "check_out":
+        label = "CIKIS"
+    else:
+        label = "HATA"
+        name = name or (data.get("msg") or "KAYITSIZ")
+    return f"{clock} {label} {name}".upper()[:TFT_WIDTH // 12 - 2]
+
+
+def show_recent(tft: ILI9486, scans: list):
+    """Yoğunlukta gösterilen kompakt ekran: en yenisi üstte son okutmalar."""
+    begin_screen(tft, "recent")
+    for i, data in enumerate(reversed(scans[-RECENT_SCANS:])):
+        tft.draw_text(24, 64 + i * 36, scan_line(data), 0, 0, 0, 20, 20, 60, size=2, paint_bg=False)
+    tft.flush()
 
 
 # ---------- Ana Döngü ----------
 
+def show_event(tft: ILI9486, data: dict):
+    """Tek bir olayı ekranda gösterir."""
+    # Burada JSON'dan ad-soyadı çekiyoruz
+    user = data.get("user", {}) or {}
+    first_name = user.get("first_name", "").strip()
+    last_name = user.get("last_name", "").strip()
+    full_name = (first_name + " " + last_name).strip()
+    event = data.get("event", "")
+    msg = data.get("msg") or "KAYITSIZ"
+
+    log.info(f"Event={event}, User={full_name}")
+
+    if event == "check_in":
+        show_welcome(tft, full_name)
+    elif event == "check_out":
+        total_minutes = int(data.get("total_duration_minutes", 0) or 0)
+        show_goodbye(tft, full_name, total_minutes)
+    elif event == "error":
+        show_error(tft, msg=msg)
+    else:
+        show_error(tft, msg=f"Bilinmeyen event: {event}")
+
+
+def draw_scan_card(tft: ILI9486, x: int, width: int, data: dict):
+    """Kayan şeritteki tek okutma kartı: saat, giriş/çıkış, ad ve soyad alt alta."""
+    event = data.get("event", "")
+    if event == "check_in":
+        bg, label = (0, 100, 0), "GIRIS"
+    elif event == "check_out":
+        bg, label = (0, 0, 120), "CIKIS"
+    elif event:
+        bg, label = (90, 30, 0), "HATA"
+    else:
+        bg, label = (20, 20, 60), ""
+
+    tft.fill_rect(x, 0, width, TFT_HEIGHT, *bg)
+    tft.fill_rect(x + width - 2, 0, 2, TFT_HEIGHT, 255, 255, 255)
+    if not event:
+        return
+
+    chars = (width - 8) // 12
+    ts = data.get("timestamp") or ""
+    clock = ts[11:16] if len(ts) >= 16 else datetime.now().strftime("%H:%M")
+    user = data.get("user", {}) or {}
+    first = (user.get("first_name") or "").strip() or (data.get("msg") or "KAYITSIZ")
+    last = (user.get("last_name") or "").strip()
+
+    tft.draw_text(x + 8, 40, clock, 255, 255, 0, *bg, size=3)
+    tft.draw_text(x + 8, 110, label, 255, 255, 255, *bg, size=2)
+    tft.draw_text(x + 8, 170, first.upper()[:chars], 255, 255, 255, *bg, size=2)
+    tft.draw_text(x + 8, 210, last.upper()[:chars], 255, 255, 255, *bg, size=2)
+
+
+class ScanTicker:
+    """
+    Yoğunlukta son okutmaları kayan kart şeridi olarak gösterir.
+
+    Ekran TFT_WIDTH / card_width yuvaya bölünür. Yuvalar bellekte sabittir; hangi
+    yuvanın solda görüneceğini denetleyicinin donanım kaydırması belirler. Yeni
+    okutma en eski kartın yuvasına çizilir ve tek bir scroll_to ile şerit bir kart
+    sola kayar: en eski kart soldan çıkar, yenisi sağdan girer. Böylece her
+    okutmada yalnızca bir kart çizilir; diğerleri veri yolundan geçmez.
+
+    Panel yatay kullanıldığından denetleyicinin dikey kaydırması ekranda yataydır;
+    şerit bu yüzden satır satır değil kart kart (sütun) kayar.
+    """
+
+    def __init__(self, tft: ILI9486, card_width=TICKER_CARD_WIDTH):
+        self.tft = tft
+        self.card_width = card_width
+        self.slots = TFT_WIDTH // card_width
+        self.active = False
+        self.count = 0
+
+    def start(self, scans: list):
+        """Şerit moduna geçer: son okutmaları soldan sağa eskiden yeniye çizer."""
+        scans = list(scans)[-self.slots:]
+        self.tft.define_scroll_area(0, self.slots * self.card_width)
+        for slot in range(self.slots):
+            data = scans[slot] if slot < len(scans) else {}
+            draw_scan_card(self.tft, slot * self.card_width, self.card_width, data)
+        self.tft.flush()
+        self.count = len(scans)
+        self.active = True
+
+    def add(self, data: dict):
+        """Yeni okutmayı tek kart çizip şeridi kaydırarak ekler."""
+        if self.count < self.slots:
+            # Boş yuva var: kaydırmadan sıradaki yuvaya çiz
+            draw_scan_card(self.tft, self.count * self.card_width, self.card_width, data)
+            self.tft.flush()
+            self.count += 1
+            return
+        # Solda görünen (en eski) kartın yuvası
+        slot = self.tft.scroll_offset // self.card_width
+        draw_scan_card(self.tft, slot * self.card_width, self.card_width, data)
+        self.tft.flush()
+        self.tft.scroll_to(self.tft.scroll_offset + self.card_width)
+
+    def stop(self):
+        """Kaydırmayı sıfırlar; sonraki ekran bellekteki yerinde görünür."""
+        if self.active:
+            self.tft.scroll_to(0)
+            self.active = False
+
+
+class RenderWorker:
+    """
+    Ekranı tek bir thread'den çizer; olayları çeken döngü çizimi beklemez.
+
+    Olaylar sınırlı bir kuyruğa eklenir (dolarsa en eskisi düşer). Worker her
+    uyanışta bekleyen olayların hepsini birlikte alır:
+      - tek olay ve ekranda başka olay yokken -> olay ekranı (giriş / çıkış / hata)
+      - aynı anda birden çok olay veya önceki olay ekranı henüz kalkmamışken
+        -> "son okutmalar" listesi; aradaki eskimiş ekranlar hiç çizilmez
+    Olay ekranı EVENT_HOLD_SECONDS sonra ana ekrana döner; bu sürede yeni olay
+    gelirse beklenmeden ona geçilir.
+
+    ticker verilirse yoğunluk görünümü liste yerine kayan kart şerididir
+    (ScanTicker): şerit açıkken gelen her okutma yalnızca bir kart çizer.
+    """
+
+    def __init__(self, tft: ILI9486, hold=EVENT_HOLD_SECONDS, max_pending=RENDER_QUEUE_SIZE, ticker=None):
+        self.tft = tft
+        self.ticker = ticker
+        self.hold = hold
+        self.pending = deque(maxlen=max_pending)
+        self.recent = deque(maxlen=RECENT_SCANS)
+        self.cond = threading.Condition()
+        self.home_at = None     # Ana ekrana dönüş zamanı (monotonic)
+        self.showing = False    # Ekranda hâlâ bir olay ekranı var mı
+        self.dropped = 0
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="panel-render", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def submit(self, events):
+        """Yeni olayları kuyruğa ekler ve worker'ı uyandırır (beklemeden döner)."""
+        with self.cond:
+            for event in events:
+                if len(self.pending) == self.pending.maxlen:
+                    self.dropped += 1
+                self.pending.append(event)
+                self.recent.append(event)
+            self.cond.notify()
+
+    def invalidate_layer(self, name):
+        """
+        Ekran katmanını geçersiz kılar; bir sonraki çizimde yeniden hazırlanır.
+        Ana ekran değiştiyse ve şu an olay ekranı yoksa hemen yeniden çizilir.
+        """
+        with self.cond:
+            self.tft.drop_layer(name)
+            if name == "home" and not self.showing:
+                self.home_at = time.monotonic()
+            self.cond.notify()
+
+    def request_home(self):
+        """Ana ekranı hemen yeniden çizdirir (ör. hata sonrası)."""
+        with self.cond:
+            self.home_at = time.monotonic()
+            self.cond.notify()
+
+    def _next_batch(self):
+        """
+        Çizilecek işi bekler: ("events", olaylar, son okutmalar, yoğun mu),
+        ("home", ...) veya durdurulduysa (None, ...).
+        """
+        with self.cond:
+            while not self.pending and not self.stopped:
+                if self.home_at is None:
+                    self.cond.wait()
+                    continue
+                remaining = self.home_at - time.monotonic()
+                if remaining <= 0:
+                    self.home_at = None
+                    self.showing = False
+                    return "home", [], [], False
+                self.cond.wait(remaining)
+            if self.stopped:
+                return None, [], [], False
+            batch = list(self.pending)
+            self.pending.clear()
+            busy = len(batch) > 1 or self.showing
+            return "events", batch, list(self.recent), busy
+
+    def _run(self):
+        while True:
+            kind, batch, recent, busy = self._next_batch()
+            if kind is None:
+                break
+            try:
+                if kind == "home":
+                    self._stop_ticker()
+                    draw_home_screen(self.tft)
+                    continue
+                if busy:
+                    if len(batch) > 1:
+                        log.info(f"{len(batch)} olay birlikte gösteriliyor")
+                    self._show_busy(batch, recent)
+                else:
+                    self._stop_ticker()
+                    show_event(self.tft, batch[0])
+                with self.cond:
+                    self.showing = True
+                    self.home_at = time.monotonic() + self.hold
+            except Exception as e:
+                log.error(f"Çizim hatası: {e}")
+                traceback.print_exc()
+                with self.cond:
+                    self.home_at = time.monotonic() + 1
+
+    def _show_busy(self, batch, recent):
+        if self.ticker is None:
+            show_recent(self.tft, recent)
+        elif not self.ticker.active:
+            self.ticker.start(recent)
+        else:
+            for event in batch[-self.ticker.slots:]:
+                self.ticker.add(event)
+
+    def _stop_ticker(self):
+        if self.ticker is not None:
+            self.ticker.stop()
+
+
 def main():
     log.info("LCD başlatılıyor...")
-    tft = ILI9486()
+    try:
+        # Ekranlar tampona çizilir, yalnızca değişen bölgeler gönderilir
+        tft = ILI9486(buffered=True)
+    except ImportError:
+        log.warning("numpy yok, ekran tamponsuz (doğrudan) çiziliyor")
+        tft = ILI9486()
     time.sleep(0.5)
 
+    network.refresh()
+    prepare_layers(tft)
+
     log.info("Başlangıç ekranı...")
     draw_home_screen(tft)
 
+    worker = RenderWorker(tft, ticker=ScanTicker(tft))
+    worker.start()
+    # IP değişince yalnızca ana ekran katmanı yenilenir
+    network.on_change = lambda address: worker.invalidate_layer("home")
+    network.start()
+
     log.info("Parmak izini bekliyor...")
+    try:
+        event_loop(worker)
+    finally:
+        network.stop()
+        worker.stop()
+        tft.cleanup()
+
+
+def event_loop(worker: RenderWorker):
+    after = None  # Son görülen olay sıra numarası
 
     while True:
         try:
-            data, err = fetch_last_event()
+            data, err = fetch_events(after)
 
             if err:
                 log.error(f"API hatası: {err}")
                 time.sleep(1)
                 continue
 
-            if not data or data.get("status") == "empty":
-                time.sleep(0.1)
-                continue
-
-            if data.get("status") != "ok":
+            if not data or data.get("status") not in ("ok", "empty"):
                 msg = data.get("msg", "Bilinmeyen hata") if data else "Bilinmeyen hata"
                 log.warning(f"Beklenmeyen cevap: {msg}")
-                show_error(tft, msg=msg)
-                time.sleep(1.5)
-                draw_home_screen(tft)
+                time.sleep(1)
+                continue
+
+            # İlk istek veya sunucu yeniden başladıysa imleci sunucuya eşitle
+            after = data.get("seq", after)
+            events = data.get("events") or []
+            if not events:
                 continue
 
-            # Burada JSON'dan ad-soyadı çekiyoruz
-            user = data.get("user", {}) or {}
-            first_name = user.get("first_name", "").strip()
-            last_name = user.get("last_name", "").strip()
-            full_name = (first_name + " " + last_name).strip()
-            event = data.get("event", "")
-            msg = data.get("msg") or "KAYITSIZ"
-
-            log.info(f"Event={event}, User={full_name}")
-
-            if event == "check_in":
-                show_welcome(tft, full_name)
-            elif event == "check_out":
-                total_minutes = int(data.get("total_duration_minutes", 0) or 0)
-                show_goodbye(tft, full_name, total_minutes)
-            elif event == "error":
-                show_error(tft, msg=msg)
-            else:
-                show_error(tft, msg=f"Bilinmeyen event: {event}")
-
-            time.sleep(1.5)
-            draw_home_screen(tft)
+            # Çizim worker thread'inde; burada hemen bir sonraki olayı beklemeye dönülür
+            worker.submit(events)
 
         except Exception as e:
             log.error(f"Exception: {e}")
-            import traceback
             traceback.print_exc()
             time.sleep(1)
-            draw_home_screen(tft)
+            worker.request_home()
 
 
 if __name__ == "__main__":
@@ -186,5 +527,3 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         log.info("Program durduruldu")
-        import RPi.GPIO as GPIO
-        GPIO.cleanup()
\ No newline at end of file
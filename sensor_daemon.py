@@ -0,0 +1,162 @@
+# sensor_daemon.py
+# Parmak izi sensörünün ve yoklama yazımının tek sahibi olan süreç.
+# /dev/serial0'ı yalnızca bu süreç açar; web süreçleri (SENSOR_MODE=daemon)
+# eşleştirme, kayıt, silme ve olay aboneliğini Unix socket üzerinden ister.
+# Böylece web sunucusu birden fazla worker ile çalışabilir.
+#
+# Kullanım:
+#   python3 sensor_daemon.py                     # data/sensor.sock
+#   SENSOR_MODE=daemon python3 app.py            # web süreci istemci olarak
+#
+# Protokol için: utils/sensor_ipc.py
+
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+
+# Sensörün sahibi bu süreç - app modülü seri portu burada açar
+os.environ["SENSOR_MODE"] = "local"
+
+import app as core
+from logger import setup_logger
+from utils import sensor_ipc
+
+log = setup_logger("sensor_daemon")
+
+MAX_MATCH_TIMEOUT = 30   # İstemcinin isteyebileceği en uzun okuma süresi
+
+
+def cmd_match(msg):
+    timeout = min(float(msg.get("timeout", 15)), MAX_MATCH_TIMEOUT)
+    return core.match_and_record(timeout=timeout)
+
+
+def cmd_enroll(msg):
+    return core.enroll_next_fingerprint()
+
+
+def cmd_delete(msg):
+    return core.delete_sensor_fingerprint(int(msg["fingerprint_id"]))
+
+
+def cmd_status(msg):
+    return {"status": "ok", "sensor_ready": core.sensor_available(), "seq": core.event_bus.seq}, 200
+
+
+COMMANDS = {
+    "match": cmd_match,
+    "enroll": cmd_enroll,
+    "delete": cmd_delete,
+    "status": cmd_status,
+}
+
+
+class SensorRequestHandler(socketserver.StreamRequestHandler):
+    """Bağlantı başına tek istek; subscribe için bağlantı açık kalır."""
+
+    def send(self, message):
+        self.wfile.write(sensor_ipc.encode(message))
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            self.send({"status": "error", "msg": "Geçersiz istek", "http_status": 400})
+            return
+
+        cmd = msg.get("cmd")
+        if cmd == "subscribe":
+            self.stream_events(int(msg.get("after", 0)))
+            return
+
+        handler = COMMANDS.get(cmd)
+        if handler is None:
+            self.send({"status": "error", "msg": f"Bilinmeyen komut: {cmd}", "http_status": 400})
+            return
+        try:
+            data, status = handler(msg)
+        except Exception as e:
+            log.error(f"DAEMON {cmd} hatası: {e}")
+            data, status = {"status": "error", "msg": str(e)}, 500
+        self.send(dict(data, http_status=status))
+
+    def stream_events(self, after):
+        # Daemon yeniden başladıysa istemcinin imleci ileride kalır - sıfırla
+        after = min(after, core.event_bus.seq)
+        try:
+            while True:
+                events, seq = core.event_bus.wait(after, sensor_ipc.SUBSCRIBE_KEEPALIVE_SECONDS)
+                if not events:
+                    self.send({"event": "keepalive", "seq": seq})
+                for event in events:
+                    self.send(event)
+                after = seq
+        except OSError:
+            pass  # Abone bağlantıyı kapattı
+
+
+class SensorServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def remove_stale_socket(path):
+    """Önceki çalışmadan kalan socket dosyasını siler; başka daemon çalışıyorsa hata verir."""
+    if not os.path.exists(path):
+        return
+    try:
+        sensor_ipc.request("status", path, io_timeout=2)
+    except sensor_ipc.SensorUnavailable:
+        os.remove(path)
+        return
+    raise RuntimeError(f"Başka bir sensor_daemon çalışıyor: {path}")
+
+
+def create_server(path):
+    remove_stale_socket(path)
+    server = SensorServer(path, SensorRequestHandler)
+    os.chmod(path, 0o660)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parmak izi sensör servisi")
+    parser.add_argument("--socket", default=sensor_ipc.SOCKET_PATH, help="Unix socket yolu")
+    args = parser.parse_args(argv)
+
+    core.init_db_if_needed()
+    server = create_server(args.socket)
+
+    if core.sensor:
+        threading.Thread(target=core.sensor_background_loop, daemon=True).start()
+        log.info("DAEMON Arka plan parmak okuma başlatıldı")
+    else:
+        log.warning("DAEMON Sensör yok, yalnızca IPC servisi çalışıyor")
+
+    def _shutdown(signum, frame):
+        log.info("DAEMON Kapatılıyor...")
+        # serve_forever'ı çalıştığı thread'den durdurmak kilitlenir
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    log.info(f"DAEMON Dinleniyor: {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,6 +28,7 @@ mkdir -p "$PID_DIR"
 APP_PID="$PID_DIR/app.pid"
 PANEL_PID="$PID_DIR/panel.pid"
 AUTO_PID="$PID_DIR/automation.pid"
+SENSOR_PID="$PID_DIR/sensor.pid"
 
 # Önceki işlemleri durdur
 stop_services() {
@@ -48,7 +49,13 @@ tim
         rm -f "$AUTO_PID"
     fi
     
+    if [ -f "$SENSOR_PID" ]; then
+        kill $(cat "$SENSOR_PID") 2>/dev/null
+        rm -f "$SENSOR_PID"
+    fi
+    
     # Python süreçlerini de temizle
+    pkill -f "python3.*sensor_daemon.py" 2>/dev/null
     pkill -f "python3.*app.py" 2>/dev/null
     pkill -f "python3.*panel_ui.py" 2>/dev/null
     pkill -f "python3.*automation.py" 2>/dev/null
@@ -63,6 +70,24 @@ start_services() {
     echo -e "${GREEN}Servisler başlatılıyor...${NC}"
     echo ""
     
+    # 0. Sensör servisi (yalnızca SENSOR_MODE=daemon ise; app.py istemci olur)
+    if [ "$SENSOR_MODE" = "daemon" ]; then
+        echo -e "${BLUE}[0/3]${NC} Sensör servisi başlatılıyor..."
+        python3 "$PROJECT_DIR/sensor_daemon.py" &
+        echo $! > "$SENSOR_PID"
+        sleep 2
+        
+        if ps -p $(cat "$SENSOR_PID") > /dev/null 2>&1; then
+            echo -e "      ${GREEN}✓ Sensör servisi çalışıyor (PID: $(cat $SENSOR_PID))${NC}"
+        else
+            echo -e "      ${RED}✗ Sensör servisi başlatılamadı!${NC}"
+        fi
+    fi
+    
+    # Statik dosyaları özet adlarıyla derle (style.css -> style.<özet>.css, .gz/.br)
+    python3 "$PROJECT_DIR/utils/static_assets.py" > /dev/null || \
+        echo -e "      ${YELLOW}! Statik dosyalar derlenemedi, /static/ kullanılacak${NC}"
+    
     # 1. Flask Web Sunucusu (app.py)
     echo -e "${BLUE}[1/3]${NC} Flask sunucusu başlatılıyor..."
     python3 "$PROJECT_DIR/app.py" &
@@ -121,6 +146,10 @@ status_services() {
         echo -e "  Flask (app.py):       ${RED}Durdu${NC}"
     fi
     
+    if [ -f "$SENSOR_PID" ] && ps -p $(cat "$SENSOR_PID") > /dev/null 2>&1; then
+        echo -e "  Sensör servisi:       ${GREEN}Çalışıyor${NC} (PID: $(cat $SENSOR_PID))"
+    fi
+    
     if [ -f "$PANEL_PID" ] && ps -p $(cat "$PANEL_PID") > /dev/null 2>&1; then
         echo -e "  Panel (panel_ui.py):  ${GREEN}Çalışıyor${NC} (PID: $(cat $PANEL_PID))"
     else
@@ -0,0 +1,82 @@
+let isScanning = false;
+
+async function startScan() {
+  const scanBtn = document.getElementById('scanBtn');
+  const fpInput = document.getElementById('fingerprint_id');
+  const statusText = document.getElementById('status-text');
+  const progressContainer = document.getElementById('progress-container');
+  const detailText = document.getElementById('detail-text');
+  const progressText = document.getElementById('progress-text');
+  
+  if (isScanning) {
+    return;
+  }
+  
+  isScanning = true;
+  scanBtn.disabled = true;
+  fpInput.value = '';
+  statusText.textContent = '';
+  detailText.textContent = '';
+  progressContainer.style.display = 'block';
+  progressText.textContent = 'Parmak izi taranıyor... Sensöre parmağınızı tutunuz.';
+  
+  try {
+    console.log('[JS] Parmak izi tarama başlatılıyor...');
+    
+    const response = await fetch('/api/scan-fingerprint', {
+      method: 'GET',
+      headers: {
+        'Accept': 'application/json',
+      }
+    });
+    
+    const data = await response.json();
+    console.log('[JS] Response:', data);
+    
+    if (data.status === 'ok') {
+      fpInput.value = data.fingerprint_id;
+      statusText.textContent = ' Parmak izi başarıyla tarandı!';
+      statusText.style.color = '#10b981';
+      progressText.textContent = 'Başarılı!';
+      
+      const progressBar = document.getElementById('progressBar');
+      progressBar.classList.add('complete');
+      
+      document.getElementById('submitBtn').disabled = false;
+      
+      setTimeout(() => {
+        progressContainer.style.display = 'none';
+        progressBar.classList.remove('complete');
+      }, 2000);
+    } else {
+      statusText.textContent = ' ' + (data.msg || 'Parmak izi taraması başarısız');
+      statusText.style.color = '#dc2626';
+      if (data.hint) {
+        detailText.textContent = ' İpucu: ' + data.hint;
+        detailText.style.color = '#6b7280';
+      }
+      progressText.textContent = 'Başarısız - Tekrar deneyin';
+      
+      setTimeout(() => {
+        progressContainer.style.display = 'none';
+      }, 3000);
+    }
+  } catch (error) {
+    console.error('[JS] Hata:', error);
+    statusText.textContent = ' Bağlantı hatası: ' + error.message;
+    statusText.style.color = '#dc2626';
+    progressContainer.style.display = 'none';
+  } finally {
+    isScanning = false;
+    scanBtn.disabled = false;
+  }
+}
+
+// Form gönderimi
+document.getElementById('userForm').addEventListener('submit', function(e) {
+  const fpInput = document.getElementById('fingerprint_id');
+  if (!fpInput.value) {
+    e.preventDefault();
+    alert('Lütfen parmak izi tarayınız!');
+  }
+});
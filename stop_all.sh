@@ -13,7 +13,7 @@ PID_DIR="$PROJECT_DIR/data"
 echo -e "${YELLOW}Servisler durduruluyor...${NC}"
 
 # PID dosyalarından durdur
-for pid_file in "$PID_DIR/app.pid" "$PID_DIR/panel.pid" "$PID_DIR/automation.pid"; do
+for pid_file in "$PID_DIR/app.pid" "$PID_DIR/panel.pid" "$PID_DIR/automation.pid" "$PID_DIR/sensor.pid"; do
     if [ -f "$pid_file" ]; then
         pid=$(cat "$pid_file")
         if ps -p $pid > /dev/null 2>&1; then
@@ -28,5 +28,6 @@ done
 pkill -f "python3.*app.py" 2>/dev/null
 pkill -f "python3.*panel_ui.py" 2>/dev/null
 pkill -f "python3.*automation.py" 2>/dev/null
+pkill -f "python3.*sensor_daemon.py" 2>/dev/null
 
 echo -e "${GREEN}Tüm servisler durduruldu.${NC}"
@@ -0,0 +1,121 @@
+"""
+Rendering benchmark for panel_ui screens (no hardware needed)
+Every screen is drawn on the virtual ILI9486 bus (drivers/virtual_lcd.py) and
+measured in bus operations and wall time.
+
+Usage:
+    python tests/bench_panel.py [--direct] [--repeat N] [--png-dir DIR] [--json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add project and drivers directories to path (panel_ui.py ile aynı şekilde)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "drivers"))
+
+import ili9486
+import panel_ui
+from virtual_lcd import VirtualBus
+
+SAMPLE_NAME = "AHMET YILMAZ"
+
+# (ad, çizim fonksiyonu, argümanlar) - ekranlar ana ekrandan geçişle ölçülür
+SCREENS = [
+    ("home", panel_ui.draw_home_screen, ()),
+    ("loading", panel_ui.show_loading, ()),
+    ("error", panel_ui.show_error, ("KAYITSIZ",)),
+    ("welcome", panel_ui.show_welcome, (SAMPLE_NAME,)),
+    ("goodbye", panel_ui.show_goodbye, (SAMPLE_NAME, 495)),
+    ("recent", panel_ui.show_recent, ([
+        {"event": "check_in", "timestamp": "2024-01-15T09:00:00", "user": {"first_name": "AHMET", "last_name": "YILMAZ"}},
+        {"event": "check_out", "timestamp": "2024-01-15T09:01:00", "user": {"first_name": "AYSE", "last_name": "KAYA"}},
+        {"event": "error", "timestamp": "2024-01-15T09:02:00", "msg": "KAYITSIZ"},
+    ],)),
+]
+
+
+def make_virtual_panel(buffered=True, layers=True):
+    """
+    Sanal veri yolu üzerinde sürücü; başlatma beklemeleri atlanır.
+    layers=True ise panel_ui.main gibi ekran katmanları önceden hazırlanır.
+    """
+    bus = VirtualBus(ili9486.TFT_WIDTH, ili9486.TFT_HEIGHT, rs_pin=ili9486.PIN_RS)
+    with patch.object(ili9486.time, "sleep"):
+        tft = ili9486.ILI9486(bus=bus, buffered=buffered)
+    if layers:
+        panel_ui.prepare_layers(tft)
+    return tft, bus
+
+
+def measure_screen(tft, bus, draw, args=(), previous=None):
+    """
+    previous ekranından draw ekranına geçişi ölçer.
+    Dönen sözlük: bus_ops, strobes, line_writes, windows, data_bytes, seconds
+    """
+    if previous is not None:
+        previous(tft)
+    bus.reset_stats()
+    start = time.perf_counter()
+    draw(tft, *args)
+    elapsed = time.perf_counter() - start
+    result = dict(bus.stats)
+    result["bus_ops"] = bus.bus_ops
+    result["seconds"] = elapsed
+    return result
+
+
+def run_benchmark(buffered=True, repeat=3, png_dir=None, layers=True):
+    """Her ekranı repeat kez ölçer; wall time için en iyi sonuç tutulur."""
+    tft, bus = make_virtual_panel(buffered=buffered, layers=layers)
+    results = {}
+    for name, draw, args in SCREENS:
+        if name == "home":
+            previous = lambda t: panel_ui.show_welcome(t, SAMPLE_NAME)
+        else:
+            previous = panel_ui.draw_home_screen
+        best = None
+        for _ in range(repeat):
+            sample = measure_screen(tft, bus, draw, args, previous)
+            if best is None or sample["seconds"] < best["seconds"]:
+                best = sample
+        results[name] = best
+        if png_dir:
+            os.makedirs(png_dir, exist_ok=True)
+            bus.save_png(os.path.join(png_dir, f"{name}.png"))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="panel_ui rendering benchmark (virtual LCD)")
+    parser.add_argument("--direct", action="store_true", help="Tamponsuz (doğrudan) çizim")
+    parser.add_argument("--no-layers", action="store_true", help="Ekran katmanlarını hazırlamadan ölç")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--png-dir", help="Her ekranın PNG görüntüsünü bu dizine yaz")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args(argv)
+    # Her ekranda yazılan "Image loaded" kayıtları ölçümü boğmasın
+    logging.getLogger("lcd").setLevel(logging.WARNING)
+
+    results = run_benchmark(buffered=not args.direct, repeat=args.repeat, png_dir=args.png_dir,
+                            layers=not args.no_layers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    mode = "direct" if args.direct else "buffered"
+    print(f"panel_ui benchmark ({mode}, best of {args.repeat})")
+    print(f"{'screen':<10}{'bus ops':>12}{'bytes':>10}{'windows':>9}{'ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['bus_ops']:>12}{r['data_bytes']:>10}{r['windows']:>9}{r['seconds'] * 1000:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -517,6 +517,1103 @@ class TestIntegrationScenarios(unittest.TestCase):
         conn.close()
 
 
+class TestPresenceTable(unittest.TestCase):
+    """Test presence table maintained together with attendance writes"""
+    
+    def setUp(self):
+        """Create temporary database for testing"""
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        app.DB_PATH = self.db_path
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint_id INTEGER UNIQUE NOT NULL,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                department TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                check_in TEXT NOT NULL,
+                check_out TEXT,
+                duration_minutes INTEGER DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+        cursor.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (1, 'Test', 'User', 'Engineering')")
+        conn.commit()
+        conn.close()
+    
+    def tearDown(self):
+        """Remove temporary database"""
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+    
+    def get_presence(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT user_id, attendance_id, since FROM presence").fetchall()
+        conn.close()
+        return rows
+    
+    @patch('app.datetime')
+    @patch('app.get_current_work_day')
+    def test_check_in_and_out_update_presence(self, mock_work_day, mock_datetime):
+        """Test check-in inserts and check-out removes the presence row"""
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        mock_work_day.return_value = date(2025, 12, 16)
+        
+        mock_datetime.now.return_value = datetime(2025, 12, 16, 8, 0, 0)
+        app.process_attendance_event(1)
+        presence = self.get_presence()
+        self.assertEqual(len(presence), 1)
+        self.assertEqual(presence[0][0], 1)
+        self.assertEqual(presence[0][2], '2025-12-16T08:00:00')
+        
+        mock_datetime.now.return_value = datetime(2025, 12, 16, 12, 0, 0)
+        result, error = app.process_attendance_event(1)
+        self.assertIsNone(error)
+        self.assertEqual(result['event'], 'check_out')
+        self.assertEqual(self.get_presence(), [])
+    
+    def test_existing_open_sessions_are_backfilled(self):
+        """Test that presence is built from open sessions on first use"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, '2025-12-16', '2025-12-16T08:00:00', NULL, 0)")
+        conn.commit()
+        conn.close()
+        
+        app.get_db().close()
+        self.assertEqual(self.get_presence(), [(1, 1, '2025-12-16T08:00:00')])
+    
+    def test_force_checkout_clears_presence(self):
+        """Test admin force checkout closes the session and presence row"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, '2025-12-16', '2025-12-16T08:00:00', NULL, 0)")
+        conn.commit()
+        conn.close()
+        
+        client = app.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user'] = 'admin'
+            sess['role'] = 'admin'
+        response = client.post('/admin/force-checkout/1')
+        self.assertEqual(response.status_code, 302)
+        
+        self.assertEqual(self.get_presence(), [])
+        conn = sqlite3.connect(self.db_path)
+        check_out = conn.execute("SELECT check_out FROM attendance WHERE id = 1").fetchone()[0]
+        conn.close()
+        self.assertIsNotNone(check_out)
+
+
+class TestReportApi(unittest.TestCase):
+    """Test historical report API with keyset pagination"""
+    
+    def setUp(self):
+        """Create temporary database with a few months of data"""
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        app.DB_PATH = self.db_path
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint_id INTEGER UNIQUE NOT NULL,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                department TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                check_in TEXT NOT NULL,
+                check_out TEXT,
+                duration_minutes INTEGER DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+        cursor.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (1, 'Test', 'User', 'Engineering')")
+        cursor.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (2, 'Other', 'User', 'Design')")
+        start = date(2025, 10, 1)
+        for day in range(90):
+            d = (start + timedelta(days=day)).isoformat()
+            for user_id in (1, 2):
+                for hour in (8, 13):
+                    cursor.execute(
+                        "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (?, ?, ?, ?, 180)",
+                        (user_id, d, f"{d}T{hour:02d}:00:00", f"{d}T{hour + 3:02d}:00:00")
+                    )
+        conn.commit()
+        conn.close()
+        
+        self.client = app.app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user'] = 'admin'
+            sess['role'] = 'admin'
+    
+    def tearDown(self):
+        """Remove temporary database"""
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+    
+    def test_report_db_is_read_only_without_snapshot(self):
+        """Test that the pre-snapshot fallback cannot write to the primary"""
+        from utils.db_snapshot import snapshot_path_for
+        self.assertFalse(os.path.exists(snapshot_path_for(self.db_path)))
+        conn = app.get_report_db()
+        try:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 2)
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM attendance")
+        finally:
+            conn.close()
+    
+    def test_full_range_streams_all_rows(self):
+        """Test that a multi-month range returns every session in order"""
+        response = self.client.get('/api/reports/attendance?from=2025-10-01&to=2025-12-29')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['count'], 360)
+        self.assertIsNone(data['next'])
+        keys = [(r['date'], r['id']) for r in data['rows']]
+        self.assertEqual(keys, sorted(keys))
+    
+    def test_keyset_pagination(self):
+        """Test that following 'next' visits each row exactly once"""
+        url = '/api/reports/attendance?from=2025-11-01&to=2025-11-30&limit=7'
+        seen = []
+        cursor = None
+        while True:
+            page = self.client.get(url + (f'&after={cursor}' if cursor else '')).get_json()
+            seen.extend(r['id'] for r in page['rows'])
+            cursor = page['next']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 30 * 4)
+        self.assertEqual(len(set(seen)), len(seen))
+    
+    def test_user_and_department_filters(self):
+        """Test filtering by user and department"""
+        data = self.client.get('/api/reports/attendance?from=2025-10-01&to=2025-10-10&user=1').get_json()
+        self.assertEqual(data['count'], 20)
+        self.assertTrue(all(r['user_id'] == 1 for r in data['rows']))
+        
+        data = self.client.get('/api/reports/attendance?from=2025-10-01&to=2025-10-10&department=Design').get_json()
+        self.assertEqual(data['count'], 20)
+        self.assertTrue(all(r['department'] == 'Design' for r in data['rows']))
+    
+    def test_invalid_range_rejected(self):
+        """Test that reversed or malformed ranges return 400"""
+        response = self.client.get('/api/reports/attendance?from=2025-10-10&to=2025-10-01')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/reports/attendance?from=yesterday')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/reports/attendance?from=2025-10-01&to=2025-10-10&user=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('user', response.get_json()['msg'])
+        response = self.client.get('/api/reports/attendance?from=2025-10-01&to=2025-10-10&limit=ten')
+        self.assertEqual(response.status_code, 400)
+
+    def test_attendance_range_not_capped(self):
+        """Test that the paginated session list accepts multi-year historical ranges"""
+        response = self.client.get('/api/reports/attendance?from=2020-01-01&to=2025-12-31&limit=5')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['count'], 5)
+        self.assertIsNotNone(data['next'])
+    
+    def test_summary_page_accepts_range(self):
+        """Test that the HTML summary reuses the same range parameters"""
+        response = self.client.get('/weekly-summary?from=2025-10-01&to=2025-10-31')
+        self.assertEqual(response.status_code, 200)
+        # 31 days x 2 sessions x 180 minutes = 186 hours
+        self.assertIn('186s 0d', response.get_data(as_text=True))
+
+    def test_csv_export_granularities(self):
+        """Test that CSV exports stream one row per session, day or week"""
+        import csv, io
+        expected = {'session': 360, 'day': 180, 'week': 28, 'summary': 2}
+        for granularity, count in expected.items():
+            response = self.client.get(
+                f'/reports/export?from=2025-10-01&to=2025-12-29&granularity={granularity}&format=csv'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_streamed)
+            self.assertIn('attachment', response.headers['Content-Disposition'])
+            rows = list(csv.reader(io.StringIO(response.get_data().decode('utf-8-sig'))))
+            self.assertEqual(len(rows) - 1, count, granularity)
+
+        # Haftalar Pazartesi'den başlar; 2025-10-01 Çarşamba
+        response = self.client.get('/reports/export?from=2025-10-01&to=2025-10-12&granularity=week&format=csv&user=1')
+        rows = list(csv.reader(io.StringIO(response.get_data().decode('utf-8-sig'))))[1:]
+        self.assertEqual([(r[0], r[4], r[5]) for r in rows], [('2025-09-29', '10', '1800'), ('2025-10-06', '14', '2520')])
+
+    def test_xlsx_export_direct_range(self):
+        """Test that a month-long Excel export is sent directly and cleans up the temp file"""
+        import glob
+        response = self.client.get('/reports/export?from=2025-10-01&to=2025-10-31&granularity=day&format=xlsx')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data()
+        self.assertTrue(body.startswith(b'PK'))
+        self.assertEqual(len(body), int(response.headers['Content-Length']))
+        response.close()
+        self.assertEqual(glob.glob(os.path.join(app.EXPORT_TMP_DIR, 'export_*.xlsx')), [])
+
+        response = self.client.get('/weekly-summary-excel?from=2025-10-01&to=2025-10-31')
+        self.assertIn('haftalik_ozet_2025-10-01_to_2025-10-31.xlsx', response.headers['Content-Disposition'])
+        response.close()
+
+    def test_xlsx_head_leaves_no_temp_file(self):
+        """Test that a HEAD request (body never read) does not leave the temp xlsx behind"""
+        import glob
+        for url in ('/weekly-summary-excel?from=2025-10-01&to=2025-10-31',
+                    '/reports/export?from=2025-10-01&to=2025-10-31&granularity=day&format=xlsx'):
+            response = self.client.head(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(int(response.headers['Content-Length']), 0)
+            self.assertEqual(glob.glob(os.path.join(app.EXPORT_TMP_DIR, 'export_*')), [])
+            response.close()
+
+    def test_long_xlsx_goes_through_job_queue(self):
+        """Test that a long Excel range is built by the job queue instead of inside the request"""
+        import shutil, time
+        reports_dir = tempfile.mkdtemp()
+        original_jobs = app.report_jobs
+        app.report_jobs = app.ReportJobQueue(app.build_export_file, directory=reports_dir)
+        try:
+            app.get_db().close()  # meta/data_version tablosu
+            url = '/reports/export?from=2024-01-01&to=2025-12-31&granularity=day&format=xlsx'
+            with patch('app.export_response') as mock_export:
+                response = self.client.get(url)
+            mock_export.assert_not_called()
+            self.assertEqual(response.status_code, 302)
+            self.assertIn('job=', response.headers['Location'])
+
+            page = self.client.get(response.headers['Location']).get_data(as_text=True)
+            self.assertIn('pollReportJob({', page)
+
+            deadline = time.time() + 10
+            job_id = response.headers['Location'].split('job=')[1].split('&')[0]
+            while app.report_jobs.get(job_id)['status'] != 'done' and time.time() < deadline:
+                time.sleep(0.05)
+            # Hazır dosya: aynı istek doğrudan indirir
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.get_data().startswith(b'PK'))
+            response.close()
+
+            response = self.client.get('/weekly-summary-excel?from=2025-01-01&to=2025-12-31')
+            self.assertEqual(response.status_code, 302)
+        finally:
+            app.report_jobs = original_jobs
+            shutil.rmtree(reports_dir, ignore_errors=True)
+
+    def test_background_report_job(self):
+        """Test that report jobs build in the background and reuse artefacts until data changes"""
+        import shutil, time
+        reports_dir = tempfile.mkdtemp()
+        original_jobs = app.report_jobs
+        app.report_jobs = app.ReportJobQueue(app.build_export_file, directory=reports_dir)
+        try:
+            app.get_db().close()  # meta/data_version tablosu
+            query = {'from': '2025-10-01', 'to': '2025-12-29', 'granularity': 'day', 'format': 'csv'}
+            response = self.client.post('/api/reports/jobs', data=query)
+            self.assertEqual(response.status_code, 202)
+            job = response.get_json()
+
+            deadline = time.time() + 10
+            while job['status'] in ('queued', 'running') and time.time() < deadline:
+                time.sleep(0.05)
+                job = self.client.get(job['status_url']).get_json()
+            self.assertEqual(job['status'], 'done')
+
+            response = self.client.get(job['download_url'])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.get_data().decode('utf-8-sig').splitlines()), 181)
+            response.close()
+
+            # Aynı istek: hazır dosya
+            again = self.client.post('/api/reports/jobs', data=query)
+            self.assertEqual(again.status_code, 200)
+            self.assertEqual(again.get_json()['id'], job['id'])
+
+            # Veri değişti: yeni iş
+            conn = app.get_db()
+            conn.execute("UPDATE attendance SET duration_minutes = 200 WHERE id = 1")
+            conn.commit()
+            conn.close()
+            changed = self.client.post('/api/reports/jobs', data=query)
+            self.assertEqual(changed.status_code, 202)
+            self.assertNotEqual(changed.get_json()['id'], job['id'])
+
+            self.assertEqual(self.client.get('/api/reports/jobs/unknown').status_code, 404)
+            self.assertEqual(self.client.post('/api/reports/jobs', data={'format': 'pdf'}).status_code, 400)
+        finally:
+            app.report_jobs = original_jobs
+            shutil.rmtree(reports_dir, ignore_errors=True)
+
+    def test_invalid_export_redirects(self):
+        """Test that unknown granularity or format is rejected"""
+        response = self.client.get('/reports/export?granularity=month&format=csv')
+        self.assertEqual(response.status_code, 302)
+        response = self.client.get('/reports/export?granularity=day&format=pdf')
+        self.assertEqual(response.status_code, 302)
+        response = self.client.get('/reports/export?granularity=day&format=csv&user=abc')
+        self.assertEqual(response.status_code, 302)
+
+
+class TestEventBus(unittest.TestCase):
+    """Test display event fan-out and long-poll endpoint"""
+    
+    def setUp(self):
+        self.bus = app.EventBus(size=4)
+        self.original_bus = app.event_bus
+        app.event_bus = self.bus
+        self.client = app.app.test_client()
+    
+    def tearDown(self):
+        app.event_bus = self.original_bus
+    
+    def test_every_consumer_sees_every_event(self):
+        """Test that reading events does not consume them"""
+        self.bus.publish({"event": "check_in"})
+        self.bus.publish({"event": "check_out"})
+        
+        first, seq = self.bus.wait(0, 0)
+        second, _ = self.bus.wait(0, 0)
+        self.assertEqual([e["event"] for e in first], ["check_in", "check_out"])
+        self.assertEqual(first, second)
+        self.assertEqual(seq, 2)
+        self.assertEqual(self.bus.wait(seq, 0), ([], 2))
+    
+    def test_burst_is_not_lost(self):
+        """Test that back-to-back events within the ring size are all delivered"""
+        for i in range(3):
+            app.publish_display_event("check_in", user={"first_name": f"U{i}", "last_name": ""})
+        events, _ = self.bus.wait(0, 0)
+        self.assertEqual([e["seq"] for e in events], [1, 2, 3])
+    
+    def test_wait_wakes_on_publish(self):
+        """Test that a waiting consumer returns as soon as an event arrives"""
+        import threading
+        timer = threading.Timer(0.05, self.bus.publish, args=({"event": "error"},))
+        timer.start()
+        events, seq = self.bus.wait(0, 5)
+        timer.join()
+        self.assertEqual(seq, 1)
+        self.assertEqual(events[0]["event"], "error")
+    
+    def test_cursor_ahead_of_server(self):
+        """Test that a client cursor from before a restart is reset without waiting"""
+        self.bus.publish({"event": "check_in"})
+        self.assertEqual(self.bus.wait(99, 5), ([], 1))
+    
+    def test_long_poll_endpoint(self):
+        """Test /api/last-event cursor handshake and event delivery"""
+        data = self.client.get('/api/last-event').get_json()
+        self.assertEqual(data, {"status": "empty", "seq": 0})
+        
+        app.publish_display_event("error", msg="KAYITSIZ")
+        data = self.client.get('/api/last-event?after=0&timeout=1').get_json()
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["seq"], 1)
+        self.assertEqual(data["events"][0]["msg"], "KAYITSIZ")
+        
+        data = self.client.get('/api/last-event?after=1&timeout=0').get_json()
+        self.assertEqual(data, {"status": "empty", "seq": 1})
+
+
+class TestSensorDaemon(unittest.TestCase):
+    """Test sensor daemon IPC and daemon-mode client helpers"""
+    
+    def setUp(self):
+        import threading
+        import sensor_daemon
+        from utils import sensor_ipc
+        self.sensor_ipc = sensor_ipc
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, "sensor.sock")
+        self.original_bus = app.event_bus
+        app.event_bus = app.EventBus()
+        self.server = sensor_daemon.create_server(self.socket_path)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.original_socket = sensor_ipc.SOCKET_PATH
+        sensor_ipc.SOCKET_PATH = self.socket_path
+    
+    def tearDown(self):
+        import shutil
+        self.server.shutdown()
+        self.server.server_close()
+        self.sensor_ipc.SOCKET_PATH = self.original_socket
+        app.event_bus = self.original_bus
+        app.SENSOR_MODE = "local"
+        shutil.rmtree(self.tmp_dir)
+    
+    def test_status_and_unknown_command(self):
+        """Test basic request/response over the socket"""
+        data = self.sensor_ipc.request("status")
+        self.assertEqual(data["status"], "ok")
+        self.assertFalse(data["sensor_ready"])
+        data = self.sensor_ipc.request("reboot")
+        self.assertEqual(data["http_status"], 400)
+    
+    def test_daemon_mode_forwards_commands(self):
+        """Test that web helpers in daemon mode get the daemon's answer"""
+        app.SENSOR_MODE = "daemon"
+        # Daemon runs in-process here, so it must answer in local mode
+        with patch('sensor_daemon.core.match_and_record',
+                   return_value=({"status": "error", "msg": "Fingerprint sensor not available"}, 500)):
+            data, status = app.match_and_record(timeout=1)
+        self.assertEqual(status, 500)
+        self.assertEqual(data["msg"], "Fingerprint sensor not available")
+    
+    def test_daemon_unreachable(self):
+        """Test that a missing daemon is reported instead of hanging"""
+        app.SENSOR_MODE = "daemon"
+        self.sensor_ipc.SOCKET_PATH = os.path.join(self.tmp_dir, "missing.sock")
+        data, status = app.match_and_record(timeout=1)
+        self.assertEqual(status, 503)
+        self.assertEqual(data["status"], "error")
+    
+    def test_event_relay(self):
+        """Test that daemon events are republished by the relay thread"""
+        import threading
+        import time
+        received = []
+        done = threading.Event()
+        
+        def publish(event):
+            received.append(event)
+            done.set()
+        
+        relay = self.sensor_ipc.start_event_relay(publish, self.socket_path)
+        try:
+            # Wait until the relay has its starting cursor, then publish in the "daemon"
+            for _ in range(100):
+                if relay.after is not None:
+                    break
+                time.sleep(0.02)
+            app.publish_display_event("check_in", user={"first_name": "Test", "last_name": "User"})
+            self.assertTrue(done.wait(2))
+        finally:
+            relay.stop()
+        self.assertEqual(received[0]["event"], "check_in")
+        self.assertEqual(received[0]["user"]["first_name"], "Test")
+    
+    def test_stale_socket_is_replaced(self):
+        """Test that a leftover socket file does not block startup but a live daemon does"""
+        import sensor_daemon
+        with self.assertRaises(RuntimeError):
+            sensor_daemon.create_server(self.socket_path)
+        stale = os.path.join(self.tmp_dir, "stale.sock")
+        open(stale, "w").close()
+        server = sensor_daemon.create_server(stale)
+        server.server_close()
+
+
+class TestServing(unittest.TestCase):
+    """Test production server pool, drain and one-time background startup"""
+    
+    @staticmethod
+    def wsgi_app(environ, start_response):
+        import time
+        if environ["PATH_INFO"] == "/slow":
+            time.sleep(0.5)
+        start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", "2")])
+        return [b"ok"]
+    
+    def start_server(self, threads=2):
+        import threading
+        from utils import wsgi_server
+        server = wsgi_server.PooledWSGIServer(
+            "127.0.0.1", 0, self.wsgi_app, threads=threads,
+            handler=wsgi_server.make_handler(timeout=5, keepalive=1)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    
+    def fetch(self, server, path):
+        from urllib.request import urlopen
+        with urlopen(f"http://127.0.0.1:{server.port}{path}", timeout=5) as r:
+            return r.read()
+    
+    def test_slow_request_does_not_block_others(self):
+        """Test that a fast request is served while a slow one is running"""
+        import threading
+        import time
+        server = self.start_server()
+        slow = threading.Thread(target=self.fetch, args=(server, "/slow"))
+        slow.start()
+        time.sleep(0.1)
+        start = time.time()
+        self.assertEqual(self.fetch(server, "/"), b"ok")
+        self.assertLess(time.time() - start, 0.4)
+        slow.join()
+        server.shutdown()
+        server.server_close()
+    
+    def test_drain_waits_for_running_requests(self):
+        """Test that shutdown lets in-flight requests finish"""
+        import threading
+        import time
+        server = self.start_server()
+        results = []
+        slow = threading.Thread(target=lambda: results.append(self.fetch(server, "/slow")))
+        slow.start()
+        time.sleep(0.1)
+        server.shutdown()
+        self.assertTrue(server.drain(timeout=5))
+        slow.join()
+        self.assertEqual(results, [b"ok"])
+        server.server_close()
+    
+    def open_stream(self, server, path):
+        """Raw socket ile istek gönderip durum satırını döndürür (bağlantı açık kalır)."""
+        import socket
+        sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        status = sock.makefile("rb").readline().decode()
+        return sock, status
+    
+    def test_open_streams_leave_workers_for_requests(self):
+        """Test that `threads` open SSE streams do not starve a normal request"""
+        import threading
+        import time
+        from utils import wsgi_server
+        threads = 4
+        bus = app.EventBus()
+        server = wsgi_server.PooledWSGIServer(
+            "127.0.0.1", 0, app.app, threads=threads,
+            handler=wsgi_server.make_handler(timeout=5, keepalive=1)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        sockets = []
+        try:
+            with patch.object(app, 'event_bus', bus), \
+                    patch.object(app.stream_slots, 'limit', threads // 2):
+                statuses = []
+                for _ in range(threads):
+                    sock, status = self.open_stream(server, "/api/events")
+                    sockets.append(sock)
+                    statuses.append(status.split()[1])
+                self.assertEqual(statuses, ["200", "200", "503", "503"])
+                
+                start = time.time()
+                self.assertIn(b'"seq"', self.fetch(server, "/api/last-event"))
+                self.assertLess(time.time() - start, 2)
+                
+                bus.close()
+                for _ in range(100):
+                    if app.stream_slots.count == 0:
+                        break
+                    time.sleep(0.02)
+                self.assertEqual(app.stream_slots.count, 0)
+        finally:
+            for sock in sockets:
+                sock.close()
+            server.shutdown()
+            server.server_close()
+    
+    def test_long_poll_refused_when_streams_full(self):
+        """Test that a waiting long-poll gets 503 when no stream slot is free"""
+        client = app.app.test_client()
+        with patch.object(app.stream_slots, 'limit', 0):
+            response = client.get('/api/last-event?after=0&timeout=5')
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('Retry-After', response.headers)
+            # Beklemeyen istek (timeout=0) yer tutmaz
+            self.assertEqual(client.get('/api/last-event?after=0').status_code, 200)
+    
+    def test_full_queue_rejects_with_503(self):
+        """Test that connections beyond the queue limit are refused instead of waiting"""
+        import threading
+        import time
+        from urllib.error import HTTPError
+        from utils import wsgi_server
+        server = wsgi_server.PooledWSGIServer(
+            "127.0.0.1", 0, self.wsgi_app, threads=1, queue_size=1,
+            handler=wsgi_server.make_handler(timeout=5, keepalive=0)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        waiting = [threading.Thread(target=self.fetch, args=(server, "/slow")) for _ in range(2)]
+        for t in waiting:
+            t.start()
+            time.sleep(0.1)
+        start = time.time()
+        with self.assertRaises(HTTPError) as ctx:
+            self.fetch(server, "/")
+        self.assertEqual(ctx.exception.code, 503)
+        self.assertLess(time.time() - start, 0.3)
+        for t in waiting:
+            t.join()
+        server.shutdown()
+        server.server_close()
+    
+    def test_event_bus_close_releases_waiters(self):
+        """Test that closing the bus ends long-poll waits immediately"""
+        import threading
+        import time
+        bus = app.EventBus()
+        threading.Timer(0.05, bus.close).start()
+        start = time.time()
+        self.assertEqual(bus.wait(0, 10), ([], 0))
+        self.assertLess(time.time() - start, 1)
+    
+    @patch('app.start_snapshot_refresher')
+    @patch('app.start_backup_scheduler')
+    @patch('app.init_db_if_needed')
+    def test_background_services_start_once(self, mock_init, mock_backup, mock_snapshot):
+        """Test that schedulers are not started twice in one process"""
+        original = app._background_started
+        app._background_started = False
+        try:
+            with patch('app.sensor', None):
+                self.assertTrue(app.start_background_services())
+                self.assertFalse(app.start_background_services())
+        finally:
+            app._background_started = original
+        mock_backup.assert_called_once()
+        mock_snapshot.assert_called_once()
+
+
+class TestDashboardStream(unittest.TestCase):
+    """Test dashboard row deltas published on attendance writes"""
+    
+    def setUp(self):
+        TestPresenceTable.setUp(self)
+        self.original_buses = (app.event_bus, app.dashboard_bus)
+        app.event_bus = app.EventBus()
+        app.dashboard_bus = app.EventBus()
+    
+    def tearDown(self):
+        app.event_bus, app.dashboard_bus = self.original_buses
+        TestPresenceTable.tearDown(self)
+    
+    def scan_at(self, mock_datetime, hour):
+        mock_datetime.now.return_value = datetime(2025, 12, 16, hour, 0, 0)
+        return app.process_attendance_event(1)
+    
+    @patch('app.datetime')
+    @patch('app.get_current_work_day')
+    def test_row_deltas_follow_check_in_and_out(self, mock_work_day, mock_datetime):
+        """Test that each scan publishes the user's row and the counters"""
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        mock_work_day.return_value = date(2025, 12, 16)
+        app.dashboard_bus.listeners = 1
+        
+        self.scan_at(mock_datetime, 8)
+        self.scan_at(mock_datetime, 12)
+        events, _ = app.dashboard_bus.wait(0, 0)
+        
+        self.assertEqual([e["event"] for e in events], ["row", "row"])
+        self.assertEqual((events[0]["total"], events[0]["inside_count"]), (1, 1))
+        self.assertIn('id="user-row-1"', events[0]["html"])
+        self.assertIn('İçeride', events[0]["html"])
+        self.assertEqual((events[1]["total"], events[1]["inside_count"]), (1, 0))
+        self.assertIn('4s 0d', events[1]["html"])
+    
+    @patch('app.datetime')
+    @patch('app.get_current_work_day')
+    def test_no_query_without_listeners(self, mock_work_day, mock_datetime):
+        """Test that only a reset marker is published when no dashboard is open"""
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        mock_work_day.return_value = date(2025, 12, 16)
+        
+        with patch('app.get_dashboard_counts') as mock_counts:
+            self.scan_at(mock_datetime, 8)
+        mock_counts.assert_not_called()
+        events, _ = app.dashboard_bus.wait(0, 0)
+        self.assertEqual([e["event"] for e in events], ["reset"])
+    
+    def test_user_delete_removes_row(self):
+        """Test that deleting a user publishes a remove delta"""
+        app.dashboard_bus.listeners = 1
+        client = app.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user'] = 'admin'
+            sess['role'] = 'admin'
+        with patch('app.delete_sensor_fingerprint', return_value=({"status": "skipped"}, 200)):
+            client.post('/users/delete/1')
+        events, _ = app.dashboard_bus.wait(0, 0)
+        self.assertEqual(events[-1]["event"], "remove")
+        self.assertEqual(events[-1]["user_id"], 1)
+    
+    def test_stream_endpoint(self):
+        """Test SSE framing and reset for a cursor that fell out of the ring"""
+        bus = app.EventBus(size=2)
+        app.dashboard_bus = bus
+        for i in range(4):
+            bus.publish({"event": "row", "user_id": i})
+        bus.close()
+        
+        client = app.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user'] = 'ilab'
+            sess['role'] = 'user'
+        with client.get('/api/dashboard/stream?after=3') as response:
+            body = response.get_data(as_text=True)
+        self.assertIn('id: 4\nevent: row\n', body)
+        self.assertNotIn('event: reset', body)
+        
+        with client.get('/api/dashboard/stream?after=0') as response:
+            body = response.get_data(as_text=True)
+        self.assertIn('event: reset', body)
+        self.assertEqual(bus.listeners, 0)
+        self.assertEqual(app.stream_slots.count, 0)
+    
+    def login_client(self):
+        client = app.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user'] = 'ilab'
+            sess['role'] = 'user'
+        return client
+    
+    def test_stream_refused_at_listener_cap(self):
+        """Test that dashboards beyond the listener cap get 503 and can poll instead"""
+        client = self.login_client()
+        app.dashboard_bus.listeners = app.DASHBOARD_MAX_LISTENERS
+        response = client.get('/api/dashboard/stream')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(app.stream_slots.count, 0)
+        
+        app.dashboard_bus.publish({"event": "row", "user_id": 1})
+        data = client.get('/api/dashboard/changes?after=0').get_json()
+        self.assertEqual(data["seq"], 1)
+        self.assertEqual([e["event"] for e in data["events"]], ["row"])
+        self.assertEqual(client.get('/api/dashboard/changes?after=1').get_json()["events"], [])
+    
+    def test_changes_reset_and_validation(self):
+        """Test that polling reports a reset for a lost cursor and rejects bad input"""
+        app.dashboard_bus = app.EventBus(size=2)
+        for i in range(4):
+            app.dashboard_bus.publish({"event": "row", "user_id": i})
+        client = self.login_client()
+        data = client.get('/api/dashboard/changes?after=0').get_json()
+        self.assertEqual(data, {"seq": 4, "events": [{"event": "reset"}]})
+        self.assertEqual(client.get('/api/dashboard/changes?after=abc').status_code, 400)
+    
+    @patch('app.datetime')
+    @patch('app.get_current_work_day')
+    def test_polling_dashboard_gets_rows(self, mock_work_day, mock_datetime):
+        """Test that a recently polling dashboard counts as a listener"""
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        mock_work_day.return_value = date(2025, 12, 16)
+        self.login_client().get('/api/dashboard/changes?after=0')
+        
+        self.scan_at(mock_datetime, 8)
+        events, _ = app.dashboard_bus.wait(0, 0)
+        self.assertEqual([e["event"] for e in events], ["row"])
+
+
+class TestPageCache(unittest.TestCase):
+    """Test data-version keyed page cache and ETag revalidation"""
+    
+    def setUp(self):
+        TestPresenceTable.setUp(self)
+        app.page_cache.clear()
+        self.client = app.app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user'] = 'ilab'
+            sess['role'] = 'user'
+    
+    def tearDown(self):
+        TestPresenceTable.tearDown(self)
+    
+    def write_attendance(self):
+        """Write from a separate connection, like sensor_daemon or automation"""
+        today = app.get_current_work_day().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, ?, ?, ?, 60)",
+            (today, f"{today}T08:00:00", f"{today}T09:00:00")
+        )
+        conn.commit()
+        conn.close()
+    
+    def test_version_bumps_on_every_write(self):
+        """Test that triggers increase the version for users and attendance"""
+        start = app.read_data_version("primary")
+        self.write_attendance()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE users SET department = 'Design' WHERE id = 1")
+        conn.execute("DELETE FROM attendance")
+        conn.commit()
+        conn.close()
+        self.assertEqual(app.read_data_version("primary"), start + 3)
+    
+    def test_dashboard_served_from_cache_until_write(self):
+        """Test cache hit, 304 revalidation and invalidation by a write"""
+        first = self.client.get('/')
+        hits = app.page_cache.hits
+        second = self.client.get('/')
+        self.assertEqual(app.page_cache.hits, hits + 1)
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        
+        not_modified = self.client.get('/', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        
+        self.write_attendance()
+        changed = self.client.get('/', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], first.headers['ETag'])
+        self.assertIn('1s 0d', changed.get_data(as_text=True))
+    
+    def test_pending_flash_bypasses_cache(self):
+        """Test that a page carrying a flash message is neither served from nor stored in cache"""
+        self.client.get('/')
+        with self.client.session_transaction() as sess:
+            sess['_flashes'] = [('success', 'Kaydedildi')]
+        response = self.client.get('/')
+        self.assertIn('Kaydedildi', response.get_data(as_text=True))
+        self.assertNotIn('ETag', response.headers)
+        self.assertNotIn('Kaydedildi', self.client.get('/').get_data(as_text=True))
+
+
+class TestJsonApi(unittest.TestCase):
+    """Test read-only JSON endpoints sharing builders with the HTML views"""
+    
+    def setUp(self):
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        app.DB_PATH = self.db_path
+        app.page_cache.clear()
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint_id INTEGER UNIQUE NOT NULL,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                department TEXT,
+                class TEXT,
+                position TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                check_in TEXT NOT NULL,
+                check_out TEXT,
+                duration_minutes INTEGER DEFAULT 0
+            )
+        """)
+        for i in range(1, 31):
+            conn.execute(
+                "INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (?, ?, 'User', 'Engineering')",
+                (i, f"Test{i}")
+            )
+        today = app.get_current_work_day().isoformat()
+        conn.execute(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, ?, ?, ?, 90)",
+            (today, f"{today}T08:00:00", f"{today}T09:30:00")
+        )
+        conn.execute(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (2, '2025-10-01', '2025-10-01T08:00:00', '2025-10-01T10:00:00', 120)"
+        )
+        conn.commit()
+        conn.close()
+        
+        self.client = app.app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user'] = 'admin'
+            sess['role'] = 'admin'
+    
+    def tearDown(self):
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+    
+    def test_dashboard_field_selection(self):
+        """Test that only requested fields are returned"""
+        data = self.client.get('/api/dashboard?fields=first_name,duration_minutes,status').get_json()
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['records'], [{'first_name': 'Test1', 'duration_minutes': 90, 'status': 'Dışarıda'}])
+    
+    def test_unknown_field_rejected(self):
+        """Test that a typo in fields is reported instead of silently ignored"""
+        response = self.client.get('/api/dashboard?fields=first_nme')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('first_nme', response.get_json()['msg'])
+    
+    def test_gzip_when_accepted(self):
+        """Test gzip encoding for large bodies, also when served from cache"""
+        import gzip
+        import json
+        for _ in range(2):
+            response = self.client.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+            users = json.loads(gzip.decompress(response.get_data()))['users']
+            self.assertEqual(len(users), 30)
+        
+        plain = self.client.get('/api/users')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(len(plain.get_json()['users']), 30)
+    
+    def test_weekly_range(self):
+        """Test weekly totals for an explicit range"""
+        data = self.client.get('/api/weekly?from=2025-10-01&to=2025-10-07&fields=user_id,total_minutes').get_json()
+        self.assertEqual(data['from'], '2025-10-01')
+        self.assertEqual(data['summary'][0], {'user_id': 2, 'total_minutes': 120})
+        self.assertEqual(self.client.get('/api/weekly?from=bad').status_code, 400)
+
+
+class TestStaticAssets(unittest.TestCase):
+    """Test hashed, precompressed static assets"""
+    
+    def setUp(self):
+        import shutil
+        from utils import static_assets
+        self.static_assets = static_assets
+        self.static_dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(app.BASE_DIR, 'static', 'style.css'), self.static_dir)
+        shutil.copy(os.path.join(app.BASE_DIR, 'static', 'ilab_logo.png'), self.static_dir)
+        self.dist_dir = os.path.join(self.static_dir, 'dist')
+        self.original_assets = app.assets
+        app.assets = static_assets.AssetManifest(self.dist_dir)
+        self.client = app.app.test_client()
+    
+    def tearDown(self):
+        import shutil
+        app.assets = self.original_assets
+        shutil.rmtree(self.static_dir, ignore_errors=True)
+    
+    def test_falls_back_to_static_without_build(self):
+        """Test that templates keep working before the build step runs"""
+        with app.app.test_request_context():
+            self.assertEqual(app.asset_url('style.css'), '/static/style.css')
+    
+    def test_hashed_url_and_immutable_headers(self):
+        """Test that built assets get content-hashed URLs and long cache lifetimes"""
+        manifest = self.static_assets.build(self.static_dir, self.dist_dir)
+        with app.app.test_request_context():
+            url = app.asset_url('style.css')
+        self.assertEqual(url, '/assets/' + manifest['style.css'])
+        self.assertRegex(manifest['style.css'], r'^style\.[0-9a-f]{10}\.css$')
+        
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', response.headers['Cache-Control'])
+        import gzip
+        with open(os.path.join(self.static_dir, 'style.css'), 'rb') as f:
+            self.assertEqual(gzip.decompress(response.get_data()), f.read())
+        response.close()
+        
+        # İkili dosyalar sıkıştırılmadan gönderilir
+        response = self.client.get('/assets/' + manifest['ilab_logo.png'], headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.mimetype, 'image/png')
+        response.close()
+    
+    def test_rebuild_keeps_previous_generation(self):
+        """Test that a changed file gets a new name while the old one stays servable"""
+        first = self.static_assets.build(self.static_dir, self.dist_dir)['style.css']
+        with open(os.path.join(self.static_dir, 'style.css'), 'a') as f:
+            f.write('\n.extra { color: red; }\n')
+        second = self.static_assets.build(self.static_dir, self.dist_dir)['style.css']
+        self.assertNotEqual(first, second)
+        self.assertTrue(os.path.exists(os.path.join(self.dist_dir, first)))
+        with app.app.test_request_context():
+            self.assertEqual(app.asset_url('style.css'), '/assets/' + second)
+        
+        third = self.static_assets.build(self.static_dir, self.dist_dir)['style.css']
+        self.assertEqual(third, second)
+
+
+class TestUserSearch(unittest.TestCase):
+    """Test paginated, sortable user listing with full-text search"""
+    
+    def setUp(self):
+        TestJsonApi.setUp(self)
+        conn = app.get_db()
+        conn.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department, class, position) VALUES (100, 'Zeynep', 'Öztürk', 'Design', '3. Sınıf', 'Stajyer')")
+        conn.commit()
+        conn.close()
+    
+    def tearDown(self):
+        TestJsonApi.tearDown(self)
+    
+    def test_full_text_search(self):
+        """Test prefix search over name, department, class and position"""
+        data = self.client.get('/api/users?q=ozt&fields=first_name').get_json()
+        self.assertEqual(data['users'], [{'first_name': 'Zeynep'}])
+        self.assertEqual(self.client.get('/api/users?q=stajy').get_json()['total'], 1)
+        self.assertEqual(self.client.get('/api/users?q=test2').get_json()['total'], 11)
+        self.assertEqual(self.client.get('/api/users?q=engineering test1').get_json()['total'], 11)
+        self.assertEqual(self.client.get('/api/users?q=design test1').get_json()['total'], 0)
+        
+        # Güncellemeler indekse yansır
+        conn = app.get_db()
+        conn.execute("UPDATE users SET position = 'Asistan' WHERE fingerprint_id = 100")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.client.get('/api/users?q=stajy').get_json()['total'], 0)
+    
+    def test_like_fallback_matches_fts_columns(self):
+        """Test that without FTS5 the LIKE search gives the same results as the index"""
+        expected = {'stajy': 1, 'Sınıf': 1, 'zeynep design': 1, 'engineering test1': 11,
+                    'design test1': 0, 'test2': 11}
+        for q, total in expected.items():
+            fts_total = self.client.get(f'/api/users?q={q}').get_json()['total']
+            app.page_cache.clear()
+            with patch.object(app, 'has_user_search', return_value=False):
+                like_total = self.client.get(f'/api/users?q={q}').get_json()['total']
+            app.page_cache.clear()
+            self.assertEqual(fts_total, total, q)
+            self.assertEqual(like_total, fts_total, q)
+        
+        # "_" ve "%" joker karakter olarak yorumlanmaz
+        with patch.object(app, 'has_user_search', return_value=False):
+            self.assertEqual(self.client.get('/api/users?q=t_st').get_json()['total'], 0)
+    
+    def test_pagination_and_sorting(self):
+        """Test that pages cover every user once in the requested order"""
+        seen = []
+        for page in (1, 2, 3, 4):
+            data = self.client.get(f'/api/users?sort=first_name&dir=desc&per_page=10&page={page}&fields=first_name').get_json()
+            self.assertEqual(data['total'], 31)
+            self.assertEqual(data['pages'], 4)
+            seen.extend(u['first_name'] for u in data['users'])
+        self.assertEqual(len(seen), 31)
+        self.assertEqual(seen, sorted(seen, key=str.lower, reverse=True))
+        self.assertEqual(seen[0], 'Zeynep')
+        
+        self.assertEqual(self.client.get('/api/users?sort=password').status_code, 400)
+        self.assertEqual(self.client.get('/api/users?page=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/users?page=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/users?per_page=x').status_code, 400)
+    
+    def test_users_page(self):
+        """Test that the HTML listing renders one page and the search box"""
+        html = self.client.get('/users').get_data(as_text=True)
+        self.assertIn('31 kullanıcı', html)
+        html = self.client.get('/users?per_page=10&page=2').get_data(as_text=True)
+        self.assertIn('Sayfa 2 / 4', html)
+        self.assertIn('Önceki', html)
+        self.assertIn('Sonraki', html)
+        html = self.client.get('/users?q=zeyn').get_data(as_text=True)
+        self.assertIn('Öztürk', html)
+        self.assertNotIn('Test1<', html)
+        self.assertEqual(self.client.get('/users?sort=bogus').status_code, 302)
+        self.assertEqual(self.client.get('/users?page=abc').status_code, 302)
+
+
 def run_tests():
     """Run all tests and generate report"""
     # Create test suite
@@ -531,6 +1628,16 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestFingerprintSensor))
     suite.addTests(loader.loadTestsFromTestCase(TestWorkDayBoundary))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegrationScenarios))
+    suite.addTests(loader.loadTestsFromTestCase(TestPresenceTable))
+    suite.addTests(loader.loadTestsFromTestCase(TestReportApi))
+    suite.addTests(loader.loadTestsFromTestCase(TestEventBus))
+    suite.addTests(loader.loadTestsFromTestCase(TestSensorDaemon))
+    suite.addTests(loader.loadTestsFromTestCase(TestServing))
+    suite.addTests(loader.loadTestsFromTestCase(TestDashboardStream))
+    suite.addTests(loader.loadTestsFromTestCase(TestPageCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestJsonApi))
+    suite.addTests(loader.loadTestsFromTestCase(TestStaticAssets))
+    suite.addTests(loader.loadTestsFromTestCase(TestUserSearch))
     
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
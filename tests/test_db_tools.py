@@ -0,0 +1,408 @@
+"""
+Unit Tests for database utilities (utils/)
+Test coverage for db_backup.py, db_snapshot.py, session_audit.py and db_schema.py
+"""
+
+import unittest
+import sys
+import os
+import sqlite3
+import shutil
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import db_backup
+from utils import db_snapshot
+from utils import session_audit
+from utils import db_schema
+
+
+def create_test_db(path):
+    """Create a small attendance database for testing"""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fingerprint_id INTEGER UNIQUE NOT NULL,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            department TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            check_in TEXT NOT NULL,
+            check_out TEXT,
+            duration_minutes INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    cursor.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (1, 'Test', 'User', 'Engineering')")
+    for day in range(1, 29):
+        cursor.execute(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, ?, ?, ?, 240)",
+            (f"2025-12-{day:02d}", f"2025-12-{day:02d}T08:00:00", f"2025-12-{day:02d}T12:00:00")
+        )
+    conn.commit()
+    conn.close()
+
+
+class TestDatabaseBackup(unittest.TestCase):
+    """Test online backup, rotation and restore"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "attendance.db")
+        self.backup_dir = os.path.join(self.tmp_dir, "backups")
+        create_test_db(self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_backup_copies_data_and_writes_checksum(self):
+        """Test that a backup is a complete copy with a valid checksum"""
+        path = db_backup.create_backup(self.db_path, self.backup_dir)
+
+        self.assertTrue(os.path.exists(db_backup.checksum_path(path)))
+        ok, msg = db_backup.verify_backup(path)
+        self.assertTrue(ok, msg)
+
+        conn = sqlite3.connect(path)
+        count = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 28)
+
+    def test_backups_in_same_second_do_not_collide(self):
+        """Test that two backups taken back to back are kept as separate files"""
+        first = db_backup.create_backup(self.db_path, self.backup_dir)
+        second = db_backup.create_backup(self.db_path, self.backup_dir)
+        self.assertNotEqual(first, second)
+        self.assertEqual(db_backup.list_backups(self.backup_dir), [first, second])
+
+    def test_small_page_steps(self):
+        """Test that copying in single-page steps produces the same data"""
+        dest = os.path.join(self.tmp_dir, "copy.db")
+        db_backup.copy_database(self.db_path, dest, pages=1, step_sleep=0)
+        ok, _ = db_backup.integrity_check(dest)
+        self.assertTrue(ok)
+
+    def test_integrity_check_escapes_path(self):
+        """Test that URI characters in the path do not break the read-only check"""
+        dest = os.path.join(self.tmp_dir, "a?b#c%d.db")
+        db_backup.copy_database(self.db_path, dest)
+        before = sorted(os.listdir(self.tmp_dir))
+        ok, msg = db_backup.integrity_check(dest)
+        self.assertTrue(ok, msg)
+        # Kaçışsız URI'de "?" sonrası sorgu sayılır ve boş bir "a" dosyası açılırdı
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), before)
+
+    def test_rotation_keeps_newest_generations(self):
+        """Test that only the newest N backups are kept"""
+        os.makedirs(self.backup_dir)
+        for i in range(5):
+            name = f"{db_backup.BACKUP_PREFIX}20251201-00000{i}{db_backup.BACKUP_SUFFIX}"
+            db_backup.copy_database(self.db_path, os.path.join(self.backup_dir, name))
+        removed = db_backup.rotate_backups(self.backup_dir, keep=2)
+
+        self.assertEqual(len(removed), 3)
+        remaining = [os.path.basename(p) for p in db_backup.list_backups(self.backup_dir)]
+        self.assertEqual(remaining, [
+            f"{db_backup.BACKUP_PREFIX}20251201-000003{db_backup.BACKUP_SUFFIX}",
+            f"{db_backup.BACKUP_PREFIX}20251201-000004{db_backup.BACKUP_SUFFIX}",
+        ])
+
+    def test_corrupted_backup_fails_verification(self):
+        """Test that a modified backup is rejected and not restored"""
+        path = db_backup.create_backup(self.db_path, self.backup_dir)
+        with open(path, "r+b") as f:
+            f.seek(200)
+            f.write(b"\x00\xff\x00\xff")
+
+        ok, _ = db_backup.verify_backup(path)
+        self.assertFalse(ok)
+        with self.assertRaises(RuntimeError):
+            db_backup.restore_backup(path, self.db_path)
+        self.assertFalse(os.path.exists(self.db_path + ".pre-restore"))
+
+    def test_restore_replaces_database(self):
+        """Test that restore brings back the backed-up state"""
+        path = db_backup.create_backup(self.db_path, self.backup_dir)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM attendance")
+        conn.commit()
+        conn.close()
+
+        db_backup.restore_backup(path, self.db_path)
+
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 28)
+        self.assertTrue(os.path.exists(self.db_path + ".pre-restore"))
+
+    def test_pre_restore_copy_keeps_wal_transactions(self):
+        """Test that commits still only in the -wal file survive in the pre-restore copy"""
+        path = db_backup.create_backup(self.db_path, self.backup_dir)
+
+        writer = sqlite3.connect(self.db_path)
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.execute("PRAGMA wal_autocheckpoint=0")
+        writer.execute("DELETE FROM attendance WHERE id > 20")
+        writer.commit()
+        self.assertGreater(os.path.getsize(self.db_path + "-wal"), 0)
+        try:
+            db_backup.restore_backup(path, self.db_path)
+
+            conn = sqlite3.connect(self.db_path + ".pre-restore")
+            count = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+            conn.close()
+            self.assertEqual(count, 20)
+        finally:
+            writer.close()
+
+
+class TestReportSnapshot(unittest.TestCase):
+    """Test read-only reporting snapshot"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "attendance.db")
+        create_test_db(self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_snapshot_path(self):
+        """Test snapshot file name derived from database path"""
+        self.assertEqual(
+            db_snapshot.snapshot_path_for("/x/data/attendance.db"),
+            "/x/data/attendance.snapshot.db"
+        )
+
+    def test_falls_back_to_primary_without_snapshot(self):
+        """Test that reports still work before the first refresh"""
+        conn = db_snapshot.connect_snapshot(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 28)
+
+    def test_snapshot_is_read_only(self):
+        """Test that snapshot connections reject writes"""
+        self.assertTrue(db_snapshot.refresh_snapshot(self.db_path))
+        conn = db_snapshot.connect_snapshot(self.db_path)
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM attendance")
+        conn.close()
+
+    def test_refresh_only_when_primary_changed(self):
+        """Test that an unchanged primary does not trigger a new copy"""
+        self.assertTrue(db_snapshot.refresh_snapshot(self.db_path))
+        self.assertFalse(db_snapshot.refresh_snapshot(self.db_path))
+
+        snap = db_snapshot.snapshot_path_for(self.db_path)
+        old = os.path.getmtime(snap) - 10
+        os.utime(snap, (old, old))
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM attendance WHERE id = 1")
+        conn.commit()
+        conn.close()
+
+        self.assertTrue(db_snapshot.refresh_snapshot(self.db_path))
+        conn = db_snapshot.connect_snapshot(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 27)
+
+
+class TestSessionAudit(unittest.TestCase):
+    """Test overlapping-session audit and merge"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "attendance.db")
+        create_test_db(self.db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("DELETE FROM attendance")
+        self.conn.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (2, 'Other', 'User', 'Design')")
+        sessions = [
+            # User 1: 08:00-12:00, forced checkout overlap 11:00-13:00, nested 09:00-10:00
+            (1, '2025-12-16', '2025-12-16T08:00:00', '2025-12-16T12:00:00', 240),
+            (1, '2025-12-16', '2025-12-16T11:00:00', '2025-12-16T13:00:00', 120),
+            (1, '2025-12-16', '2025-12-16T09:00:00', '2025-12-16T10:00:00', 60),
+            # Gap of 60 minutes, then a clean session
+            (1, '2025-12-16', '2025-12-16T14:00:00', '2025-12-16T15:00:00', 60),
+            # User 2: negative duration and wrong stored duration
+            (2, '2025-12-16', '2025-12-16T10:00:00', '2025-12-16T09:00:00', 0),
+            (2, '2025-12-17', '2025-12-17T10:00:00', '2025-12-17T11:00:00', 5),
+        ]
+        self.conn.executemany(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (?, ?, ?, ?, ?)",
+            sessions
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_detects_overlaps_gaps_and_impossible_durations(self):
+        """Test issue detection for each kind"""
+        issues = []
+        summary = session_audit.run_audit(self.conn, on_issue=issues.append)
+
+        kinds = [i.kind for i in issues]
+        self.assertEqual(kinds.count(session_audit.OVERLAP), 1)
+        self.assertEqual(kinds.count(session_audit.NESTED), 1)
+        self.assertEqual(kinds.count(session_audit.GAP), 1)
+        self.assertEqual(kinds.count(session_audit.NEGATIVE), 1)
+        self.assertEqual(kinds.count(session_audit.DURATION_MISMATCH), 1)
+        # 08:00-13:00 + 14:00-15:00 for user 1, 10:00-11:00 for user 2
+        self.assertEqual(summary["presence_minutes"], 300 + 60 + 60)
+        self.assertEqual(summary["mergeable_intervals"], 1)
+
+    def test_merge_removes_double_counting(self):
+        """Test that merging makes SUM(duration_minutes) equal presence time"""
+        summary = session_audit.run_audit(self.conn, merge=True)
+        self.assertEqual(summary["merged_rows"], 2)
+
+        total = self.conn.execute(
+            "SELECT SUM(duration_minutes) FROM attendance WHERE user_id = 1"
+        ).fetchone()[0]
+        self.assertEqual(total, 360)
+
+        # Second pass finds nothing left to merge
+        summary = session_audit.run_audit(self.conn)
+        self.assertEqual(summary["mergeable_intervals"], 0)
+        self.assertNotIn(session_audit.OVERLAP, summary)
+
+    def test_open_session_followed_by_new_session(self):
+        """Test that a forgotten open session is reported and never merged"""
+        self.conn.execute("DELETE FROM attendance")
+        self.conn.execute("INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, '2025-12-16', '2025-12-16T08:00:00', NULL, 0)")
+        self.conn.execute("INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (1, '2025-12-16', '2025-12-16T09:00:00', '2025-12-16T10:00:00', 60)")
+        self.conn.commit()
+
+        issues = []
+        session_audit.run_audit(self.conn, merge=True, on_issue=issues.append)
+        self.assertEqual([i.kind for i in issues], [session_audit.STALE_OPEN])
+        count = self.conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_merge_splits_at_work_day_boundary(self):
+        """Test that a merged interval crossing 06:00 keeps minutes on their own work day"""
+        self.conn.execute("DELETE FROM attendance")
+        self.conn.executemany(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (?, ?, ?, ?, ?)",
+            [(1, '2025-12-15', '2025-12-16T04:00:00', '2025-12-16T06:30:00', 150),
+             (1, '2025-12-15', '2025-12-16T05:30:00', '2025-12-16T08:00:00', 150)]
+        )
+        self.conn.commit()
+
+        summary = session_audit.run_audit(self.conn, merge=True)
+        self.assertEqual(summary["merged_rows"], 0)
+        rows = self.conn.execute(
+            "SELECT date, check_in, check_out, duration_minutes FROM attendance ORDER BY check_in"
+        ).fetchall()
+        self.assertEqual(rows, [
+            ('2025-12-15', '2025-12-16T04:00:00', '2025-12-16T06:00:00', 120),
+            ('2025-12-16', '2025-12-16T06:00:00', '2025-12-16T08:00:00', 120),
+        ])
+
+    def test_too_long_session_is_reported_not_merged(self):
+        """Test that an impossible session is left as-is instead of being folded into an interval"""
+        self.conn.execute("DELETE FROM attendance")
+        self.conn.executemany(
+            "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (?, ?, ?, ?, ?)",
+            [(1, '2025-12-16', '2025-12-16T08:00:00', '2025-12-18T08:00:00', 2880),
+             (1, '2025-12-16', '2025-12-16T09:00:00', '2025-12-16T10:00:00', 60)]
+        )
+        self.conn.commit()
+
+        issues = []
+        summary = session_audit.run_audit(self.conn, merge=True, on_issue=issues.append)
+        self.assertEqual([i.kind for i in issues], [session_audit.TOO_LONG])
+        self.assertEqual(summary["mergeable_intervals"], 0)
+        rows = self.conn.execute("SELECT check_out, duration_minutes FROM attendance ORDER BY id").fetchall()
+        self.assertEqual(rows, [('2025-12-18T08:00:00', 2880), ('2025-12-16T10:00:00', 60)])
+
+
+class TestUserSearchIndex(unittest.TestCase):
+    """Test FTS5 user index kept in sync by triggers"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "attendance.db")
+        create_test_db(self.db_path)  # class/position sütunları yok
+        self.conn = sqlite3.connect(self.db_path)
+        db_schema.ensure_schema(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def search(self, query):
+        rows = self.conn.execute(
+            "SELECT rowid FROM users_fts WHERE users_fts MATCH ? ORDER BY rowid", (query,)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def test_indexes_existing_columns_only(self):
+        """Test that legacy schemas without class/position still get an index"""
+        self.assertTrue(db_schema.has_user_search(self.conn))
+        columns = [r[1] for r in self.conn.execute("PRAGMA table_info(users_fts)")]
+        self.assertEqual(columns, ["first_name", "last_name", "department"])
+        self.assertEqual(self.search("engin*"), [1])
+
+    def test_triggers_follow_writes(self):
+        """Test that inserts, updates and deletes are reflected in the index"""
+        self.conn.execute("INSERT INTO users (fingerprint_id, first_name, last_name, department) VALUES (2, 'Ayşe', 'Öztürk', 'Design')")
+        self.assertEqual(self.search("ozturk"), [2])
+        self.conn.execute("UPDATE users SET department = 'Research' WHERE id = 2")
+        self.assertEqual(self.search("design"), [])
+        self.assertEqual(self.search("research"), [2])
+        self.conn.execute("DELETE FROM users WHERE id = 2")
+        self.assertEqual(self.search("research"), [])
+        # İndeks içerik tablosuyla tutarlı (bozuksa SQLITE_CORRUPT_VTAB)
+        self.conn.execute("INSERT INTO users_fts (users_fts, rank) VALUES ('integrity-check', 1)")
+
+    def test_idempotent(self):
+        """Test that running ensure_schema again keeps a single index"""
+        db_schema.ensure_schema(self.conn)
+        self.assertEqual(self.search("test"), [1])
+
+
+def run_tests():
+    """Run all tests and generate report"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestDatabaseBackup))
+    suite.addTests(loader.loadTestsFromTestCase(TestReportSnapshot))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessionAudit))
+    suite.addTests(loader.loadTestsFromTestCase(TestUserSearchIndex))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print("DB TOOLS TEST SUMMARY")
+    print("=" * 70)
+    print(f"Tests run: {result.testsRun}")
+    print(f"Successes: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failures: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,662 @@
+"""
+Unit Tests for LCD display drivers (drivers/)
+Runs without the panel: only pure-Python parts of the display stack are tested
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add drivers directory to path (panel_ui.py ile aynı şekilde)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "drivers"))
+
+import asset_cache
+import gpio_bus
+import ili9486
+from utils import network_status
+
+try:
+    import numpy
+    import framebuffer
+    import glyphs
+    import virtual_lcd
+    import bench_panel
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class CountingBus:
+    """Bus stub that counts data bytes streamed to the panel"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.data_bytes = 0
+        self.strobes = 0
+        self.windows = 0
+        self.fills = 0
+        self.last_data = b""
+        self.rs = 1
+        self.value = 0
+
+    def set_pin(self, pin, value):
+        if pin == ili9486.PIN_RS:
+            self.rs = value
+
+    def write_byte(self, value):
+        self.value = value
+
+    def strobe(self):
+        self.strobes += 1
+        if self.rs == 0 and self.value == 0x2C:
+            self.windows += 1
+
+    def write_bytes(self, data):
+        self.data_bytes += len(data)
+        self.strobes += len(data)
+        self.last_data = bytes(data)
+
+    def fill(self, hi, lo, count):
+        self.fills += 1
+        self.data_bytes += count * 2
+        self.strobes += count * 2
+
+    def cleanup(self):
+        pass
+
+
+def make_panel(bus, **kwargs):
+    with patch.object(ili9486.time, "sleep"):
+        return ili9486.ILI9486(bus=bus, **kwargs)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+class PanelTestCase(unittest.TestCase):
+    """Base for tests that render panel_ui screens: image blobs go to a temp cache, not data/lcd_cache/"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.asset_cache = asset_cache.AssetCache(self.cache_dir)
+        patcher = patch.object(ili9486, "asset_cache", self.asset_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.asset_cache.close()
+        shutil.rmtree(self.cache_dir)
+
+
+@unittest.skipIf(not PIL_AVAILABLE, "PIL not available")
+class TestAssetCache(unittest.TestCase):
+    """Test pre-decoded RGB565 image cache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.tmp_dir, "bg.png")
+        Image.new("RGB", (96, 64), (255, 0, 0)).save(self.image_path)
+        self.cache = asset_cache.AssetCache(os.path.join(self.tmp_dir, "cache"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_converts_to_big_endian_rgb565(self):
+        """Test that the blob is screen-sized and in bus byte order"""
+        data = self.cache.load(self.image_path, 48, 32)
+        self.assertEqual(len(data), 48 * 32 * 2)
+        self.assertEqual(data[:4], b"\xf8\x00\xf8\x00")
+
+    def test_second_load_skips_conversion(self):
+        """Test that cached images are served without PIL, also from a new process"""
+        first = self.cache.load(self.image_path, 48, 32)
+        with patch.object(asset_cache, "convert_image", side_effect=AssertionError("converted twice")):
+            self.assertIs(self.cache.load(self.image_path, 48, 32), first)
+            fresh = asset_cache.AssetCache(self.cache.cache_dir)
+            self.assertEqual(fresh.load(self.image_path, 48, 32)[:], first[:])
+            fresh.close()
+
+    def test_changed_source_invalidates(self):
+        """Test that a modified image is re-converted and the stale blob removed"""
+        self.cache.load(self.image_path, 48, 32)
+        Image.new("RGB", (96, 64), (0, 0, 255)).save(self.image_path)
+        stat = os.stat(self.image_path)
+        os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        data = self.cache.load(self.image_path, 48, 32)
+        self.assertEqual(data[:2], b"\x00\x1f")
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+
+    @unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+    def test_reload_keeps_background_in_use(self):
+        """Test that text over an image background still draws after the image changed"""
+        bus = CountingBus()
+        with patch.object(ili9486, "asset_cache", self.cache):
+            tft = make_panel(bus, buffered=False)
+            self.assertTrue(tft.draw_image(0, 0, self.image_path))
+            old_background = tft.background[-1]
+
+            Image.new("RGB", (96, 64), (0, 0, 255)).save(self.image_path)
+            stat = os.stat(self.image_path)
+            os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.cache.load(self.image_path, ili9486.TFT_WIDTH, ili9486.TFT_HEIGHT)
+
+            tft.draw_text(10, 10, "OK", 255, 255, 255, 0, 0, 0, size=1, paint_bg=False)
+        self.assertFalse(old_background.closed)
+        self.assertEqual(bus.last_data[:2], b"\xf8\x00")
+
+
+class TestGpioMemBus(unittest.TestCase):
+    """Test register-level GPIO bus against a fake /dev/gpiomem"""
+
+    def setUp(self):
+        self.mem = gpio_bus.open_fake_gpiomem()
+        self.bus = gpio_bus.GpioMemBus(ili9486.DATA_PINS, ili9486.PIN_WR,
+                                       [ili9486.PIN_RS, ili9486.PIN_CS, ili9486.PIN_RST], mem=self.mem)
+        self.regs = memoryview(self.mem).cast("I")
+
+    def tearDown(self):
+        self.regs.release()
+        self.bus.cleanup()
+
+    def decode(self, set_mask):
+        return sum(1 << bit for bit, pin in enumerate(ili9486.DATA_PINS) if set_mask & (1 << pin))
+
+    def test_mask_tables_cover_every_byte(self):
+        """Test that set/clear masks drive exactly the data pins for all 256 values"""
+        all_pins = sum(1 << pin for pin in ili9486.DATA_PINS)
+        for value in range(256):
+            set_mask, clr_mask = self.bus.set_masks[value], self.bus.clr_masks[value]
+            self.assertEqual(set_mask | clr_mask, all_pins)
+            self.assertEqual(set_mask & clr_mask, 0)
+            self.assertEqual(self.decode(set_mask), value)
+
+    def test_pins_configured_as_outputs(self):
+        """Test that GPFSEL registers select output mode for every used pin"""
+        for pin in ili9486.DATA_PINS + [ili9486.PIN_WR, ili9486.PIN_RS, ili9486.PIN_CS, ili9486.PIN_RST]:
+            fsel = self.regs[pin // 10]
+            self.assertEqual((fsel >> ((pin % 10) * 3)) & 0b111, 0b001, pin)
+
+    def test_byte_writes_hit_set_and_clear_registers(self):
+        """Test that one byte is written with a single set and a single clear"""
+        self.bus.write_byte(0xA5)
+        self.assertEqual(self.decode(self.regs[gpio_bus.GPSET0 // 4]), 0xA5)
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], self.bus.clr_masks[0xA5])
+
+        self.bus.write_bytes(b"\x12\x34")
+        # Son yazım WR'yi kaldırır; WR, veri temizlenirken düşürülmüştü
+        self.assertEqual(self.regs[gpio_bus.GPSET0 // 4], 1 << ili9486.PIN_WR)
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], self.bus.clr_masks[0x34] | (1 << ili9486.PIN_WR))
+
+    def test_repeated_bytes_only_strobe(self):
+        """Test that an unchanged byte skips the data registers and only toggles WR"""
+        wr = 1 << ili9486.PIN_WR
+        self.bus.write_bytes(b"\x12")
+        self.regs[gpio_bus.GPSET0 // 4] = 0
+        self.bus.write_bytes(b"\x12")
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], wr)
+        self.assertEqual(self.regs[gpio_bus.GPSET0 // 4], wr)
+
+        self.bus.write_byte(0x12)
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], wr)
+
+    def test_fill_same_bytes_sets_bus_once(self):
+        """Test that a fill with equal high/low bytes writes the data lines once"""
+        self.bus.fill(0xFF, 0xFF, 100)
+        self.assertEqual(self.bus.last, 0xFF)
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], 1 << ili9486.PIN_WR)
+
+        self.bus.fill(0x12, 0x34, 2)
+        self.assertEqual(self.bus.last, 0x34)
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], self.bus.clr_masks[0x34] | (1 << ili9486.PIN_WR))
+
+    def test_driver_runs_on_fake_bus(self):
+        """Test that the panel driver no longer needs RPi.GPIO to be constructed"""
+        tft = make_panel(self.bus)
+        tft.fill_rect(0, 0, 4, 4, 255, 255, 255)
+        # Beyaz: son veri baytı 0xFF, ardından CS bırakıldı
+        self.assertEqual(self.regs[gpio_bus.GPCLR0 // 4], 1 << ili9486.PIN_WR)
+        self.assertEqual(self.regs[gpio_bus.GPSET0 // 4], 1 << ili9486.PIN_CS)
+
+    def test_unknown_bus_kind(self):
+        """Test that a typo in LCD_BUS is reported instead of silently ignored"""
+        with self.assertRaises(ValueError):
+            gpio_bus.open_bus(ili9486.DATA_PINS, ili9486.PIN_WR, [], kind="spi")
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+class TestFrameBuffer(unittest.TestCase):
+    """Test off-screen framebuffer and dirty-rectangle flushing"""
+
+    def test_dirty_rects(self):
+        """Test that only changed bands are reported, split on wide gaps"""
+        fb = framebuffer.FrameBuffer(100, 50)
+        self.assertEqual(fb.dirty_rects(), [(0, 0, 99, 49)])
+        fb.mark_shown()
+        self.assertEqual(fb.dirty_rects(), [])
+
+        fb.fill_rect(5, 10, 10, 4, 0xFFFF)
+        fb.fill_rect(80, 12, 5, 5, 0x1234)
+        fb.fill_rect(20, 30, 3, 3, 0x0001)
+        self.assertEqual(fb.dirty_rects(), [(5, 10, 14, 16), (80, 10, 84, 16), (20, 30, 22, 32)])
+
+    def test_pixel_runs(self):
+        """Test that long single-colour runs are split out of a pixel stream"""
+        px = numpy.array([1, 2] + [7] * 10 + [3] + [9] * 8, dtype=">u2")
+        self.assertEqual(framebuffer.pixel_runs(px.tobytes()),
+                         [(0, 2, None), (2, 12, 7), (12, 13, None), (13, 21, 9)])
+        self.assertEqual(framebuffer.pixel_runs(b""), [])
+
+    def test_solid_fills_use_bus_fill(self):
+        """Test that fill_screen and flushed solid areas stream through bus.fill"""
+        bus = CountingBus()
+        tft = make_panel(bus)
+        tft.fill_screen(0, 0, 0)
+        self.assertEqual(bus.fills, 1)
+        self.assertEqual(bus.data_bytes, ili9486.TFT_WIDTH * ili9486.TFT_HEIGHT * 2)
+
+        bus = CountingBus()
+        tft = make_panel(bus, buffered=True)
+        tft.fill_screen(0, 0, 0)
+        tft.fill_rect(0, 0, 40, 1, 255, 255, 255)
+        tft.flush()
+        self.assertEqual(bus.fills, 2)
+        self.assertEqual(bus.data_bytes, ili9486.TFT_WIDTH * ili9486.TFT_HEIGHT * 2)
+
+    def test_blit_clips_to_screen(self):
+        """Test that partially off-screen blocks are clipped"""
+        fb = framebuffer.FrameBuffer(8, 8)
+        fb.blit(6, 6, 4, 4, bytes(range(32)))
+        self.assertEqual(fb.region_bytes(6, 6, 7, 7), bytes([0, 1, 2, 3, 8, 9, 10, 11]))
+
+    def test_screen_change_sends_only_text(self):
+        """Test that switching screens over the same background sends a fraction of a frame"""
+        bus = CountingBus()
+        tft = make_panel(bus, buffered=True)
+        frame_bytes = ili9486.TFT_WIDTH * ili9486.TFT_HEIGHT * 2
+
+        tft.fill_screen(10, 20, 40)
+        tft.draw_text_center(60, "HOSGELDINIZ", 0, 0, 0, 10, 20, 40, size=3, paint_bg=False)
+        tft.flush()
+        self.assertEqual(bus.data_bytes, frame_bytes)
+
+        bus.data_bytes = 0
+        tft.fill_screen(10, 20, 40)
+        tft.draw_text_center(40, "GIRIS YAPILDI", 0, 0, 0, 10, 20, 40, size=3, paint_bg=False)
+        self.assertGreater(tft.flush(), 0)
+        self.assertGreater(bus.data_bytes, 0)
+        self.assertLess(bus.data_bytes, frame_bytes // 10)
+
+        bus.data_bytes = 0
+        self.assertEqual(tft.flush(), 0)
+        self.assertEqual(bus.data_bytes, 0)
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+class TestGlyphCache(unittest.TestCase):
+    """Test cached glyph bitmaps and one-window text lines"""
+
+    def test_glyph_mask_matches_font(self):
+        """Test that masks follow the column-based 5x7 font, scaled"""
+        cache = glyphs.GlyphCache(ili9486.FONT_5x7)
+        mask = cache.glyph_mask('1', 2)
+        self.assertEqual(mask.shape, (16, 12))
+        # '1' ikinci sütununda yalnızca 2. satır (bit 1) yanık
+        self.assertEqual(mask[:, 2:4].any(axis=1).nonzero()[0].tolist(), [2, 3])
+        self.assertFalse(mask[:, 10:].any())
+        self.assertFalse(mask[14:].any())
+        self.assertIs(cache.glyph_mask('1', 2), mask)
+
+    def test_line_block_cached(self):
+        """Test that a coloured line is rendered once and reused"""
+        cache = glyphs.GlyphCache(ili9486.FONT_5x7, line_cache_size=2)
+        block = cache.line_block("AB", 1, 0xFFFF, 0x0000)
+        self.assertEqual(block.shape, (8, 12))
+        self.assertIs(cache.line_block("AB", 1, 0xFFFF, 0x0000), block)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.line_block("C", 1, 0xFFFF, 0x0000)
+        cache.line_block("D", 1, 0xFFFF, 0x0000)
+        self.assertNotIn(("AB", 1, 0xFFFF, 0x0000), cache.lines)
+
+    def test_text_line_uses_one_window(self):
+        """Test that a size-3 line is sent as one address window"""
+        bus = CountingBus()
+        tft = make_panel(bus)
+        tft.draw_text(0, 0, "HOSGELDINIZ", 255, 255, 255, 0, 0, 0, size=3)
+        self.assertEqual(bus.windows, 1)
+        self.assertEqual(bus.data_bytes, 11 * 18 * 24 * 2)
+
+    def test_wrapped_text_splits_into_lines(self):
+        """Test that newlines and the right edge start new lines like draw_char did"""
+        tft = make_panel(CountingBus())
+        lines = tft._layout_text(460, 10, "ABCD\nE", 1)
+        self.assertEqual(lines, [(460, 10, "ABC"), (460, 18, "D"), (460, 26, "E")])
+
+    def test_transparent_text_composes_over_image(self):
+        """Test that paint_bg=False text keeps the image pixels around the glyphs"""
+        bus = CountingBus()
+        tft = make_panel(bus)
+        pixels = numpy.arange(ili9486.TFT_WIDTH * ili9486.TFT_HEIGHT, dtype=">u2")
+        tft.background = ("image", 0, 0, ili9486.TFT_WIDTH, ili9486.TFT_HEIGHT, pixels.tobytes())
+
+        tft.draw_text(12, 20, "I", 0, 0, 0, 255, 255, 255, size=1, paint_bg=False)
+        self.assertEqual(bus.windows, 1)
+        sent = numpy.frombuffer(bus.last_data, dtype=">u2").reshape(8, 6)
+        expected = pixels.reshape(ili9486.TFT_HEIGHT, ili9486.TFT_WIDTH)[20:28, 12:18].copy()
+        mask = tft.glyphs.glyph_mask('I', 1)
+        expected[mask] = 0
+        self.assertTrue((sent == expected).all())
+
+    def test_unknown_background_falls_back_to_pixels(self):
+        """Test that transparent text without a known background still draws"""
+        bus = CountingBus()
+        tft = make_panel(bus)
+        tft.draw_text(0, 0, "I", 0, 0, 0, 255, 255, 255, size=1, paint_bg=False)
+        self.assertGreater(bus.windows, 1)
+
+    def test_buffered_text_matches_direct(self):
+        """Test that buffered text lands in the frame with the same pixels"""
+        tft = make_panel(CountingBus(), buffered=True)
+        tft.fill_screen(0, 0, 0)
+        tft.draw_text(4, 4, "OK", 255, 255, 255, 0, 0, 0, size=2, paint_bg=False)
+        lit = tft.frame.pixels[4:20, 4:28] == 0xFFFF
+        self.assertTrue((lit == tft.glyphs.line_mask("OK", 2)).all())
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+class TestVirtualDisplay(PanelTestCase):
+    """Test the virtual ILI9486 bus and panel_ui rendering budgets"""
+
+    FRAME_BYTES = ili9486.TFT_WIDTH * ili9486.TFT_HEIGHT * 2
+
+    def test_interprets_address_window(self):
+        """Test that pixel data lands inside the window set by 0x2A/0x2B"""
+        tft, bus = bench_panel.make_virtual_panel(buffered=False)
+        tft.fill_rect(10, 20, 3, 2, 255, 255, 255)
+        self.assertEqual(bus.window, (10, 20, 12, 21))
+        self.assertTrue((bus.pixels[20:22, 10:13] == 0xFFFF).all())
+        self.assertEqual(int(bus.pixels.astype(bool).sum()), 6)
+
+        tft.set_address_window(0, 0, 1, 0)
+        tft.write_data16(0x1234)
+        tft.write_data16(0x5678)
+        self.assertEqual(bus.pixels[0, :2].tolist(), [0x1234, 0x5678])
+        self.assertEqual(bus.stats["windows"], 2)
+
+    def test_virtual_bus_from_environment(self):
+        """Test that LCD_BUS=virtual selects the headless bus"""
+        with patch.dict(os.environ, {"LCD_BUS": "virtual"}):
+            bus = gpio_bus.open_bus(ili9486.DATA_PINS, ili9486.PIN_WR,
+                                    [ili9486.PIN_RS, ili9486.PIN_CS, ili9486.PIN_RST])
+        self.assertIsInstance(bus, virtual_lcd.VirtualBus)
+
+    def test_flush_matches_framebuffer(self):
+        """Test that after a flush the panel shows exactly the buffered frame"""
+        tft, bus = bench_panel.make_virtual_panel(buffered=True)
+        bench_panel.panel_ui.show_welcome(tft, "AHMET YILMAZ")
+        bench_panel.panel_ui.draw_home_screen(tft)
+        self.assertTrue((bus.pixels == tft.frame.pixels).all())
+
+    def test_direct_and_buffered_render_the_same(self):
+        """Test that direct drawing produces the same screen as the framebuffer path"""
+        direct, direct_bus = bench_panel.make_virtual_panel(buffered=False)
+        buffered, buffered_bus = bench_panel.make_virtual_panel(buffered=True)
+        for tft in (direct, buffered):
+            bench_panel.panel_ui.show_goodbye(tft, "AHMET YILMAZ", 495)
+        self.assertTrue((direct_bus.pixels == buffered_bus.pixels).all())
+
+    def test_prepared_layers_skip_static_drawing(self):
+        """Test that event screens reuse their pre-rendered static layer"""
+        tft, bus = bench_panel.make_virtual_panel(buffered=True)
+        self.assertEqual(set(tft.layers), set(bench_panel.panel_ui.SCREEN_LAYERS))
+        with patch.object(tft, "draw_image") as draw_image:
+            bench_panel.panel_ui.show_welcome(tft, "AHMET YILMAZ")
+            bench_panel.panel_ui.show_error(tft, "KAYITSIZ")
+        draw_image.assert_not_called()
+
+        plain, plain_bus = bench_panel.make_virtual_panel(buffered=True, layers=False)
+        self.assertEqual(plain.layers, {})
+        bench_panel.panel_ui.show_error(plain, "KAYITSIZ")
+        self.assertTrue((bus.pixels == plain_bus.pixels).all())
+
+    def test_screen_budgets(self):
+        """Test that screen transitions stay within their bus budgets"""
+        results = bench_panel.run_benchmark(buffered=True, repeat=1)
+        self.assertEqual(set(results), {name for name, _, _ in bench_panel.SCREENS})
+        for name, r in results.items():
+            self.assertLess(r["data_bytes"], self.FRAME_BYTES // 4, name)
+            self.assertLess(r["bus_ops"], self.FRAME_BYTES // 3, name)
+            self.assertLessEqual(r["windows"], 10, name)
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+class TestRenderWorker(PanelTestCase):
+    """Test the panel render thread and event coalescing"""
+
+    def setUp(self):
+        super().setUp()
+        self.panel_ui = bench_panel.panel_ui
+        self.tft, self.bus = bench_panel.make_virtual_panel(buffered=True)
+
+    def event(self, kind, name="AHMET", minute=0):
+        return {"event": kind, "timestamp": f"2024-01-15T09:{minute:02d}:00",
+                "user": {"first_name": name, "last_name": "YILMAZ"}, "total_duration_minutes": 60}
+
+    def run_worker(self, worker, until):
+        worker.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not until() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            worker.stop()
+
+    def test_single_event_then_home(self):
+        """Test that one event is shown and the home screen returns after the hold"""
+        worker = self.panel_ui.RenderWorker(self.tft, hold=0.05)
+        with patch.object(self.panel_ui, "show_event") as show_event, \
+                patch.object(self.panel_ui, "draw_home_screen") as draw_home:
+            worker.submit([self.event("check_in")])
+            self.run_worker(worker, lambda: draw_home.called)
+        show_event.assert_called_once()
+        draw_home.assert_called_once_with(self.tft)
+        self.assertFalse(worker.showing)
+
+    def test_burst_coalesced_into_recent_list(self):
+        """Test that a burst skips the individual screens and lists the last scans"""
+        worker = self.panel_ui.RenderWorker(self.tft, hold=10)
+        events = [self.event("check_in", f"KISI{i}", i) for i in range(3)]
+        with patch.object(self.panel_ui, "show_event") as show_event, \
+                patch.object(self.panel_ui, "show_recent") as show_recent:
+            worker.submit(events)
+            self.run_worker(worker, lambda: show_recent.called)
+        show_event.assert_not_called()
+        show_recent.assert_called_once_with(self.tft, events)
+
+    def test_bounded_queue_drops_oldest(self):
+        """Test that the pending queue is bounded and the recent list keeps the newest"""
+        worker = self.panel_ui.RenderWorker(self.tft, max_pending=2)
+        events = [self.event("check_out", f"KISI{i}", i) for i in range(7)]
+        worker.submit(events)
+        self.assertEqual(worker.dropped, 5)
+        self.assertEqual(list(worker.pending), events[-2:])
+        self.assertEqual(list(worker.recent), events[-self.panel_ui.RECENT_SCANS:])
+
+    def test_burst_uses_ticker_when_given(self):
+        """Test that the ticker is started on a burst and fed single cards afterwards"""
+        ticker = self.panel_ui.ScanTicker(self.tft)
+        worker = self.panel_ui.RenderWorker(self.tft, hold=10, ticker=ticker)
+        worker.submit([self.event("check_in", f"KISI{i}", i) for i in range(3)])
+        self.run_worker(worker, lambda: ticker.active)
+        self.assertTrue(ticker.active)
+        self.assertEqual(ticker.count, 3)
+
+        worker = self.panel_ui.RenderWorker(self.tft, hold=10, ticker=ticker)
+        worker.showing = True
+        worker.submit([self.event("check_out", "YENI", 9)])
+        self.run_worker(worker, lambda: self.tft.scroll_offset == ticker.card_width)
+        self.assertEqual(self.tft.scroll_offset, ticker.card_width)
+
+    def test_recent_view_renders(self):
+        """Test that the compact view draws one line per scan"""
+        error = {"event": "error", "timestamp": "2024-01-15T09:05:00", "msg": "Kayitsiz parmak"}
+        self.assertEqual(self.panel_ui.scan_line(self.event("check_in")), "09:00 GIRIS AHMET YILMAZ")
+        self.assertEqual(self.panel_ui.scan_line(error), "09:05 HATA KAYITSIZ PARMAK")
+        self.panel_ui.show_recent(self.tft, [self.event("check_in"), error])
+        self.assertTrue((self.bus.pixels == self.tft.frame.pixels).all())
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+class TestHardwareScroll(PanelTestCase):
+    """Test scroll commands and the scan ticker on the virtual panel"""
+
+    def setUp(self):
+        super().setUp()
+        self.panel_ui = bench_panel.panel_ui
+        self.tft, self.bus = bench_panel.make_virtual_panel(buffered=True, layers=False)
+
+    def scan(self, name, minute):
+        return {"event": "check_in", "timestamp": f"2024-01-15T09:{minute:02d}:00",
+                "user": {"first_name": name, "last_name": "YILMAZ"}}
+
+    def test_scroll_commands(self):
+        """Test that 0x33/0x37 reach the controller and offsets wrap"""
+        self.tft.define_scroll_area(40, 400)
+        self.assertEqual(self.bus.scroll_area, (40, 400, 40))
+        self.tft.scroll_to(410)
+        self.assertEqual(self.tft.scroll_offset, 10)
+        self.assertEqual(self.bus.scroll_start, 50)
+
+        self.bus.pixels[:, 50] = 0xFFFF
+        self.assertTrue((self.bus.screen()[:, 40] == 0xFFFF).all())
+        self.assertTrue((self.bus.screen()[:, 0] == self.bus.pixels[:, 0]).all())
+
+        with self.assertRaises(ValueError):
+            self.tft.define_scroll_area(0, 500)
+
+    def test_ticker_adds_one_card_and_scrolls(self):
+        """Test that a new scan draws a single card and shifts the strip by one scroll write"""
+        ticker = self.panel_ui.ScanTicker(self.tft)
+        ticker.start([self.scan(f"KISI{i}", i) for i in range(3)])
+        before = self.bus.screen().copy()
+        width = ticker.card_width
+
+        self.bus.reset_stats()
+        ticker.add(self.scan("YENI", 9))
+        self.assertLessEqual(self.bus.stats["data_bytes"], width * ili9486.TFT_HEIGHT * 2)
+        self.assertEqual(self.tft.scroll_offset, width)
+
+        after = self.bus.screen()
+        # Eski kartlar bir kart sola kaydı, yeni kart en sağda
+        self.assertTrue((after[:, :2 * width] == before[:, width:3 * width]).all())
+        self.assertTrue((after[:, 2 * width:] == self.tft.frame.pixels[:, :width]).all())
+        self.assertFalse((after[:, 2 * width:] == before[:, :width]).all())
+
+        ticker.stop()
+        self.assertEqual(self.bus.scroll_start, 0)
+        self.assertFalse(ticker.active)
+
+
+class TestNetworkStatus(PanelTestCase):
+    """Test cached IP lookup for the home screen"""
+
+    def test_ioctl_address(self):
+        """Test that interface addresses come from SIOCGIFADDR without a connection"""
+        self.assertEqual(network_status.ipv4_address("lo"), "127.0.0.1")
+        self.assertIsNone(network_status.ipv4_address("yok0"))
+
+    def test_default_interface_from_route_table(self):
+        """Test that the default-route interface is read from /proc/net/route"""
+        with tempfile.NamedTemporaryFile("w", suffix=".route", delete=False) as f:
+            f.write("Iface\tDestination\tGateway\n")
+            f.write("wlan0\t0002A8C0\t00000000\n")
+            f.write("eth0\t00000000\t0102A8C0\n")
+        try:
+            self.assertEqual(network_status.default_interface(f.name), "eth0")
+        finally:
+            os.remove(f.name)
+        self.assertIsNone(network_status.default_interface("/yok/route"))
+
+    def test_change_callback_only_on_change(self):
+        """Test that on_change fires only when the address actually changes"""
+        changes = []
+        status = network_status.NetworkStatus(on_change=changes.append)
+        with patch.object(network_status, "current_address", side_effect=["10.0.0.5", "10.0.0.5", "10.0.0.9"]):
+            self.assertTrue(status.refresh())
+            self.assertFalse(status.refresh())
+            self.assertTrue(status.refresh())
+        self.assertEqual(changes, ["10.0.0.5", "10.0.0.9"])
+        self.assertEqual(status.address, "10.0.0.9")
+
+    @unittest.skipIf(not NUMPY_AVAILABLE, "numpy not available")
+    def test_home_screen_repaints_only_on_address_change(self):
+        """Test that home redraws use the cached address and only the IP line changes"""
+        panel_ui = bench_panel.panel_ui
+        tft, bus = bench_panel.make_virtual_panel(buffered=True)
+        with patch.object(panel_ui.network, "address", "10.0.0.5"):
+            tft.drop_layer("home")
+            with patch("socket.socket", side_effect=AssertionError("socket kullanılmamalı")):
+                panel_ui.draw_home_screen(tft)
+                bus.reset_stats()
+                panel_ui.draw_home_screen(tft)
+            self.assertEqual(bus.stats["data_bytes"], 0)
+
+            worker = panel_ui.RenderWorker(tft)
+            panel_ui.network.address = "10.0.0.99"
+            worker.invalidate_layer("home")
+            self.assertNotIn("home", tft.layers)
+            kind = worker._next_batch()[0]
+            self.assertEqual(kind, "home")
+            before = tft.frame.pixels.copy()
+            panel_ui.draw_home_screen(tft)
+
+        self.assertIn("home", tft.layers)
+        rows = numpy.flatnonzero((tft.frame.pixels != before).any(axis=1))
+        self.assertGreater(rows.size, 0)
+        self.assertGreaterEqual(rows.min(), 300)
+        self.assertLess(bus.stats["data_bytes"], ili9486.TFT_WIDTH * 10 * 2)
+
+
+def run_tests():
+    """Run all tests and generate report"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestAssetCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestGpioMemBus))
+    suite.addTests(loader.loadTestsFromTestCase(TestFrameBuffer))
+    suite.addTests(loader.loadTestsFromTestCase(TestGlyphCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestVirtualDisplay))
+    suite.addTests(loader.loadTestsFromTestCase(TestRenderWorker))
+    suite.addTests(loader.loadTestsFromTestCase(TestHardwareScroll))
+    suite.addTests(loader.loadTestsFromTestCase(TestNetworkStatus))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print("DISPLAY TEST SUMMARY")
+    print("=" * 70)
+    print(f"Tests run: {result.testsRun}")
+    print(f"Successes: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failures: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,305 @@
+# db_backup.py
+# SQLite online yedekleme - sqlite3 backup API ile küçük sayfa adımlarında kopyalar,
+# böylece app.py yazarken veritabanı uzun süre kilitlenmez.
+#
+# Kullanım:
+#   python3 utils/db_backup.py backup            # hemen yedek al
+#   python3 utils/db_backup.py list              # yedekleri listele
+#   python3 utils/db_backup.py verify [dosya]    # checksum + integrity kontrolü
+#   python3 utils/db_backup.py restore <dosya|latest>
+#   python3 utils/db_backup.py schedule          # ön planda periyodik yedekleme
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+log = setup_logger("backup")
+
+DB_PATH = os.path.join(BASE_DIR, "data", "attendance.db")
+BACKUP_DIR = os.path.join(BASE_DIR, "data", "backups")
+BACKUP_PREFIX = "attendance-"
+BACKUP_SUFFIX = ".db"
+BACKUP_KEEP = 7                          # Saklanacak yedek (generation) sayısı
+BACKUP_INTERVAL_SECONDS = 6 * 60 * 60    # 6 saatte bir yedek
+PAGES_PER_STEP = 64                      # Her adımda kopyalanan sayfa sayısı (~256 KB)
+STEP_SLEEP_SECONDS = 0.01                # Adımlar arası bekleme - yazıcılara fırsat ver
+
+
+def copy_database(src_path, dest_path, pages=PAGES_PER_STEP, step_sleep=STEP_SLEEP_SECONDS):
+    """
+    src_path veritabanını backup API ile dest_path'e kopyalar.
+    Kopya önce geçici dosyaya yazılır, bitince atomik olarak yer değiştirir;
+    okuyucular hiçbir zaman yarım dosya görmez.
+    """
+    tmp_path = f"{dest_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    def _progress(status, remaining, total):
+        # Adımlar arasında okuma kilidi bırakılır; kısa bekleme yazıcıların araya girmesini sağlar
+        if remaining and step_sleep:
+            time.sleep(step_sleep)
+
+    src = sqlite3.connect(src_path, timeout=10)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        src.backup(dst, pages=pages, progress=_progress)
+    except Exception:
+        dst.close()
+        src.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    dst.close()
+    src.close()
+    os.replace(tmp_path, dest_path)
+    return dest_path
+
+
+def file_checksum(path):
+    """Dosyanın SHA-256 özetini döndürür."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def checksum_path(backup_path):
+    return backup_path + ".sha256"
+
+
+def write_checksum(backup_path):
+    """sha256sum uyumlu yan dosya yazar ('<hex>  <dosya adı>')."""
+    digest = file_checksum(backup_path)
+    with open(checksum_path(backup_path), "w", encoding="utf-8") as f:
+        f.write(f"{digest}  {os.path.basename(backup_path)}\n")
+    return digest
+
+
+def read_checksum(backup_path):
+    try:
+        with open(checksum_path(backup_path), "r", encoding="utf-8") as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def integrity_check(db_path):
+    """PRAGMA integrity_check çalıştırır. (ok, mesaj) döndürür."""
+    try:
+        conn = sqlite3.connect(f"file:{quote(db_path)}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return False, str(e)
+    messages = [r[0] for r in rows]
+    if messages == ["ok"]:
+        return True, "ok"
+    return False, "; ".join(messages[:5])
+
+
+def verify_backup(backup_path):
+    """Yedeğin checksum'ını ve SQLite bütünlüğünü doğrular. (ok, mesaj) döndürür."""
+    if not os.path.exists(backup_path):
+        return False, "Yedek dosyası bulunamadı"
+    expected = read_checksum(backup_path)
+    if expected is None:
+        return False, "Checksum dosyası yok"
+    actual = file_checksum(backup_path)
+    if actual != expected:
+        return False, f"Checksum uyuşmuyor (beklenen {expected[:12]}, bulunan {actual[:12]})"
+    return integrity_check(backup_path)
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """Yedek dosyalarını eskiden yeniye sıralı döndürür."""
+    if not os.path.isdir(backup_dir):
+        return []
+    names = sorted(
+        n for n in os.listdir(backup_dir)
+        if n.startswith(BACKUP_PREFIX) and n.endswith(BACKUP_SUFFIX)
+    )
+    return [os.path.join(backup_dir, n) for n in names]
+
+
+def rotate_backups(backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """En yeni 'keep' yedek dışındakileri (checksum dosyalarıyla birlikte) siler."""
+    backups = list_backups(backup_dir)
+    removed = []
+    for path in backups[:max(len(backups) - keep, 0)]:
+        for p in (path, checksum_path(path)):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+        removed.append(path)
+        log.info(f"BACKUP Eski yedek silindi: {os.path.basename(path)}")
+    return removed
+
+
+def create_backup(db_path=DB_PATH, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """Online yedek al, doğrula, checksum yaz ve eski yedekleri döndür."""
+    os.makedirs(backup_dir, exist_ok=True)
+    # Mikrosaniye: aynı saniyede alınan iki yedek (zamanlayıcı + session_audit --merge) çakışmasın
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    backup_path = os.path.join(backup_dir, f"{BACKUP_PREFIX}{stamp}{BACKUP_SUFFIX}")
+
+    start = time.time()
+    copy_database(db_path, backup_path)
+    ok, msg = integrity_check(backup_path)
+    if not ok:
+        os.remove(backup_path)
+        raise RuntimeError(f"Yedek bütünlük kontrolünden geçemedi: {msg}")
+    digest = write_checksum(backup_path)
+    elapsed = time.time() - start
+
+    size_kb = os.path.getsize(backup_path) // 1024
+    log.info(f"BACKUP ✓ {os.path.basename(backup_path)} ({size_kb} KB, {elapsed:.2f}s, sha256={digest[:12]})")
+    rotate_backups(backup_dir, keep)
+    return backup_path
+
+
+def restore_backup(backup_path, db_path=DB_PATH):
+    """
+    Yedeği geri yükler. Önce yedek doğrulanır, sonra veritabanının yanına
+    kopyalanıp tekrar kontrol edilir; ancak ondan sonra canlı dosya ile yer değiştirir.
+    Mevcut veritabanının backup API ile alınan kopyası (WAL'daki, henüz checkpoint
+    edilmemiş işlemler dahil) '<db>.pre-restore' olarak saklanır.
+    Geri yüklemeden önce servisler durdurulmalıdır (./stop_all.sh).
+    """
+    ok, msg = verify_backup(backup_path)
+    if not ok:
+        raise RuntimeError(f"Yedek doğrulanamadı: {msg}")
+
+    staging_path = db_path + ".restore"
+    copy_database(backup_path, staging_path)
+    ok, msg = integrity_check(staging_path)
+    if not ok:
+        os.remove(staging_path)
+        raise RuntimeError(f"Geri yükleme kopyası bozuk: {msg}")
+
+    if os.path.exists(db_path):
+        # Dosyayı yeniden adlandırmak -wal'daki işlemleri dışarıda bırakır; kopya onları da içerir
+        copy_database(db_path, db_path + ".pre-restore")
+    # Eski dosyaya ait WAL/SHM kalıntıları yeni dosyaya uygulanmamalı
+    for suffix in ("-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(staging_path, db_path)
+    log.info(f"BACKUP ✓ Geri yüklendi: {os.path.basename(backup_path)} -> {db_path}")
+    return db_path
+
+
+class BackupScheduler(threading.Thread):
+    """Belirli aralıklarla arka planda online yedek alan thread."""
+
+    def __init__(self, db_path=DB_PATH, backup_dir=BACKUP_DIR,
+                 interval=BACKUP_INTERVAL_SECONDS, keep=BACKUP_KEEP):
+        super().__init__(name="backup-scheduler", daemon=True)
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.keep = keep
+        self.stop_event = threading.Event()
+
+    def seconds_until_due(self):
+        """Son yedeğin yaşına göre bir sonraki yedeğe kalan süre (yeniden başlatmada sayaç sıfırlanmaz)."""
+        backups = list_backups(self.backup_dir)
+        if not backups:
+            return 0
+        age = time.time() - os.path.getmtime(backups[-1])
+        return max(self.interval - age, 0)
+
+    def run(self):
+        log.info(f"BACKUP Zamanlayıcı başlatıldı (aralık {self.interval}s, {self.keep} yedek)")
+        while not self.stop_event.wait(self.seconds_until_due()):
+            try:
+                if os.path.exists(self.db_path):
+                    create_backup(self.db_path, self.backup_dir, self.keep)
+            except Exception as e:
+                log.error(f"BACKUP Hata: {e}")
+                # Hatalı durumda sürekli denememek için bir aralık bekle
+                if self.stop_event.wait(min(self.interval, 300)):
+                    break
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def start_backup_scheduler(db_path=DB_PATH, interval=BACKUP_INTERVAL_SECONDS):
+    scheduler = BackupScheduler(db_path=db_path, interval=interval)
+    scheduler.start()
+    return scheduler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="attendance.db online yedekleme")
+    parser.add_argument("--db", default=DB_PATH, help="Veritabanı yolu")
+    parser.add_argument("--dir", default=BACKUP_DIR, help="Yedek dizini")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backup", help="Hemen yedek al")
+    sub.add_parser("list", help="Yedekleri listele")
+    p_verify = sub.add_parser("verify", help="Yedek(ler)i doğrula")
+    p_verify.add_argument("path", nargs="?")
+    p_restore = sub.add_parser("restore", help="Yedeği geri yükle")
+    p_restore.add_argument("path", help="Yedek dosyası veya 'latest'")
+    p_schedule = sub.add_parser("schedule", help="Ön planda periyodik yedekleme")
+    p_schedule.add_argument("--interval", type=int, default=BACKUP_INTERVAL_SECONDS)
+    args = parser.parse_args(argv)
+
+    if args.command == "backup":
+        print(create_backup(args.db, args.dir))
+    elif args.command == "list":
+        for path in list_backups(args.dir):
+            size_kb = os.path.getsize(path) // 1024
+            print(f"{os.path.basename(path)}  {size_kb} KB  sha256={(read_checksum(path) or '-')[:12]}")
+    elif args.command == "verify":
+        paths = [args.path] if args.path else list_backups(args.dir)
+        all_ok = True
+        for path in paths:
+            ok, msg = verify_backup(path)
+            all_ok = all_ok and ok
+            print(f"{'OK  ' if ok else 'FAIL'} {os.path.basename(path)}: {msg}")
+        return 0 if all_ok else 1
+    elif args.command == "restore":
+        path = args.path
+        if path == "latest":
+            backups = list_backups(args.dir)
+            if not backups:
+                print("Yedek bulunamadı")
+                return 1
+            path = backups[-1]
+        try:
+            restore_backup(path, args.db)
+        except RuntimeError as e:
+            print(f"Geri yükleme iptal edildi: {e}")
+            return 1
+    elif args.command == "schedule":
+        scheduler = BackupScheduler(args.db, args.dir, interval=args.interval)
+        scheduler.start()
+        try:
+            while scheduler.is_alive():
+                scheduler.join(1.0)
+        except KeyboardInterrupt:
+            scheduler.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
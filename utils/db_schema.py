@@ -0,0 +1,166 @@
+# db_schema.py
+# Mevcut veritabanlarını güncel şemaya getirir (idempotent).
+# app.py ve automation.py ilk bağlantıda ensure_schema() çağırır; init_db.py ile
+# oluşturulmuş eski dosyalarda eksik tablo ve indeksler burada eklenir.
+
+import sqlite3
+
+# Değişince veri sürümünü artıran tablolar
+VERSIONED_TABLES = ("users", "attendance")
+
+# Kullanıcı aramasında (FTS5) indekslenen sütunlar; users tablosunda olmayanlar atlanır
+USER_SEARCH_COLUMNS = ("first_name", "last_name", "department", "class", "position")
+
+
+def _table_exists(conn, name):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _table_columns(conn, name):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({name})")]
+
+
+def ensure_schema(conn):
+    """Eksik tablo/indeksleri oluşturur. Yeni oluşturulan presence tablosunu doldurur."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_user_checkin ON attendance(user_id, check_in)")
+    # Rapor API'si için kapsayan (covering) indeksler - (date, id) keyset sırası,
+    # satırlar tabloya dönmeden indeksten okunur
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attendance_report
+        ON attendance(date, id, user_id, check_in, check_out, duration_minutes)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attendance_user_report
+        ON attendance(user_id, date, id, check_in, check_out, duration_minutes)
+    """)
+
+    # Şu an içeride olanlar: kullanıcı başına tek satır, açık oturuma işaret eder.
+    # Her giriş/çıkış ile aynı transaction içinde güncellenir (refresh_presence).
+    if not _table_exists(conn, "presence"):
+        conn.execute("""
+            CREATE TABLE presence (
+                user_id        INTEGER PRIMARY KEY,
+                attendance_id  INTEGER NOT NULL,
+                since          DATETIME NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (attendance_id) REFERENCES attendance(id)
+            )
+        """)
+        conn.execute("""
+            INSERT INTO presence (user_id, attendance_id, since)
+            SELECT a.user_id, a.id, a.check_in
+            FROM attendance a
+            WHERE a.id = (
+                SELECT b.id FROM attendance b
+                WHERE b.user_id = a.user_id AND b.check_out IS NULL AND b.check_in IS NOT NULL
+                ORDER BY b.check_in DESC
+                LIMIT 1
+            )
+        """)
+
+    # Veri sürümü: users/attendance'a her yazımda trigger ile artar.
+    # Sayfa önbelleği ve ETag bu sayıya göre geçersiz olur (diğer süreçlerin yazımları dahil).
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+    for table in VERSIONED_TABLES:
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_version
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+                END
+            """)
+    ensure_user_search(conn)
+    conn.commit()
+
+
+def user_search_columns(conn):
+    """users'ta bulunan arama sütunları (FTS indeksi ve LIKE yedeği aynı listeyi kullanır)."""
+    existing = _table_columns(conn, "users")
+    return [c for c in USER_SEARCH_COLUMNS if c in existing]
+
+
+def ensure_user_search(conn):
+    """
+    users için FTS5 arama indeksini (users_fts) ve onu güncel tutan trigger'ları oluşturur.
+    Harici içerik tablosudur: metin users'ta kalır, indeks yalnızca token'ları tutar.
+    SQLite FTS5 olmadan derlenmişse False döner (arama LIKE ile yapılır). Commit ETMEZ.
+    """
+    if _table_exists(conn, "users_fts"):
+        return True
+    columns = user_search_columns(conn)
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE users_fts USING fts5(
+                {cols},
+                content='users', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return False
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts (rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_update AFTER UPDATE ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO users_fts (rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+    # Mevcut kullanıcıları indeksle
+    conn.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+    return True
+
+
+def has_user_search(conn):
+    """users_fts indeksi var mı (FTS5 destekli SQLite)."""
+    return _table_exists(conn, "users_fts")
+
+
+def get_data_version(conn):
+    """Veri sürümünü döndürür; meta tablosu yoksa (eski snapshot) None."""
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def refresh_presence(cur, user_id):
+    """
+    Kullanıcının presence satırını en son açık oturumuna göre yeniden yazar
+    (açık oturum yoksa siler). Commit ETMEZ - çağıranın transaction'ının parçasıdır.
+    """
+    cur.execute("DELETE FROM presence WHERE user_id = ?", (user_id,))
+    cur.execute("""
+        INSERT INTO presence (user_id, attendance_id, since)
+        SELECT user_id, id, check_in
+        FROM attendance
+        WHERE user_id = ? AND check_out IS NULL AND check_in IS NOT NULL
+        ORDER BY check_in DESC
+        LIMIT 1
+    """, (user_id,))
+
+
+def ensure_schema_at(db_path):
+    """Yol verilerek ensure_schema çalıştırır."""
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_schema(conn)
+    finally:
+        conn.close()
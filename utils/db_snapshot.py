@@ -0,0 +1,120 @@
+# db_snapshot.py
+# Raporlama için salt-okunur veritabanı kopyası (snapshot).
+# Excel, haftalık özet ve Google Sheets senkronizasyonu canlı dosya yerine bu kopyayı
+# okur; böylece ağır raporlar kapıdaki parmak okuma/yazma işlemini yavaşlatmaz.
+#
+# Snapshot backup API ile (db_backup.copy_database) geçici dosyaya kopyalanıp atomik
+# olarak yer değiştirir; açık okuyucular eski kopyayı okumaya devam eder.
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+from utils.db_backup import copy_database
+
+log = setup_logger("snapshot")
+
+SNAPSHOT_REFRESH_SECONDS = 30   # Arka planda yenileme aralığı
+SNAPSHOT_PAGES_PER_STEP = 128   # Snapshot kopyalama adımı (~512 KB)
+
+# Aynı süreçte aynı snapshot'ı iki thread'in birden kopyalamasını engelle
+_refresh_lock = threading.Lock()
+
+
+def snapshot_path_for(db_path):
+    """attendance.db -> attendance.snapshot.db"""
+    base, ext = os.path.splitext(db_path)
+    return f"{base}.snapshot{ext or '.db'}"
+
+
+def _source_mtime(db_path):
+    """Ana veritabanının son değişiklik zamanı (WAL dosyası dahil)."""
+    mtime = 0
+    for path in (db_path, db_path + "-wal"):
+        try:
+            mtime = max(mtime, os.path.getmtime(path))
+        except OSError:
+            pass
+    return mtime
+
+
+def refresh_snapshot(db_path, force=False):
+    """
+    Ana veritabanı snapshot'tan yeniyse snapshot'ı yeniden oluşturur.
+    Yenileme yapıldıysa True döner.
+    """
+    snap_path = snapshot_path_for(db_path)
+    with _refresh_lock:
+        if not force and os.path.exists(snap_path):
+            if _source_mtime(db_path) <= os.path.getmtime(snap_path):
+                return False
+        start = time.time()
+        copy_database(db_path, snap_path, pages=SNAPSHOT_PAGES_PER_STEP)
+        log.debug(f"SNAPSHOT Yenilendi ({time.time() - start:.2f}s)")
+        return True
+
+
+def ensure_fresh_snapshot(db_path, max_age=SNAPSHOT_REFRESH_SECONDS):
+    """Snapshot yoksa veya max_age saniyeden eskiyse yeniler."""
+    snap_path = snapshot_path_for(db_path)
+    try:
+        age = time.time() - os.path.getmtime(snap_path)
+    except OSError:
+        age = None
+    if age is None or age > max_age:
+        try:
+            return refresh_snapshot(db_path)
+        except Exception as e:
+            log.error(f"SNAPSHOT Yenileme hatası: {e}")
+    return False
+
+
+def connect_snapshot(db_path):
+    """
+    Snapshot'a salt-okunur (mode=ro) bağlantı açar.
+    Snapshot henüz oluşturulmamışsa ana veritabanı okunur; o da yalnızca mode=ro ile
+    (raporlar ana dosyaya hiçbir durumda yazamaz).
+    """
+    snap_path = snapshot_path_for(db_path)
+    if not os.path.exists(snap_path):
+        snap_path = db_path
+    return sqlite3.connect(f"file:{quote(snap_path)}?mode=ro", uri=True)
+
+
+class SnapshotRefresher(threading.Thread):
+    """Snapshot'ı belirli aralıklarla yenileyen arka plan thread'i."""
+
+    def __init__(self, db_path, interval=SNAPSHOT_REFRESH_SECONDS):
+        super().__init__(name="snapshot-refresher", daemon=True)
+        self.db_path = db_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        log.info(f"SNAPSHOT Yenileyici başlatıldı (aralık {self.interval}s)")
+        while True:
+            try:
+                if os.path.exists(self.db_path):
+                    refresh_snapshot(self.db_path)
+            except Exception as e:
+                log.error(f"SNAPSHOT Hata: {e}")
+            if self.stop_event.wait(self.interval):
+                break
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def start_snapshot_refresher(db_path, interval=SNAPSHOT_REFRESH_SECONDS):
+    refresher = SnapshotRefresher(db_path, interval)
+    refresher.start()
+    return refresher
@@ -35,6 +35,17 @@ CREATE TABLE IF NOT EXISTS attendance (
     created_at         DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
+
+CREATE INDEX IF NOT EXISTS idx_attendance_user_checkin ON attendance(user_id, check_in);
+
+-- Şu an içeride olanlar (kullanıcı başına açık oturum)
+CREATE TABLE IF NOT EXISTS presence (
+    user_id        INTEGER PRIMARY KEY,
+    attendance_id  INTEGER NOT NULL,
+    since          DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (attendance_id) REFERENCES attendance(id)
+);
 """)
 
 conn.commit()
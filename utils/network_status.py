@@ -0,0 +1,150 @@
+# network_status.py
+# Panelin ana ekranında gösterilen IP adresi için önbellekli ağ durumu.
+#
+# Adres her ekran çiziminde 8.8.8.8'e UDP bağlantısı açılarak bulunmuyor:
+#   - varsayılan rotanın arayüzü /proc/net/route'tan okunur (rota yoksa ilk
+#     adresli arayüz), IPv4 adresi SIOCGIFADDR ioctl'i ile alınır (ağ trafiği yok)
+#   - NetworkStatus bir thread'de netlink (RTMGRP_LINK | RTMGRP_IPV4_IFADDR)
+#     bildirimlerini bekler; bildirim gelince veya REFRESH_SECONDS dolunca adresi
+#     yeniden okur. Netlink yoksa yalnızca zamanlayıcı kullanılır.
+#   - Adres gerçekten değiştiğinde on_change(adres) çağrılır.
+
+import fcntl
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+log = setup_logger("network")
+
+SIOCGIFADDR = 0x8915
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+ROUTE_FILE = "/proc/net/route"
+REFRESH_SECONDS = 60        # Netlink bildirimi gelmese de bu aralıkla yeniden okunur
+NETLINK_SETTLE_SECONDS = 0.5  # Art arda gelen bildirimleri tek okumada topla
+
+
+def ipv4_address(ifname):
+    """Arayüzün IPv4 adresi (SIOCGIFADDR); adres yoksa None."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        packed = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, struct.pack("256s", ifname[:15].encode()))
+        return socket.inet_ntoa(packed[20:24])
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def default_interface(route_file=ROUTE_FILE):
+    """Varsayılan rotanın (hedef 0.0.0.0) arayüzü; yoksa None."""
+    try:
+        with open(route_file) as f:
+            next(f, None)
+            for line in f:
+                fields = line.split()
+                if len(fields) > 1 and fields[1] == "00000000":
+                    return fields[0]
+    except OSError:
+        pass
+    return None
+
+
+def current_address(route_file=ROUTE_FILE):
+    """
+    Panelde gösterilecek adres: varsayılan rota arayüzünün adresi, rota yoksa
+    (ör. laboratuvar ağı) loopback dışındaki ilk adresli arayüz; hiçbiri yoksa None.
+    """
+    iface = default_interface(route_file)
+    if iface:
+        address = ipv4_address(iface)
+        if address:
+            return address
+    for _, name in socket.if_nameindex():
+        if name == "lo":
+            continue
+        address = ipv4_address(name)
+        if address:
+            return address
+    return None
+
+
+def open_netlink():
+    """Adres/bağlantı değişikliklerini dinleyen netlink soketi; desteklenmiyorsa None."""
+    if not hasattr(socket, "AF_NETLINK"):
+        return None
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR))
+        return sock
+    except OSError as e:
+        log.warning(f"Netlink açılamadı ({e}), yalnızca zamanlayıcı kullanılacak")
+        return None
+
+
+class NetworkStatus:
+    """
+    Son bilinen IP adresini tutar. address okunurken sistem çağrısı yapılmaz;
+    adres yalnızca refresh() ile (thread'den veya elle) güncellenir.
+    """
+
+    def __init__(self, on_change=None, interval=REFRESH_SECONDS):
+        self.on_change = on_change
+        self.interval = interval
+        self.address = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def refresh(self):
+        """Adresi yeniden okur; değiştiyse on_change çağrılır. Değişti mi döner."""
+        address = current_address()
+        if address == self.address:
+            return False
+        log.info(f"IP adresi: {self.address or '-'} -> {address or '-'}")
+        self.address = address
+        if self.on_change:
+            self.on_change(address)
+        return True
+
+    def start(self):
+        self.refresh()
+        self.thread = threading.Thread(target=self._run, name="network-status", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def _run(self):
+        sock = open_netlink()
+        try:
+            while not self.stop_event.is_set():
+                if sock is None:
+                    self.stop_event.wait(self.interval)
+                else:
+                    ready, _, _ = select.select([sock], [], [], self.interval)
+                    if ready:
+                        # Bir değişiklik çoğu zaman birkaç mesajla gelir: biraz bekle, hepsini boşalt
+                        self.stop_event.wait(NETLINK_SETTLE_SECONDS)
+                        while select.select([sock], [], [], 0)[0]:
+                            sock.recv(65536)
+                if self.stop_event.is_set():
+                    break
+                try:
+                    self.refresh()
+                except Exception as e:
+                    log.error(f"Ağ durumu okunamadı: {e}")
+        finally:
+            if sock is not None:
+                sock.close()
@@ -0,0 +1,42 @@
+# page_cache.py
+# Render edilmiş sayfalar için küçük, thread-safe LRU önbellek.
+# Anahtar veri sürümünü (meta.data_version) içerdiği için açıkça silmeye gerek yoktur:
+# her yazım yeni bir sürüm üretir, eski girdiler kullanılmadıkça sondan düşer.
+
+import threading
+from collections import OrderedDict
+
+PAGE_CACHE_SIZE = 64
+
+
+class LRUCache:
+    def __init__(self, size=PAGE_CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,233 @@
+# report_export.py
+# Tarih aralığı raporları: keyset sorguları ve CSV/Excel dışa aktarımı.
+#
+# Satırlar veritabanından imleçle akar, hiçbir aşamada tüm sonuç listeye alınmaz:
+#   - CSV parça parça üretilir ve doğrudan istemciye gönderilir
+#   - Excel, xlsxwriter'ın constant_memory modunda geçici dosyaya satır satır yazılır
+# Böylece aylarca süren aralıklar Pi'de birkaç MB bellekle dışa aktarılır.
+
+import codecs
+import csv
+import io
+import os
+
+REPORT_PAGE_SIZE = 500      # Keyset sayfa boyutu (sunucu tarafı)
+EXPORT_CHUNK_ROWS = 500     # CSV'de tek parçada gönderilen satır sayısı
+FILE_CHUNK_SIZE = 64 * 1024
+HIGHLIGHT_MINUTES = 1080    # Bu sürenin üzerindeki satırlar Excel'de vurgulanır
+
+EXPORT_GRANULARITIES = ("session", "day", "week", "summary")
+EXPORT_FORMATS = ("csv", "xlsx")
+
+EXPORT_COLUMNS = {
+    "session": ["Tarih", "Ad", "Soyad", "Departman", "Giriş", "Çıkış", "Dakika"],
+    "day": ["Tarih", "Ad", "Soyad", "Departman", "Oturum", "Toplam Dakika", "Saat:Dakika"],
+    "week": ["Hafta Başı", "Ad", "Soyad", "Departman", "Oturum", "Toplam Dakika", "Saat:Dakika"],
+    "summary": ["Ad", "Soyad", "Toplam Dakika", "Saat:Dakika"],
+}
+
+SHEET_TITLES = {
+    "session": "Oturumlar",
+    "day": "Günlük",
+    "week": "Haftalık",
+    "summary": "Özet",
+}
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Haftanın Pazartesi'si (SQLite: 'weekday 0' bir sonraki Pazar)
+WEEK_START_SQL = "date(a.date, 'weekday 0', '-6 days')"
+
+
+def iter_report_rows(conn, start, end, user_id=None, department=None, after=None, limit=None):
+    """
+    Aralıktaki oturumları (date, id) sırasıyla keyset sayfalama ile akış halinde döndürür.
+    Her sayfa ayrı kısa bir sorgudur; bellek kullanımı satır sayısından bağımsızdır.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = REPORT_PAGE_SIZE if remaining is None else min(REPORT_PAGE_SIZE, remaining)
+        sql = """
+            SELECT a.id, a.date, a.user_id, u.first_name, u.last_name, u.department,
+                   a.check_in, a.check_out, a.duration_minutes
+            FROM attendance a
+            JOIN users u ON u.id = a.user_id
+            WHERE a.date BETWEEN ? AND ?
+        """
+        params = [start.isoformat(), end.isoformat()]
+        if user_id is not None:
+            sql += " AND a.user_id = ?"
+            params.append(user_id)
+        if department:
+            sql += " AND u.department = ?"
+            params.append(department)
+        if after is not None:
+            sql += " AND (a.date, a.id) > (?, ?)"
+            params.extend(after)
+        sql += " ORDER BY a.date, a.id LIMIT ?"
+        params.append(page_size)
+
+        rows = conn.execute(sql, params).fetchall()
+        for r in rows:
+            yield {
+                "id": r[0],
+                "date": r[1],
+                "user_id": r[2],
+                "first_name": r[3],
+                "last_name": r[4],
+                "department": r[5],
+                "check_in": r[6],
+                "check_out": r[7],
+                "duration_minutes": r[8] or 0,
+            }
+        if len(rows) < page_size:
+            return
+        after = (rows[-1][1], rows[-1][0])
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def get_range_totals(conn, start, end):
+    """Aralıktaki toplam süreleri kullanıcı bazında döndürür (kaydı olmayanlar 0)."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT u.id, u.first_name, u.last_name, SUM(a.duration_minutes) as range_total
+        FROM users u
+        LEFT JOIN attendance a ON u.id = a.user_id AND a.date BETWEEN ? AND ?
+        GROUP BY u.id, u.first_name, u.last_name
+        ORDER BY range_total DESC
+    """, (start.isoformat(), end.isoformat()))
+    return cur.fetchall()
+
+
+def format_minutes(total):
+    return f"{total // 60} saat {total % 60} dk"
+
+
+def _iter_grouped(conn, period_sql, start, end, user_id, department):
+    """Gün/hafta bazında kullanıcı toplamları; sonuç imleçten satır satır okunur."""
+    sql = f"""
+        SELECT {period_sql} AS period, u.first_name, u.last_name, u.department,
+               COUNT(*), SUM(a.duration_minutes)
+        FROM attendance a
+        JOIN users u ON u.id = a.user_id
+        WHERE a.date BETWEEN ? AND ?
+    """
+    params = [start.isoformat(), end.isoformat()]
+    if user_id is not None:
+        sql += " AND a.user_id = ?"
+        params.append(user_id)
+    if department:
+        sql += " AND u.department = ?"
+        params.append(department)
+    sql += " GROUP BY period, a.user_id ORDER BY period, u.first_name, u.last_name"
+    for period, first_name, last_name, dept, sessions, total in conn.execute(sql, params):
+        total = total or 0
+        yield [period, first_name, last_name, dept or "", sessions, total, format_minutes(total)]
+
+
+def _iter_summary(conn, start, end, user_id, department):
+    sql = """
+        SELECT u.first_name, u.last_name, SUM(a.duration_minutes) AS range_total
+        FROM users u
+        LEFT JOIN attendance a ON u.id = a.user_id AND a.date BETWEEN ? AND ?
+        WHERE 1 = 1
+    """
+    params = [start.isoformat(), end.isoformat()]
+    if user_id is not None:
+        sql += " AND u.id = ?"
+        params.append(user_id)
+    if department:
+        sql += " AND u.department = ?"
+        params.append(department)
+    sql += " GROUP BY u.id, u.first_name, u.last_name ORDER BY range_total DESC"
+    for first_name, last_name, total in conn.execute(sql, params):
+        total = total or 0
+        yield [first_name, last_name, total, format_minutes(total)]
+
+
+def iter_export_rows(conn, granularity, start, end, user_id=None, department=None):
+    """Seçilen ayrıntı düzeyinde dışa aktarım satırlarını (liste) sırayla üretir."""
+    if granularity == "session":
+        for r in iter_report_rows(conn, start, end, user_id, department):
+            yield [r["date"], r["first_name"], r["last_name"], r["department"] or "",
+                   r["check_in"], r["check_out"] or "", r["duration_minutes"]]
+    elif granularity == "day":
+        yield from _iter_grouped(conn, "a.date", start, end, user_id, department)
+    elif granularity == "week":
+        yield from _iter_grouped(conn, WEEK_START_SQL, start, end, user_id, department)
+    elif granularity == "summary":
+        yield from _iter_summary(conn, start, end, user_id, department)
+    else:
+        raise ValueError(f"Bilinmeyen ayrıntı düzeyi: {granularity}")
+
+
+def _total_minutes(granularity, row):
+    """Vurgulama için satırdaki toplam dakika (oturum satırlarında yok)."""
+    if granularity == "summary":
+        return row[2]
+    if granularity in ("day", "week"):
+        return row[5]
+    return 0
+
+
+def iter_csv(granularity, rows):
+    """
+    Satırları CSV metni olarak parça parça üretir (UTF-8, Excel için BOM ile).
+    Her parça EXPORT_CHUNK_ROWS satırdır; ilk parça başlıkla hemen gönderilir.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS[granularity])
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_xlsx(path, granularity, rows):
+    """
+    Satırları constant_memory modunda Excel dosyasına yazar.
+    Bu modda satırlar sırayla diske aktarılır; bellekte yalnızca geçerli satır tutulur.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        worksheet = workbook.add_worksheet(SHEET_TITLES[granularity])
+        worksheet.write_row(0, 0, EXPORT_COLUMNS[granularity])
+        highlight_format = workbook.add_format({"bg_color": "#dcfce7"})
+        count = 0
+        for idx, row in enumerate(rows, 1):
+            # constant_memory'de satır biçimi hücreler yazılırken verilmelidir
+            if _total_minutes(granularity, row) >= HIGHLIGHT_MINUTES:
+                worksheet.write_row(idx, 0, row, highlight_format)
+            else:
+                worksheet.write_row(idx, 0, row)
+            count = idx
+    finally:
+        workbook.close()
+    return count
+
+
+def iter_file_chunks(f):
+    """Açık dosyayı parça parça okur (dosyayı kapatmak çağıranın işidir)."""
+    while True:
+        chunk = f.read(FILE_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def export_filename(granularity, start, end, fmt):
+    return f"yoklama_{granularity}_{start.isoformat()}_to_{end.isoformat()}.{fmt}"
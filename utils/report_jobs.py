@@ -0,0 +1,149 @@
+# report_jobs.py
+# Arka planda rapor üretimi (dışa aktarım kuyruğu).
+#
+# Web isteği yalnızca işi kuyruğa ekler ve hemen döner; tek bir worker thread
+# dosyayı data/reports/ altına yazar, istemci durumu sorgulayarak bekler.
+# İş kimliği isteğin kendisinden (tür, aralık, biçim, filtreler, veri sürümü)
+# türetilir: aynı istek, veri değişmediği sürece hazır dosyayı tekrar kullanır.
+# Tek worker olduğu için ağır raporlar aynı anda yalnızca biri üretilir;
+# parmak okuma ve dashboard istekleri bu yüzden beklemez.
+
+import hashlib
+import os
+import queue
+import sys
+import threading
+import time
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+log = setup_logger("report_jobs")
+
+REPORTS_DIR = os.path.join(BASE_DIR, "data", "reports")
+REPORT_CACHE_FILES = 20     # Dizinde tutulan en fazla hazır rapor
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+
+
+def job_id_for(params, version):
+    """
+    İstek parametreleri + veri sürümünden sabit iş kimliği.
+    Sürüm bilinmiyorsa (meta tablosu olmayan snapshot) kimlik zamana bağlanır,
+    böylece eski veriyle üretilmiş dosya yeniden kullanılmaz.
+    """
+    salt = version if version is not None else f"t{time.time_ns()}"
+    key = "|".join(f"{k}={params[k]}" for k in sorted(params)) + f"|v={salt}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class ReportJobQueue:
+    """
+    build(params, path) dosyayı path'e yazan fonksiyondur (worker thread'de çağrılır).
+    Worker ilk iş geldiğinde başlatılır.
+    """
+
+    def __init__(self, build, directory=REPORTS_DIR, max_files=REPORT_CACHE_FILES):
+        self.build = build
+        self.directory = directory
+        self.max_files = max_files
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.worker = None
+
+    def path_for(self, job_id, fmt):
+        return os.path.join(self.directory, f"{job_id}.{fmt}")
+
+    def submit(self, params, version):
+        """İşi kuyruğa ekler (veya hazır/süren aynı işi döndürür). İşin kopyasını döner."""
+        job_id = job_id_for(params, version)
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job and job["status"] != STATUS_ERROR:
+                if job["status"] != STATUS_DONE or os.path.exists(job["path"]):
+                    return dict(job)
+
+            path = self.path_for(job_id, params["format"])
+            job = {
+                "id": job_id,
+                "params": dict(params),
+                "version": version,
+                "path": path,
+                "status": STATUS_QUEUED,
+                "error": None,
+                "created": time.time(),
+                "finished": None,
+            }
+            if version is not None and os.path.exists(path):
+                # Önceki çalışmadan kalan dosya (süreç yeniden başladı)
+                job["status"] = STATUS_DONE
+                job["finished"] = os.path.getmtime(path)
+                self.jobs[job_id] = job
+                return dict(job)
+
+            self.jobs[job_id] = job
+            self._ensure_worker()
+            queued = dict(job)
+        self.pending.put(job_id)
+        log.info(f"REPORT İş kuyruğa eklendi: {job_id} {params}")
+        return queued
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _ensure_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self._run, name="report-worker", daemon=True)
+            self.worker.start()
+
+    def _set(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _run(self):
+        while True:
+            job_id = self.pending.get()
+            job = self.get(job_id)
+            if job is None or job["status"] != STATUS_QUEUED:
+                continue
+            self._set(job_id, status=STATUS_RUNNING)
+            tmp_path = job["path"] + ".part"
+            started = time.time()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self.build(job["params"], tmp_path)
+                # Yarım dosya hiçbir zaman hazır rapor olarak görünmez
+                os.replace(tmp_path, job["path"])
+            except Exception as e:
+                log.error(f"REPORT {job_id} üretilemedi: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                self._set(job_id, status=STATUS_ERROR, error=str(e), finished=time.time())
+                continue
+            self._set(job_id, status=STATUS_DONE, finished=time.time())
+            log.info(f"REPORT ✓ {job_id} hazır ({time.time() - started:.1f}s)")
+            self.prune()
+
+    def prune(self):
+        """En eski hazır raporları siler; dizinde en fazla max_files dosya kalır."""
+        try:
+            names = [n for n in os.listdir(self.directory) if not n.endswith(".part")]
+        except FileNotFoundError:
+            return
+        paths = sorted((os.path.join(self.directory, n) for n in names), key=os.path.getmtime)
+        for path in paths[:max(0, len(paths) - self.max_files)]:
+            os.remove(path)
+        with self.lock:
+            for job_id, job in list(self.jobs.items()):
+                if job["status"] == STATUS_DONE and not os.path.exists(job["path"]):
+                    del self.jobs[job_id]
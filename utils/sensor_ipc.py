@@ -0,0 +1,137 @@
+# sensor_ipc.py
+# sensor_daemon.py ile web süreçleri arasındaki yerel IPC (Unix domain socket).
+#
+# Protokol: her mesaj tek satır JSON ('\n' ile biter).
+#   İstek : {"cmd": "match", "timeout": 15}
+#           {"cmd": "enroll"}
+#           {"cmd": "delete", "fingerprint_id": 12}
+#           {"cmd": "status"}
+#           {"cmd": "subscribe", "after": 0}
+#   Cevap : komut sonucu tek satır (HTTP cevabıyla aynı alanlar + "http_status").
+#           subscribe için bağlantı açık kalır, her olay bir satır gelir;
+#           olay yokken {"event": "keepalive"} gönderilir.
+
+import json
+import os
+import socket
+import sys
+import threading
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+log = setup_logger("sensor_ipc")
+
+SOCKET_PATH = os.environ.get("SENSOR_SOCKET", os.path.join(BASE_DIR, "data", "sensor.sock"))
+CONNECT_TIMEOUT = 2.0           # Daemon'a bağlanma süresi
+REQUEST_SLACK_SECONDS = 10      # Komutun kendi süresine eklenen pay
+ENROLL_TIMEOUT_SECONDS = 3 * 20 + 10  # 3 adım x 20 sn + pay
+SUBSCRIBE_KEEPALIVE_SECONDS = 15
+RELAY_RETRY_SECONDS = 3
+
+
+class SensorUnavailable(Exception):
+    """Daemon'a ulaşılamadı veya bağlantı yarıda koptu."""
+
+
+def encode(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _connect(path, timeout):
+    path = path or SOCKET_PATH
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        sock.close()
+        raise SensorUnavailable(f"Sensör servisine bağlanılamadı: {e}")
+    sock.settimeout(timeout)
+    return sock
+
+
+def request(cmd, path=None, io_timeout=None, **params):
+    """
+    Tek istek gönderir, tek satır cevap bekler.
+    io_timeout verilmezse komuta göre (match/enroll sensörü bekler) hesaplanır.
+    """
+    if io_timeout is None:
+        if cmd == "enroll":
+            io_timeout = ENROLL_TIMEOUT_SECONDS
+        else:
+            io_timeout = params.get("timeout", 0) + REQUEST_SLACK_SECONDS
+    sock = _connect(path, io_timeout)
+    try:
+        with sock.makefile("rwb") as f:
+            f.write(encode(dict(params, cmd=cmd)))
+            f.flush()
+            line = f.readline()
+    except OSError as e:
+        raise SensorUnavailable(f"Sensör servisi cevap vermedi: {e}")
+    finally:
+        sock.close()
+    if not line:
+        raise SensorUnavailable("Sensör servisi bağlantıyı kapattı")
+    return json.loads(line)
+
+
+def subscribe(after=0, path=None):
+    """Daemon'daki olayları sırayla üretir (keepalive satırları atlanır)."""
+    sock = _connect(path, SUBSCRIBE_KEEPALIVE_SECONDS * 2)
+    try:
+        with sock.makefile("rwb") as f:
+            f.write(encode({"cmd": "subscribe", "after": after}))
+            f.flush()
+            for line in f:
+                event = json.loads(line)
+                if event.get("event") != "keepalive":
+                    yield event
+    except OSError as e:
+        raise SensorUnavailable(f"Olay aboneliği koptu: {e}")
+    finally:
+        sock.close()
+    raise SensorUnavailable("Sensör servisi bağlantıyı kapattı")
+
+
+class EventRelay(threading.Thread):
+    """
+    Daemon'daki olayları yerel olay yoluna aktaran thread (web sürecinde çalışır).
+    Bağlantı koparsa tekrar bağlanır; kaldığı seq'ten devam eder.
+    """
+
+    def __init__(self, publish, path=None):
+        super().__init__(name="sensor-event-relay", daemon=True)
+        self.publish = publish
+        self.path = path
+        self.after = None
+        self.stop_event = threading.Event()
+
+    def run(self):
+        log.info(f"IPC Olay aktarımı başlatıldı ({self.path or SOCKET_PATH})")
+        while not self.stop_event.is_set():
+            try:
+                if self.after is None:
+                    # İlk bağlantı: geçmiş olayları tekrar gösterme
+                    self.after = request("status", self.path).get("seq", 0)
+                for event in subscribe(self.after, self.path):
+                    self.after = event.get("seq", self.after)
+                    self.publish(event)
+            except SensorUnavailable as e:
+                log.warning(f"IPC {e}")
+            except Exception as e:
+                log.error(f"IPC Olay aktarım hatası: {e}")
+            self.stop_event.wait(RELAY_RETRY_SECONDS)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def start_event_relay(publish, path=None):
+    relay = EventRelay(publish, path)
+    relay.start()
+    return relay
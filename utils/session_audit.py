@@ -0,0 +1,258 @@
+# session_audit.py
+# Yoklama oturumlarının denetimi - çakışan / iç içe oturumlar, boşluklar ve
+# imkansız süreler (zorla çıkış, 05:59 otomatik çıkış, çoklu kapı okutma kaynaklı).
+#
+# Tüm geçmiş tek bir akışta okunur: kayıtlar (user_id, check_in) sırasıyla gelir
+# (indeks sayesinde SQLite ek sıralama yapmaz), her kullanıcının oturumları bir kez
+# süpürülür. İstenirse çakışan oturumlar tek bir kesintisiz varlık aralığında
+# birleştirilir; böylece SUM(duration_minutes) toplamları çift sayım yapmaz.
+# Birleşen aralık iş günü sınırını (06:00) aşarsa her iş günü için ayrı satır
+# kalır. İmkansız oturumlar (negatif, 24 saatten uzun) birleştirilmez, yalnızca raporlanır.
+#
+# Kullanım:
+#   python3 utils/session_audit.py              # sadece rapor
+#   python3 utils/session_audit.py --verbose    # her bulguyu listele
+#   python3 utils/session_audit.py --merge      # yedek al + çakışmaları birleştir
+
+import argparse
+import os
+import sqlite3
+import sys
+from collections import Counter, namedtuple
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+from utils.db_backup import create_backup
+
+log = setup_logger("audit")
+
+DB_PATH = os.path.join(BASE_DIR, "data", "attendance.db")
+MAX_SESSION_MINUTES = 24 * 60   # Bundan uzun oturum imkansız kabul edilir
+DURATION_TOLERANCE_MINUTES = 1  # Kayıtlı süre ile hesaplanan süre arasındaki izin verilen fark
+WORK_DAY_START_HOUR = 6         # İş günü 06:00-05:59 (app.get_current_work_day ile aynı)
+
+Session = namedtuple("Session", "id user_id date start end duration")
+Issue = namedtuple("Issue", "kind user_id attendance_id other_id detail")
+Interval = namedtuple("Interval", "user_id start end attendance_ids")
+
+# Bulgu türleri
+OVERLAP = "overlap"                # Sonraki oturum öncekinin bitişinden önce başlıyor
+NESTED = "nested"                  # Oturum tamamen başka bir oturumun içinde
+GAP = "gap"                        # Aynı gün iki oturum arasındaki boşluk (bilgi)
+NEGATIVE = "negative"              # check_out < check_in
+TOO_LONG = "too_long"              # MAX_SESSION_MINUTES'tan uzun
+DURATION_MISMATCH = "duration_mismatch"  # duration_minutes check_in/check_out ile uyuşmuyor
+STALE_OPEN = "stale_open"          # Açık kalmış ama sonrasında yeni oturum açılmış
+
+
+def minutes_between(start, end):
+    return int((end - start).total_seconds() // 60)
+
+
+def _parse(ts):
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+
+
+def iter_sessions(conn, user_id=None):
+    """Oturumları (user_id, check_in) sırasıyla akış halinde döndürür."""
+    sql = """
+        SELECT id, user_id, date, check_in, check_out, duration_minutes
+        FROM attendance
+        WHERE check_in IS NOT NULL
+    """
+    params = ()
+    if user_id is not None:
+        sql += " AND user_id = ?"
+        params = (user_id,)
+    sql += " ORDER BY user_id, check_in, id"
+    cur = conn.execute(sql, params)
+    while True:
+        rows = cur.fetchmany(500)
+        if not rows:
+            break
+        for r in rows:
+            start = _parse(r[3])
+            if start is None:
+                continue
+            yield Session(r[0], r[1], r[2], start, _parse(r[4]), r[5] or 0)
+
+
+def sweep_user_sessions(sessions):
+    """
+    Tek kullanıcının check_in sıralı oturumlarını süpürür.
+    Issue ve (kapalı oturumlar için) birleştirilmiş Interval kayıtları üretir.
+    """
+    current = None        # [user_id, start, end, [ids], last_date]
+    previous = None       # Bir önceki oturum (stale_open tespiti için)
+
+    for s in sessions:
+        if previous is not None and previous.end is None:
+            yield Issue(STALE_OPEN, s.user_id, previous.id, s.id,
+                        f"açık oturumdan sonra {s.start.isoformat()} girişi")
+        previous = s
+
+        if s.end is None:
+            continue  # Devam eden oturum - aralığa dahil edilmez
+
+        if s.end < s.start:
+            yield Issue(NEGATIVE, s.user_id, s.id, None,
+                        f"{minutes_between(s.start, s.end)} dk")
+            continue
+
+        actual = minutes_between(s.start, s.end)
+        too_long = actual > MAX_SESSION_MINUTES
+        if too_long:
+            yield Issue(TOO_LONG, s.user_id, s.id, None, f"{actual} dk")
+        if abs(actual - s.duration) > DURATION_TOLERANCE_MINUTES:
+            yield Issue(DURATION_MISMATCH, s.user_id, s.id, None,
+                        f"kayıtlı {s.duration} dk, hesaplanan {actual} dk")
+        if too_long:
+            continue  # Hatalı kayıt: aralığa katılıp geçerli veri gibi yeniden yazılmasın
+
+        if current is None:
+            current = [s.user_id, s.start, s.end, [s.id], s.date]
+            continue
+
+        if s.start < current[2]:
+            kind = NESTED if s.end <= current[2] else OVERLAP
+            yield Issue(kind, s.user_id, s.id, current[3][-1],
+                        f"{minutes_between(s.start, min(s.end, current[2]))} dk çakışma")
+            current[2] = max(current[2], s.end)
+            current[3].append(s.id)
+            continue
+
+        if s.date == current[4] and s.start > current[2]:
+            yield Issue(GAP, s.user_id, current[3][-1], s.id,
+                        f"{minutes_between(current[2], s.start)} dk")
+
+        yield Interval(current[0], current[1], current[2], tuple(current[3]))
+        current = [s.user_id, s.start, s.end, [s.id], s.date]
+
+    if current is not None:
+        yield Interval(current[0], current[1], current[2], tuple(current[3]))
+
+
+def audit_sessions(conn, user_id=None):
+    """Tüm geçmişi tek geçişte denetler; Issue ve Interval kayıtlarını sırayla üretir."""
+    for _, sessions in groupby(iter_sessions(conn, user_id), key=lambda s: s.user_id):
+        yield from sweep_user_sessions(sessions)
+
+
+def work_day_of(ts):
+    """Zaman damgasının ait olduğu iş günü (06:00'dan önce: önceki gün)."""
+    return (ts - timedelta(hours=WORK_DAY_START_HOUR)).date()
+
+
+def split_work_days(start, end):
+    """[start, end) aralığını iş günü sınırlarında böler: [(iş günü, başlangıç, bitiş), ...]"""
+    pieces = []
+    while True:
+        day = work_day_of(start)
+        boundary = datetime.combine(day + timedelta(days=1), time(WORK_DAY_START_HOUR), start.tzinfo)
+        if end <= boundary:
+            pieces.append((day, start, end))
+            return pieces
+        pieces.append((day, start, boundary))
+        start = boundary
+
+
+def merge_intervals(conn, intervals):
+    """
+    Birden fazla oturumu kapsayan aralıkları iş günü başına tek satıra indirger:
+    aralık iş günü sınırlarında bölünür, her parça sıradaki oturum satırına (tarihiyle
+    birlikte) yazılır, artan satırlar silinir; satır yetmezse yeni satır eklenir.
+    Böylece gün/hafta toplamları dakikaları doğru güne yazar. Tek transaction içinde çalışır.
+    Silinen satır sayısını döndürür.
+    """
+    merged_rows = 0
+    with conn:
+        for iv in intervals:
+            ids = list(iv.attendance_ids)
+            for day, start, end in split_work_days(iv.start, iv.end):
+                values = (day.isoformat(), start.isoformat(), end.isoformat(), minutes_between(start, end))
+                if ids:
+                    conn.execute(
+                        "UPDATE attendance SET date = ?, check_in = ?, check_out = ?, duration_minutes = ? WHERE id = ?",
+                        values + (ids.pop(0),)
+                    )
+                else:
+                    conn.execute(
+                        "INSERT INTO attendance (user_id, date, check_in, check_out, duration_minutes) VALUES (?, ?, ?, ?, ?)",
+                        (iv.user_id,) + values
+                    )
+            conn.executemany("DELETE FROM attendance WHERE id = ?", [(i,) for i in ids])
+            merged_rows += len(ids)
+    return merged_rows
+
+
+def run_audit(conn, merge=False, user_id=None, on_issue=None):
+    """
+    Denetimi çalıştırır ve özet döndürür.
+    merge=True ise çakışan oturumlar birleştirilir (yalnızca birleştirilecek aralıklar bellekte tutulur).
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_user_checkin ON attendance(user_id, check_in)")
+    counts = Counter()
+    to_merge = []
+    presence_minutes = 0
+
+    for item in audit_sessions(conn, user_id):
+        if isinstance(item, Issue):
+            counts[item.kind] += 1
+            if on_issue:
+                on_issue(item)
+        else:
+            counts["intervals"] += 1
+            presence_minutes += minutes_between(item.start, item.end)
+            if len(item.attendance_ids) > 1:
+                to_merge.append(item)
+
+    summary = dict(counts)
+    summary["presence_minutes"] = presence_minutes
+    summary["mergeable_intervals"] = len(to_merge)
+    if merge and to_merge:
+        summary["merged_rows"] = merge_intervals(conn, to_merge)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yoklama oturum denetimi")
+    parser.add_argument("--db", default=DB_PATH, help="Veritabanı yolu")
+    parser.add_argument("--user", type=int, help="Sadece bu users.id")
+    parser.add_argument("--merge", action="store_true", help="Çakışan oturumları birleştir (önce yedek alınır)")
+    parser.add_argument("--verbose", action="store_true", help="Her bulguyu yazdır")
+    args = parser.parse_args(argv)
+
+    if args.merge:
+        log.info(f"AUDIT Birleştirme öncesi yedek: {create_backup(args.db)}")
+
+    def print_issue(issue):
+        if args.verbose:
+            other = f" <-> {issue.other_id}" if issue.other_id else ""
+            print(f"{issue.kind:18} user={issue.user_id} id={issue.attendance_id}{other} {issue.detail}")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        summary = run_audit(conn, merge=args.merge, user_id=args.user, on_issue=print_issue)
+    finally:
+        conn.close()
+
+    for key in sorted(summary):
+        print(f"{key:20} {summary[key]}")
+    if args.merge:
+        log.info(f"AUDIT ✓ {summary.get('merged_rows', 0)} çakışan oturum birleştirildi")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# static_assets.py
+# Statik dosyalar için derleme adımı ve manifest.
+#
+# static/ altındaki her dosya içerik özetiyle adlandırılarak static/dist/'e kopyalanır
+# (style.css -> style.3f9a1c2b7d.css); metin dosyalarının .gz ve (brotli kuruluysa)
+# .br sürümleri de önceden üretilir. Ad içerik değişince değiştiği için bu dosyalar
+# tarayıcıda süresiz (immutable) önbelleğe alınabilir; sayfa yüklemelerinde yalnızca
+# HTML istenir.
+#
+# Kullanım:
+#   python3 utils/static_assets.py     # start_all.sh web sunucusundan önce çalıştırır
+#
+# Şablonlarda url_for('static', ...) yerine asset_url('style.css') kullanılır;
+# derleme yapılmamışsa normal /static/ adresine düşer.
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+log = setup_logger("static_assets")
+
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 10
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt", ".html")
+COMPRESS_MIN_BYTES = 256    # Küçük dosyalarda sıkıştırma kazandırmaz
+
+# Accept-Encoding değeri -> önceden sıkıştırılmış dosya uzantısı (tercih sırasıyla)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def hashed_name(name, data):
+    digest = hashlib.sha1(data).hexdigest()[:HASH_LENGTH]
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest}{ext}"
+
+
+def _write(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(dist_dir):
+    try:
+        with open(os.path.join(dist_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """
+    Özet adlı kopyaları, sıkıştırılmış sürümleri ve manifest'i üretir.
+    Bir önceki derlemenin dosyaları silinmez (önbellekteki eski sayfalar hâlâ onlara
+    işaret edebilir); daha eski olanlar temizlenir. Manifest'i döndürür.
+    """
+    os.makedirs(dist_dir, exist_ok=True)
+    previous = _read_manifest(dist_dir)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist_dir]
+        for filename in sorted(files):
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+            target_name = hashed_name(name, data)
+            target = os.path.join(dist_dir, target_name)
+            manifest[name] = target_name
+            if os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _write(target, data)
+            if filename.endswith(COMPRESSIBLE_EXTENSIONS) and len(data) >= COMPRESS_MIN_BYTES:
+                _write(target + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+                if BROTLI_AVAILABLE:
+                    _write(target + ".br", brotli.compress(data))
+
+    _write(os.path.join(dist_dir, MANIFEST_NAME),
+           json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    keep = set(manifest.values()) | set(previous.values()) | {MANIFEST_NAME}
+    for root, dirs, files in os.walk(dist_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, dist_dir).replace(os.sep, "/")
+            for _, suffix in ENCODINGS:
+                if name.endswith(suffix):
+                    name = name[:-len(suffix)]
+            if name not in keep:
+                os.remove(path)
+    log.info(f"ASSETS {len(manifest)} dosya derlendi ({dist_dir})")
+    return manifest
+
+
+class AssetManifest:
+    """
+    Derlenmiş manifest'i okur; dosya değişirse (yeniden derleme) otomatik yeniden yükler.
+    Manifest yoksa resolve() None döner ve şablonlar normal static adresini kullanır.
+    """
+
+    def __init__(self, dist_dir=DIST_DIR):
+        self.directory = dist_dir
+        self.path = os.path.join(dist_dir, MANIFEST_NAME)
+        self.mtime = None
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+        with self.lock:
+            self.entries = _read_manifest(self.directory) if mtime else {}
+            self.mtime = mtime
+
+    def resolve(self, name):
+        self._refresh()
+        return self.entries.get(name)
+
+    def choose_file(self, hashed_name, accept_encoding):
+        """
+        İstemcinin kabul ettiği en iyi önceden sıkıştırılmış sürümü seçer.
+        (dosya adı, Content-Encoding) döner; sıkıştırılmış sürüm yoksa encoding None.
+        """
+        accepted = set()
+        for part in (accept_encoding or "").lower().split(","):
+            coding, _, params = part.partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0"):
+                accepted.add(coding.strip())
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.exists(os.path.join(self.directory, hashed_name + suffix)):
+                return hashed_name + suffix, encoding
+        return hashed_name, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statik dosyaları özet adlarıyla derler ve sıkıştırır")
+    parser.add_argument("--static-dir", default=STATIC_DIR)
+    parser.add_argument("--dist-dir", default=None, help="Varsayılan: <static-dir>/dist")
+    args = parser.parse_args(argv)
+    dist_dir = args.dist_dir or os.path.join(args.static_dir, "dist")
+    manifest = build(args.static_dir, dist_dir)
+    for name, target in sorted(manifest.items()):
+        print(f"{name} -> {target}")
+    if not BROTLI_AVAILABLE:
+        print("brotli kurulu değil, yalnızca .gz üretildi (pip install brotli)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# wsgi_server.py
+# Üretim için çok thread'li WSGI sunucusu (python3 app.py serve).
+#
+# waitress kuruluysa o kullanılır; yoksa werkzeug sunucusu sabit boyutlu bir
+# thread havuzuyla çalıştırılır. Her iki durumda da:
+#   - uzun süren istekler (Excel, 60 sn'lik parmak kaydı) diğerlerini bekletmez
+#   - yavaş/ölü bağlantılar zaman aşımı ile kapanır
+#   - SSE / long-poll akışları app.py'de thread sayısının yarısıyla sınırlıdır
+#   - bekleyen bağlantı kuyruğu sınırlıdır; dolunca 503 döner (waitress'te
+#     connection_limit ile fazlası kabul edilmez)
+#   - SIGTERM'de yeni bağlantı alınmaz, süren istekler drain süresi kadar
+#     (waitress: 5 sn) beklenir
+
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+# Parent dizini path'e ekle (logger için)
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(UTILS_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from logger import setup_logger
+
+try:
+    from waitress.server import create_server as create_waitress_server
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+log = setup_logger("server")
+
+SERVE_THREADS = 16          # SSE / long-poll bağlantıları da birer thread tutar
+QUEUE_SIZE = 32             # Worker bekleyen en fazla bağlantı; fazlasına 503
+REQUEST_TIMEOUT = 120       # Tek istek için soket zaman aşımı (saniye)
+KEEPALIVE_TIMEOUT = 5       # İki istek arası boşta bekleme (0: keep-alive kapalı)
+DRAIN_TIMEOUT = 10          # SIGTERM sonrası süren isteklere tanınan süre
+
+
+class TimeoutRequestHandler(WSGIRequestHandler):
+    """İstek okurken/yazarken request_timeout, istekler arasında keepalive_timeout uygular."""
+
+    request_timeout = REQUEST_TIMEOUT
+    keepalive_timeout = KEEPALIVE_TIMEOUT
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        self.served = False
+        super().handle()
+
+    def handle_one_request(self):
+        # İlk istek satırı request_timeout, sonrakiler keep-alive süresi kadar beklenir
+        self.connection.settimeout(self.keepalive_timeout if self.served else self.request_timeout)
+        super().handle_one_request()
+        self.served = True
+        # Kuyrukta bekleyen varsa boşta keep-alive için worker tutma
+        if self.server.draining.is_set() or not self.server.connections.empty():
+            self.close_connection = True
+
+    def parse_request(self):
+        # İstek satırı geldi; gövde ve cevap için tam süre
+        self.connection.settimeout(self.request_timeout)
+        return super().parse_request()
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Bağlantıları sabit sayıda worker thread'e dağıtan werkzeug sunucusu."""
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads=SERVE_THREADS, handler=TimeoutRequestHandler,
+                 queue_size=QUEUE_SIZE):
+        self.connections = queue.Queue(maxsize=queue_size)
+        self.draining = threading.Event()
+        self.active = 0
+        self.active_cond = threading.Condition()
+        super().__init__(host, port, app, handler=handler)
+        for i in range(threads):
+            threading.Thread(target=self._worker, name=f"http-{i}", daemon=True).start()
+
+    def process_request(self, request, client_address):
+        with self.active_cond:
+            self.active += 1
+        try:
+            self.connections.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject(request, client_address)
+
+    def _reject(self, request, client_address):
+        """Kuyruk dolu: beklemeden 503 gönderip bağlantıyı kapatır."""
+        log.warning(f"SERVER Kuyruk dolu, {client_address[0]} bağlantısı 503 ile reddedildi")
+        try:
+            request.settimeout(1)
+            request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                            b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+            with self.active_cond:
+                self.active -= 1
+                self.active_cond.notify_all()
+
+    def _worker(self):
+        while True:
+            request, client_address = self.connections.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self.active_cond:
+                    self.active -= 1
+                    self.active_cond.notify_all()
+
+    def drain(self, timeout=DRAIN_TIMEOUT):
+        """Süren bağlantıların bitmesini bekler. Hepsi bittiyse True döner."""
+        self.draining.set()
+        deadline = time.time() + timeout
+        with self.active_cond:
+            while self.active:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self.active_cond.wait(remaining)
+        return True
+
+
+def make_handler(timeout, keepalive):
+    """Ayarlanan zaman aşımlarıyla handler sınıfı üretir."""
+    return type("ServeRequestHandler", (TimeoutRequestHandler,), {
+        "request_timeout": timeout,
+        "keepalive_timeout": keepalive,
+        "protocol_version": "HTTP/1.1" if keepalive > 0 else "HTTP/1.0",
+    })
+
+
+def serve(app, host="0.0.0.0", port=5000, threads=SERVE_THREADS, timeout=REQUEST_TIMEOUT,
+          keepalive=KEEPALIVE_TIMEOUT, drain=DRAIN_TIMEOUT, on_shutdown=None, queue_size=QUEUE_SIZE):
+    """
+    Sunucuyu ön planda çalıştırır; SIGTERM/SIGINT ile düzgün kapanır.
+    on_shutdown: yeni istek kesildikten sonra çağrılır (ör. SSE akışlarını bitirmek için).
+    keepalive ve drain yalnızca werkzeug yolunda kullanılır (waitress kendi ayarlarıyla çalışır).
+    """
+    if WAITRESS_AVAILABLE:
+        return _serve_waitress(app, host, port, threads, timeout, on_shutdown, queue_size)
+
+    server = PooledWSGIServer(host, port, app, threads=threads, handler=make_handler(timeout, keepalive),
+                              queue_size=queue_size)
+
+    def _stop(signum, frame):
+        log.info("SERVER Kapatma sinyali alındı, yeni bağlantı kabul edilmiyor")
+        # serve_forever çalışan thread'den shutdown çağrılırsa kilitlenir
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    log.info(f"SERVER werkzeug http://{host}:{port} ({threads} thread, kuyruk {queue_size}, timeout {timeout}s, keep-alive {keepalive}s)")
+    try:
+        server.serve_forever()
+    finally:
+        server.socket.close()
+        if on_shutdown:
+            on_shutdown()
+        if server.drain(drain):
+            log.info("SERVER ✓ Tüm istekler tamamlandı")
+        else:
+            log.warning(f"SERVER {drain}s içinde bitmeyen {server.active} bağlantı kesildi")
+        server.server_close()
+    return 0
+
+
+def _serve_waitress(app, host, port, threads, timeout, on_shutdown, queue_size):
+    # waitress boşta bağlantıları thread'siz tutar; kuyruk sınırı yerine toplam
+    # bağlantı sayısı sınırlanır, fazlası accept edilmeden bekler
+    server = create_waitress_server(app, host=host, port=port, threads=threads,
+                                    channel_timeout=timeout, connection_limit=threads + queue_size,
+                                    ident="attendance")
+
+    def _stop(signum, frame):
+        log.info("SERVER Kapatma sinyali alındı")
+        if on_shutdown:
+            on_shutdown()
+        # waitress run() SystemExit'i yakalar ve worker'ları (5 sn) bekleyerek kapatır
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    log.info(f"SERVER waitress http://{host}:{port} ({threads} thread, timeout {timeout}s)")
+    server.run()
+    log.info("SERVER Kapatıldı")
+    return 0